@@ -1,13 +1,79 @@
 import os
+from decimal import Decimal
 from pydantic_settings import BaseSettings
 
 
 class Settings(BaseSettings):
-    DATABASE_URL_PG: str = os.getenv("DATABASE_URL_PG") or "sqlite+aiosqlite:///database.db"
+    DATABASE_URL_PG: str = (
+        os.getenv("DATABASE_URL_PG") or "sqlite+aiosqlite:///database.db"
+    )
     SECRET_KEY: str = "secret"
 
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 5 * 60  # 5 minutes
     REFRESH_TOKEN_EXPIRE_MINUTES: int = 7 * 24 * 60  # 7 days
+    REVOKED_TOKEN_CACHE_MAX_SIZE: int = 100_000  # older entries fall back to the DB
+    REVOKED_TOKEN_PRUNE_INTERVAL_SECONDS: int = 60 * 60
+
+    # Login throttling (token buckets, checked before any password work)
+    LOGIN_THROTTLE_USER_BURST: int = 5
+    LOGIN_THROTTLE_USER_PER_MINUTE: float = 5.0
+    LOGIN_THROTTLE_IP_BURST: int = 20
+    LOGIN_THROTTLE_IP_PER_MINUTE: float = 20.0
+    LOGIN_THROTTLE_MAX_KEYS: int = 100_000  # in-process buckets kept
+    LOGIN_THROTTLE_BACKEND: str = "memory"  # or "database" to share across workers
+
+    # Connection pool
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: float = 30.0  # seconds to wait for a free connection
+    DB_POOL_RECYCLE: int = 30 * 60  # seconds
+    DB_POOL_PRE_PING: bool = True
+
+    # Logging
+    LOG_LEVEL: str = "INFO"
+    LOG_FORMAT: str = "json"  # or "text"
+    LOG_QUEUE_SIZE: int = 10_000  # records beyond this are dropped, not awaited
+    LOG_DEBUG_SAMPLE_RATE: float = 1.0
+    LOG_INFO_SAMPLE_RATE: float = 1.0
+
+    # Query diagnostics
+    DB_SLOW_QUERY_MS: float | None = 200  # None disables the slow-query log
+    DB_SLOW_QUERY_PARAMS_SAMPLE_RATE: float = 0.1  # share logged with parameters
+    DB_N_PLUS_ONE_THRESHOLD: int = 10  # same statement per request; 0 disables
+
+    # Schema management
+    DB_MIGRATE_ON_STARTUP: bool = True  # disable when running the migration CLI
+    DB_RESET_ON_STARTUP: bool = False  # drop everything first (local dev only)
+
+    # Password hashing executor
+    PASSWORD_POOL_WORKERS: int = min(4, os.cpu_count() or 1)
+    PASSWORD_POOL_MAX_QUEUE: int = 64  # jobs waiting beyond the busy workers
+
+    # Authenticated-principal cache
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 60
+    PRINCIPAL_CACHE_MAX_SIZE: int = 10_000
+
+    # Receiver write-behind cache
+    RECEIVER_FLUSH_INTERVAL_SECONDS: float = 1.0
+    RECEIVER_TOMBSTONE_RETENTION_SECONDS: int = 60 * 60  # deletes kept for syncing
+
+    # Delivery route batching
+    DELIVERY_POSTAL_AREA_LENGTH: int = 3  # postal code prefix treated as one area
+
+    # Parcel pricing
+    VOLUMETRIC_DIVISOR: int = 5000  # cm^3 per billable kg
+    DEFAULT_BASE_PRICE: Decimal = Decimal("30.00")  # routes without a rate
+    DEFAULT_PRICE_PER_KG: Decimal = Decimal("10.00")
+    RATE_TABLE_TTL_SECONDS: int = 60
+
+    # Customer and station search
+    SEARCH_MIN_SIMILARITY: float = 0.3  # trigram similarity for a fuzzy match
+    SEARCH_INDEX_REFRESH_SECONDS: float = 5.0  # in-process index (SQLite only)
+
+    # Public parcel tracking cache
+    TRACKING_CACHE_TTL_SECONDS: int = 30
+    TRACKING_CACHE_NEGATIVE_TTL_SECONDS: int = 5  # unknown tracking numbers
+    TRACKING_CACHE_MAX_SIZE: int = 100_000
 
     model_config = {"env_file": ".env", "validate_assignment": True, "extra": "allow"}
 
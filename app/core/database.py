@@ -1,37 +1,135 @@
-import os
+import logging
+import time
 from dotenv import load_dotenv
 from sqlmodel import SQLModel
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from typing import AsyncIterator
 from sqlmodel.ext.asyncio.session import AsyncSession
 from sqlalchemy.ext.asyncio import async_sessionmaker
 from typing import Optional
 
+from . import config
+from .metrics import Gauge, instrument_engine, registry
+from .query_log import install_slow_query_log
+from .migrations import (
+    LATEST_VERSION,
+    get_current_version,
+    run_migrations,
+    version_metadata,
+)
+
 load_dotenv()
 
-connect_args = {"ssl": True}
+settings = config.get_settings()
+
+logger = logging.getLogger(__name__)
 
 
 engine: Optional[AsyncEngine] = None
+async_session_factory: Optional[async_sessionmaker[AsyncSession]] = None
+
+
+database_url = settings.DATABASE_URL_PG
+
+
+class PoolStats:
+    """Running totals of how long callers waited to check out a connection."""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.checkouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.timeouts = 0
+
+    def record(self, waited: float):
+        self.checkouts += 1
+        self.wait_seconds_total += waited
+        if waited > self.wait_seconds_max:
+            self.wait_seconds_max = waited
+
 
+pool_stats = PoolStats()
 
-database_url = os.getenv("DATABASE_URL_PG") or "sqlite+aiosqlite:///database.db"
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that records the time spent waiting for a free connection.
+
+    Waiting here means the pool is exhausted, so this is what tells pool
+    starvation apart from slow queries.
+    """
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except Exception:
+            pool_stats.timeouts += 1
+            raise
+        pool_stats.record(time.perf_counter() - started)
+        return conn
+
+
+def _is_sqlite(url: str) -> bool:
+    return url.startswith("sqlite")
+
+
+def _engine_kwargs(url: str) -> dict:
+    """Build create_async_engine() arguments for the given database URL."""
+    kwargs: dict = {}
+
+    if _is_sqlite(url):
+        kwargs["connect_args"] = {"check_same_thread": False}
+        if ":memory:" in url or url.endswith("://"):
+            # In-memory databases live on a single connection (StaticPool).
+            return kwargs
+    else:
+        kwargs["connect_args"] = {"ssl": True}
+
+    kwargs.update(
+        poolclass=TimedQueuePool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+    )
+    return kwargs
 
 
 async def init_db():
-    print(f"Initializing database with URL: {database_url}")
-    """Initialize the database engine and create tables."""
-    global engine
-
-    engine = create_async_engine(
-        database_url,
-        echo=True,
-        future=True,
-        connect_args=connect_args,
+    """Initialize the database engine and session factory, then migrate."""
+    global engine, async_session_factory
+    logger.info(
+        "Initializing database", extra={"driver": make_url(database_url).drivername}
     )
 
-    await drop_db_and_tables()
-    await create_db_and_tables()
+    engine = create_async_engine(database_url, **_engine_kwargs(database_url))
+    instrument_engine(engine)
+    install_slow_query_log(engine)
+    async_session_factory = async_sessionmaker(
+        engine, expire_on_commit=False, class_=AsyncSession
+    )
+
+    if settings.DB_RESET_ON_STARTUP:
+        await drop_db_and_tables()
+        await drop_schema_version()
+
+    if settings.DB_MIGRATE_ON_STARTUP:
+        await run_migrations(engine)
+    else:
+        version = await get_current_version(engine)
+        if version != LATEST_VERSION:
+            logger.warning(
+                "Schema version %s is behind %s; "
+                "run `python -m app.core.migrations upgrade`",
+                version,
+                LATEST_VERSION,
+            )
 
 
 async def create_db_and_tables():
@@ -39,7 +137,6 @@ async def create_db_and_tables():
     if engine is None:
         raise Exception("Database engine is not initialized. Call init_db() first.")
     async with engine.begin() as conn:
-        print(conn.engine.url.drivername)
         # await conn.run_sync(SQLModel.metadata.drop_all)
         await conn.run_sync(SQLModel.metadata.create_all)
 
@@ -52,21 +149,61 @@ async def drop_db_and_tables():
         await conn.run_sync(SQLModel.metadata.drop_all)
 
 
-async def get_session() -> AsyncIterator[AsyncSession]:
-    """Get async database session."""
+async def drop_schema_version():
+    """Forget the recorded schema version."""
     if engine is None:
         raise Exception("Database engine is not initialized. Call init_db() first.")
+    async with engine.begin() as conn:
+        await conn.run_sync(version_metadata.drop_all)
 
-    async_session = async_sessionmaker(
-        engine, expire_on_commit=False, class_=AsyncSession
-    )
-    async with async_session() as session:
+
+async def get_session() -> AsyncIterator[AsyncSession]:
+    """Get async database session.
+
+    The session comes from the process-wide factory and only checks out a
+    pooled connection when the handler runs its first statement.
+    """
+    if async_session_factory is None:
+        raise Exception("Database engine is not initialized. Call init_db() first.")
+
+    async with async_session_factory() as session:
         yield session
 
 
+def get_pool_status() -> dict:
+    """Current pool occupancy plus accumulated checkout wait times."""
+    status = {
+        "checkouts": pool_stats.checkouts,
+        "checkout_wait_seconds_total": round(pool_stats.wait_seconds_total, 6),
+        "checkout_wait_seconds_max": round(pool_stats.wait_seconds_max, 6),
+        "checkout_timeouts": pool_stats.timeouts,
+    }
+    if engine is not None:
+        pool = engine.sync_engine.pool
+        if isinstance(pool, TimedQueuePool):
+            status.update(
+                size=pool.size(),
+                checked_in=pool.checkedin(),
+                checked_out=pool.checkedout(),
+                overflow=pool.overflow(),
+            )
+    return status
+
+
+def _pool_metrics():
+    gauge = Gauge("db_pool", "Connection pool state from get_pool_status().", ("stat",))
+    for stat, value in get_pool_status().items():
+        gauge.set(stat, value=value)
+    return [gauge]
+
+
+registry.register_collector(_pool_metrics)
+
+
 async def close_db():
     """Close database connection."""
-    global engine
+    global engine, async_session_factory
     if engine is not None:
         await engine.dispose()
         engine = None
+        async_session_factory = None
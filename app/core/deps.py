@@ -5,17 +5,19 @@ from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 
 import typing
+import uuid
 from jose import jwt
 
 
 from app.core.database import get_session, AsyncSession
 from app.models.user_model import DBUser, User
+from app.core.principal_cache import principal_cache
 from . import security
 from . import config
 
 logger = logging.getLogger(__name__)
 
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/v1/token")
+oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/token")
 
 settings = config.get_settings()
 
@@ -24,6 +26,12 @@ async def get_current_user(
     token: typing.Annotated[str, Depends(oauth2_scheme)],
     session: typing.Annotated[AsyncSession, Depends(get_session)],
 ) -> User:
+    # A cached entry only exists for a token that already decoded cleanly and
+    # never outlives its "exp", so hot clients skip the JWT and the DB.
+    cached_user = principal_cache.get(token)
+    if cached_user is not None:
+        return cached_user
+
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -35,15 +43,16 @@ async def get_current_user(
         )
         user_id = payload.get("sub")
 
-        if user_id is None:
+        # Refresh tokens are only good at /auth/refresh.
+        if user_id is None or payload.get("type") == "refresh":
             raise credentials_exception
         try:
-            user_id = int(user_id)
+            user_id = uuid.UUID(user_id)
         except (TypeError, ValueError):
             raise credentials_exception
 
-    except Exception as e:
-        print(e)
+    except Exception:
+        logger.debug("Rejected access token", exc_info=True)
         raise credentials_exception
 
     user = await session.get(DBUser, user_id)
@@ -51,7 +60,9 @@ async def get_current_user(
         raise credentials_exception
 
     # Convert DBUser to User before returning
-    return User(**user.__dict__)
+    current_user = User.model_validate(user)
+    principal_cache.set(token, current_user, token_expires_at=payload.get("exp"))
+    return current_user
 
 
 async def get_current_active_user(
@@ -60,4 +71,3 @@ async def get_current_active_user(
     if current_user.status != "active":
         raise HTTPException(status_code=400, detail="Inactive user")
     return current_user
-
@@ -0,0 +1,140 @@
+"""Queue-based structured logging for everything under the ``app`` logger.
+
+Request handlers only put records on a bounded in-memory queue; a background
+listener thread formats them as JSON lines and writes them out. When the queue
+is full records are dropped (and counted) rather than blocking the event loop.
+DEBUG and INFO records can be sampled; WARNING and above are always kept. A
+single call can also pass its own rate with ``extra={"sample_rate": 0.01}``.
+
+Until :func:`start_logging` runs (tests, scripts) ``app`` loggers propagate to
+the root logger as usual.
+"""
+
+import datetime
+import logging
+import logging.handlers
+import queue
+import random
+import sys
+
+import orjson
+
+from . import config
+from .metrics import Gauge, registry
+
+settings = config.get_settings()
+
+APP_LOGGER = "app"
+
+# Attributes every LogRecord has; anything else was passed via ``extra``.
+_RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {"message", "taskName"}
+
+
+class JSONFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.datetime.fromtimestamp(
+                record.created, datetime.timezone.utc
+            ).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES and key != "sample_rate":
+                entry[key] = value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return orjson.dumps(entry, default=str).decode()
+
+
+class SamplingFilter(logging.Filter):
+    def __init__(self, rates: dict[int, float]):
+        super().__init__()
+        self.rates = rates
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = getattr(record, "sample_rate", None)
+        if rate is None:
+            rate = self.rates.get(record.levelno, 1.0)
+        return rate >= 1.0 or random.random() < rate
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that drops records instead of blocking when the queue is full."""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+_handler: DroppingQueueHandler | None = None
+_listener: logging.handlers.QueueListener | None = None
+
+
+def start_logging():
+    """Route ``app`` logs through the queue and start the writer thread."""
+    global _handler, _listener
+    if _listener is not None:
+        return
+
+    output = logging.StreamHandler(sys.stdout)
+    if settings.LOG_FORMAT == "json":
+        output.setFormatter(JSONFormatter())
+    else:
+        output.setFormatter(
+            logging.Formatter("%(asctime)s %(levelname)s %(name)s %(message)s")
+        )
+
+    _handler = DroppingQueueHandler(queue.Queue(maxsize=settings.LOG_QUEUE_SIZE))
+    _handler.addFilter(
+        SamplingFilter(
+            {
+                logging.DEBUG: settings.LOG_DEBUG_SAMPLE_RATE,
+                logging.INFO: settings.LOG_INFO_SAMPLE_RATE,
+            }
+        )
+    )
+    _listener = logging.handlers.QueueListener(
+        _handler.queue, output, respect_handler_level=True
+    )
+
+    logger = logging.getLogger(APP_LOGGER)
+    logger.setLevel(settings.LOG_LEVEL.upper())
+    logger.addHandler(_handler)
+    logger.propagate = False
+    _listener.start()
+
+
+def stop_logging():
+    """Flush queued records and restore default propagation."""
+    global _handler, _listener
+    if _listener is None:
+        return
+
+    logger = logging.getLogger(APP_LOGGER)
+    logger.removeHandler(_handler)
+    logger.propagate = True
+    _listener.stop()
+    _handler = _listener = None
+
+
+def dropped_records() -> int:
+    return _handler.dropped if _handler is not None else 0
+
+
+def _log_metrics():
+    gauge = Gauge("log_records_dropped", "Log records dropped on a full queue.")
+    gauge.set(value=dropped_records())
+    return [gauge]
+
+
+registry.register_collector(_log_metrics)
@@ -0,0 +1,192 @@
+"""Token-bucket throttling for password logins.
+
+Every attempt takes a token from its client IP's bucket and from its login
+name's bucket before the user is looked up or a password is checked, so a
+credential-stuffing burst is turned away without paying for bcrypt. Buckets
+refill continuously up to their burst size.
+
+Buckets live in process by default, in an LRU-bounded dict. A bucket that has
+refilled is as good as absent, so refilled buckets are dropped and evicting
+one loses nothing but history. With ``LOGIN_THROTTLE_BACKEND = "database"``
+buckets are rows of the ``login_throttle`` table instead. Each is updated by
+one atomic upsert, so every worker enforces the same limits.
+
+The client IP is ``request.client.host``; behind a reverse proxy, run uvicorn
+with ``--proxy-headers`` so that is the real client and not the proxy.
+"""
+
+import logging
+import math
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from fastapi import HTTPException, status
+from sqlalchemy import case, delete
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from . import config
+from .metrics import Counter, registry
+from app.models.login_throttle_model import LoginThrottleBucket
+
+settings = config.get_settings()
+
+logger = logging.getLogger(__name__)
+
+PRUNE_INTERVAL_SECONDS = 5 * 60
+
+login_throttled_total = registry.register(
+    Counter(
+        "login_throttled_total",
+        "Login attempts rejected before the password check.",
+        ("scope",),
+    )
+)
+
+
+@dataclass(frozen=True)
+class BucketLimit:
+    burst: int
+    per_second: float
+
+    def retry_after(self, tokens: float) -> float:
+        """Seconds until a bucket holding ``tokens`` has a whole token."""
+        return (1 - tokens) / self.per_second
+
+    def refill_seconds(self, tokens: float) -> float:
+        return (self.burst - tokens) / self.per_second
+
+
+class LoginThrottledError(HTTPException):
+    def __init__(self, retry_after: float):
+        super().__init__(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many login attempts",
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+        )
+
+
+class MemoryBuckets:
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        # key -> (tokens, updated_at, full_at), least recently used first
+        self._buckets: OrderedDict[str, tuple[float, float, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    async def take(
+        self, session: AsyncSession, key: str, limit: BucketLimit
+    ) -> float | None:
+        """Take a token; None if granted, else seconds until one is available."""
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated_at, _ = self._buckets.pop(key, (limit.burst, now, now))
+            tokens = min(limit.burst, tokens + (now - updated_at) * limit.per_second)
+            wait = None if tokens >= 1 else limit.retry_after(tokens)
+            if wait is None:
+                tokens -= 1
+            self._buckets[key] = (tokens, now, now + limit.refill_seconds(tokens))
+
+            # Refilled buckets are as good as absent; then enforce the bound.
+            while self._buckets:
+                _, (_, _, full_at) = next(iter(self._buckets.items()))
+                if full_at > now and len(self._buckets) <= self.max_size:
+                    break
+                self._buckets.popitem(last=False)
+        return wait
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+
+
+class DatabaseBuckets:
+    """Buckets in the ``login_throttle`` table, shared by every worker."""
+
+    def __init__(self):
+        self._next_prune = 0.0
+
+    async def take(
+        self, session: AsyncSession, key: str, limit: BucketLimit
+    ) -> float | None:
+        now = time.time()
+        table = LoginThrottleBucket.__table__
+        refilled = table.c.tokens + (now - table.c.updated_at) * limit.per_second
+        refilled = case((refilled > limit.burst, limit.burst), else_=refilled)
+
+        connection = await session.connection()
+        dialect = postgresql if connection.dialect.name == "postgresql" else sqlite
+        statement = dialect.insert(table).values(
+            key=key, tokens=limit.burst - 1, updated_at=now, granted=True
+        )
+        # SET reads the row as it was, so the refill and the take are atomic.
+        statement = statement.on_conflict_do_update(
+            index_elements=[table.c.key],
+            set_={
+                "tokens": case((refilled >= 1, refilled - 1), else_=refilled),
+                "granted": refilled >= 1,
+                "updated_at": now,
+            },
+        ).returning(table.c.tokens, table.c.granted)
+        tokens, granted = (await session.exec(statement)).one()
+        await self._prune(session, now)
+        await session.commit()
+        return None if granted else limit.retry_after(tokens)
+
+    async def _prune(self, session: AsyncSession, now: float):
+        """Drop buckets idle long enough to have refilled under any limit."""
+        if time.monotonic() < self._next_prune:
+            return
+        self._next_prune = time.monotonic() + PRUNE_INTERVAL_SECONDS
+        idle = max(limit.refill_seconds(0) for limit in login_limits().values())
+        await session.exec(
+            delete(LoginThrottleBucket).where(
+                LoginThrottleBucket.updated_at < now - idle
+            )
+        )
+
+    def clear(self):
+        pass
+
+
+def login_limits() -> dict[str, BucketLimit]:
+    return {
+        "ip": BucketLimit(
+            settings.LOGIN_THROTTLE_IP_BURST,
+            settings.LOGIN_THROTTLE_IP_PER_MINUTE / 60,
+        ),
+        "user": BucketLimit(
+            settings.LOGIN_THROTTLE_USER_BURST,
+            settings.LOGIN_THROTTLE_USER_PER_MINUTE / 60,
+        ),
+    }
+
+
+class LoginThrottle:
+    def __init__(self, buckets: MemoryBuckets | DatabaseBuckets):
+        self.buckets = buckets
+
+    async def check(self, session: AsyncSession, login: str, client_ip: str):
+        """Take a login attempt for ``client_ip`` and ``login``, or raise 429."""
+        limits = login_limits()
+        for scope, value in (("ip", client_ip), ("user", login.strip().lower())):
+            wait = await self.buckets.take(session, f"{scope}:{value}", limits[scope])
+            if wait is not None:
+                login_throttled_total.inc(scope)
+                logger.info("Login throttled", extra={"scope": scope})
+                raise LoginThrottledError(wait)
+
+    def clear(self):
+        """Forget every in-process bucket (tests only)."""
+        self.buckets.clear()
+
+
+login_throttle = LoginThrottle(
+    DatabaseBuckets()
+    if settings.LOGIN_THROTTLE_BACKEND == "database"
+    else MemoryBuckets(settings.LOGIN_THROTTLE_MAX_KEYS)
+)
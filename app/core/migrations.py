@@ -0,0 +1,303 @@
+"""Versioned schema migrations.
+
+Every applied step is recorded in the ``schema_version`` table, and startup
+only runs the steps newer than the recorded version. A brand new database is
+built straight from the current models and stamped with the latest version.
+
+Run once before rolling out many workers::
+
+    python -m app.core.migrations upgrade
+    python -m app.core.migrations current
+"""
+
+import argparse
+import asyncio
+import datetime
+import logging
+from dataclasses import dataclass
+from typing import Callable
+
+from sqlalchemy import (
+    Column,
+    DateTime,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    func,
+    inspect,
+    literal,
+    select,
+    text,
+)
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlmodel import SQLModel
+
+# Import every table model so SQLModel.metadata is complete.
+from app.models import (  # noqa: F401
+    customer_model,
+    customer_tombstone_model,
+    delivery_staff_model,
+    login_throttle_model,
+    parcel_model,
+    revoked_token_model,
+    shipping_rate_model,
+    station_model,
+    station_parcel_count_model,
+    user_model,
+    vehicle_model,
+)
+
+logger = logging.getLogger(__name__)
+
+version_metadata = MetaData()
+
+schema_version = Table(
+    "schema_version",
+    version_metadata,
+    Column("version", Integer, primary_key=True),
+    Column("description", String, nullable=False),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    description: str
+    upgrade: Callable[[Connection], None]
+
+
+def _create_baseline(conn: Connection):
+    SQLModel.metadata.create_all(conn, checkfirst=True)
+
+
+def _add_dbuser_unique_indexes(conn: Connection):
+    conn.execute(
+        text(
+            "CREATE UNIQUE INDEX IF NOT EXISTS ix_dbuser_username ON dbuser (username)"
+        )
+    )
+    conn.execute(
+        text("CREATE UNIQUE INDEX IF NOT EXISTS ix_dbuser_email ON dbuser (email)")
+    )
+
+
+def _add_station_parcel_counts(conn: Connection):
+    Parcel = parcel_model.Parcel
+    table = station_parcel_count_model.StationParcelCount.__table__
+    table.create(conn, checkfirst=True)
+    conn.execute(table.delete())
+    for role, column in (
+        ("origin", Parcel.origin_station_id),
+        ("destination", Parcel.destination_station_id),
+    ):
+        conn.execute(
+            table.insert().from_select(
+                ["station_id", "role", "status", "count"],
+                select(column, literal(role), Parcel.status, func.count())
+                .where(column.is_not(None))
+                .group_by(column, Parcel.status),
+            )
+        )
+
+
+def _add_vehicle_volume_capacity(conn: Connection):
+    columns = {column["name"] for column in inspect(conn).get_columns("vehicle")}
+    if "volume_capacity" not in columns:
+        conn.execute(text("ALTER TABLE vehicle ADD COLUMN volume_capacity FLOAT"))
+
+
+def _add_parcel_delivery_postal_code(conn: Connection):
+    columns = {column["name"] for column in inspect(conn).get_columns("parcel")}
+    if "delivery_postal_code" not in columns:
+        conn.execute(text("ALTER TABLE parcel ADD COLUMN delivery_postal_code VARCHAR"))
+    conn.execute(
+        text(
+            "CREATE INDEX IF NOT EXISTS ix_parcel_delivery_postal_code "
+            "ON parcel (delivery_postal_code)"
+        )
+    )
+
+
+def _add_shipping_rates(conn: Connection):
+    shipping_rate_model.ShippingRate.__table__.create(conn, checkfirst=True)
+
+
+def _add_trigram_search_indexes(conn: Connection):
+    if conn.dialect.name != "postgresql":
+        return  # SQLite searches an in-process index instead
+    conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+    for table, column in (
+        ("customer", "name"),
+        ("customer", "email"),
+        ("station", "name"),
+        ("station", "city"),
+    ):
+        conn.execute(
+            text(
+                f"CREATE INDEX IF NOT EXISTS ix_{table}_{column}_trgm "
+                f"ON {table} USING gin ({column} gin_trgm_ops)"
+            )
+        )
+
+
+def _index_email_local_part(conn: Connection):
+    if conn.dialect.name != "postgresql":
+        return
+    # Search matches the part before the @; every row shares a few domains.
+    conn.execute(text("DROP INDEX IF EXISTS ix_customer_email_trgm"))
+    conn.execute(
+        text(
+            "CREATE INDEX IF NOT EXISTS ix_customer_email_local_trgm ON customer "
+            "USING gin ((split_part(email, '@', 1)) gin_trgm_ops)"
+        )
+    )
+
+
+def _add_customer_tombstones(conn: Connection):
+    customer_tombstone_model.CustomerTombstone.__table__.create(conn, checkfirst=True)
+    # Receiver sync reads rows changed since its last pass every second.
+    conn.execute(
+        text(
+            "CREATE INDEX IF NOT EXISTS ix_customer_updated_at "
+            "ON customer (updated_at)"
+        )
+    )
+
+
+def _add_revoked_tokens(conn: Connection):
+    revoked_token_model.RevokedToken.__table__.create(conn, checkfirst=True)
+
+
+def _add_login_throttle(conn: Connection):
+    login_throttle_model.LoginThrottleBucket.__table__.create(conn, checkfirst=True)
+
+
+# Append new steps at the end; never edit or reorder a released one.
+MIGRATIONS: list[Migration] = [
+    Migration(1, "baseline schema", _create_baseline),
+    Migration(
+        2, "unique indexes on dbuser username and email", _add_dbuser_unique_indexes
+    ),
+    Migration(3, "per-station parcel count rollup", _add_station_parcel_counts),
+    Migration(4, "vehicle volume capacity", _add_vehicle_volume_capacity),
+    Migration(5, "parcel delivery postal code", _add_parcel_delivery_postal_code),
+    Migration(6, "shipping rate table", _add_shipping_rates),
+    Migration(7, "trigram search indexes", _add_trigram_search_indexes),
+    Migration(8, "revoked refresh tokens", _add_revoked_tokens),
+    Migration(9, "shared login throttle buckets", _add_login_throttle),
+    Migration(
+        10, "trigram index on customer email local part", _index_email_local_part
+    ),
+    Migration(11, "customer tombstones and updated_at index", _add_customer_tombstones),
+]
+
+LATEST_VERSION = MIGRATIONS[-1].version
+
+
+def _current_version(conn: Connection) -> int | None:
+    """Recorded schema version, or None if the version table is missing."""
+    if not inspect(conn).has_table(schema_version.name):
+        return None
+    return (
+        conn.execute(
+            select(schema_version.c.version)
+            .order_by(schema_version.c.version.desc())
+            .limit(1)
+        ).scalar()
+        or 0
+    )
+
+
+def _record(conn: Connection, migration: Migration):
+    conn.execute(
+        schema_version.insert().values(
+            version=migration.version,
+            description=migration.description,
+            applied_at=datetime.datetime.now(),
+        )
+    )
+
+
+def _upgrade(conn: Connection) -> list[Migration]:
+    if conn.dialect.name == "postgresql":
+        # Serialize concurrent workers; released when the transaction ends.
+        conn.execute(text("SELECT pg_advisory_xact_lock(hashtext('schema_version'))"))
+
+    version = _current_version(conn)
+    if version == LATEST_VERSION:
+        return []
+
+    if version is None:
+        version_metadata.create_all(conn)
+        has_app_tables = any(
+            inspect(conn).has_table(table) for table in SQLModel.metadata.tables
+        )
+        if not has_app_tables:
+            # Fresh database: build the current schema and stamp every step.
+            _create_baseline(conn)
+            _add_trigram_search_indexes(conn)  # not declared on the models
+            _index_email_local_part(conn)
+            for migration in MIGRATIONS:
+                _record(conn, migration)
+            return list(MIGRATIONS)
+        version = 0
+
+    pending = [m for m in MIGRATIONS if m.version > version]
+    for migration in pending:
+        migration.upgrade(conn)
+        _record(conn, migration)
+    return pending
+
+
+async def get_current_version(engine: AsyncEngine) -> int | None:
+    async with engine.connect() as conn:
+        return await conn.run_sync(_current_version)
+
+
+async def run_migrations(engine: AsyncEngine) -> list[Migration]:
+    """Apply pending migrations and return the ones that ran.
+
+    When the schema is already current this is a single SELECT.
+    """
+    if await get_current_version(engine) == LATEST_VERSION:
+        return []
+
+    async with engine.begin() as conn:
+        applied = await conn.run_sync(_upgrade)
+
+    for migration in applied:
+        logger.info(
+            "Applied migration %s: %s",
+            migration.version,
+            migration.description,
+            extra={"version": migration.version},
+        )
+    return applied
+
+
+async def _main(command: str):
+    from app.core.database import _engine_kwargs, database_url
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    engine = create_async_engine(database_url, **_engine_kwargs(database_url))
+    try:
+        if command == "upgrade":
+            applied = await run_migrations(engine)
+            if not applied:
+                print(f"Schema is up to date at version {LATEST_VERSION}")
+        else:
+            version = await get_current_version(engine)
+            print(f"Current version: {version}, latest: {LATEST_VERSION}")
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Manage the database schema.")
+    parser.add_argument(
+        "command", choices=["upgrade", "current"], nargs="?", default="upgrade"
+    )
+    asyncio.run(_main(parser.parse_args().command))
@@ -0,0 +1,68 @@
+"""``?include=`` and ``?fields=`` for parcel reads.
+
+``include`` names relationships to embed and ``fields`` narrows the parcel's
+own columns; both are comma separated and accept the snake_case or camelCase
+name. Each maps to loader options, so a read issues a fixed number of
+queries however many parcels it returns. Single-parcel reads use one joined
+query. Lists use ``selectinload``: one extra ``IN`` query per included
+relationship, which keeps the paged query itself unchanged. Only the columns
+a response shows are selected, for the parcel and for each relationship.
+"""
+
+from fastapi import HTTPException, status
+from sqlalchemy.orm import joinedload, load_only, selectinload
+
+from app.models.parcel_model import Parcel
+from app.schemas.parcel_schemas import PARCEL_INCLUDES, ParcelResponse
+from app.schemas.user_schemas import to_camel_case
+
+PARCEL_FIELDS = frozenset(ParcelResponse.model_fields)
+
+
+def _parse(value: str | None, allowed, what: str) -> frozenset[str]:
+    names = {to_camel_case(name): name for name in allowed}
+    parsed = set()
+    for raw in (value or "").split(","):
+        raw = raw.strip()
+        if not raw:
+            continue
+        name = raw if raw in allowed else names.get(raw)
+        if name is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown {what}: {raw}",
+            )
+        parsed.add(name)
+    return frozenset(parsed)
+
+
+def parse_include(value: str | None) -> frozenset[str]:
+    return _parse(value, PARCEL_INCLUDES, "include")
+
+
+def parse_fields(value: str | None) -> frozenset[str] | None:
+    """Requested parcel fields, or None for all of them."""
+    return _parse(value, PARCEL_FIELDS, "field") or None
+
+
+def parcel_load_options(
+    fields: frozenset[str] | None, include: frozenset[str], joined: bool = False
+) -> list:
+    loader = joinedload if joined else selectinload
+    options = []
+    if fields is not None:
+        # The foreign key is needed to load an included relationship.
+        columns = {"id", *fields, *(f"{name}_id" for name in include)}
+        options.append(load_only(*(getattr(Parcel, name) for name in columns)))
+    for name in sorted(include):
+        relationship = getattr(Parcel, name)
+        target = relationship.property.mapper.class_
+        options.append(
+            loader(relationship).load_only(
+                *(
+                    getattr(target, column)
+                    for column in PARCEL_INCLUDES[name].model_fields
+                )
+            )
+        )
+    return options
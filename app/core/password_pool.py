@@ -0,0 +1,129 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+import bcrypt
+from fastapi import HTTPException, status
+
+from . import config
+from .metrics import Gauge, registry
+
+settings = config.get_settings()
+
+
+class PasswordPoolBusyError(HTTPException):
+    """Raised when too many password jobs are already queued."""
+
+    def __init__(self):
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Password service is busy, please retry",
+            headers={"Retry-After": "1"},
+        )
+
+
+class PasswordPool:
+    """Bounded executor that keeps bcrypt work off the event loop.
+
+    bcrypt releases the GIL while hashing, so a small thread pool gives real
+    parallelism. At most ``workers + max_queue`` jobs may be in flight; further
+    callers get a 503 instead of piling up behind the pool.
+    """
+
+    def __init__(self, workers: int, max_queue: int):
+        self.workers = workers
+        self.max_queue = max_queue
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+        self.in_flight = 0
+        self.submitted = 0
+        self.completed = 0
+        self.rejected = 0
+        self.wait_seconds_total = 0.0
+        self.run_seconds_total = 0.0
+
+    @property
+    def capacity(self) -> int:
+        return self.workers + self.max_queue
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.workers, thread_name_prefix="password"
+            )
+        return self._executor
+
+    async def run(self, func, *args):
+        if self.in_flight >= self.capacity:
+            self.rejected += 1
+            raise PasswordPoolBusyError()
+
+        self.in_flight += 1
+        self.submitted += 1
+        queued_at = time.perf_counter()
+
+        def timed():
+            # Counters are only touched back on the event loop thread.
+            started = time.perf_counter()
+            result = func(*args)
+            return result, started, time.perf_counter()
+
+        try:
+            loop = asyncio.get_running_loop()
+            result, started, finished = await loop.run_in_executor(
+                self._get_executor(), timed
+            )
+        finally:
+            self.in_flight -= 1
+            self.completed += 1
+
+        self.wait_seconds_total += started - queued_at
+        self.run_seconds_total += finished - started
+        return result
+
+    async def hash_password(self, plain_password: str) -> str:
+        hashed = await self.run(
+            bcrypt.hashpw, plain_password.encode("utf-8"), bcrypt.gensalt()
+        )
+        return hashed.decode("utf-8")
+
+    async def verify_password(self, plain_password: str, hashed_password: str) -> bool:
+        return await self.run(
+            bcrypt.checkpw,
+            plain_password.encode("utf-8"),
+            hashed_password.encode("utf-8"),
+        )
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "in_flight": self.in_flight,
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "wait_seconds_total": round(self.wait_seconds_total, 6),
+            "run_seconds_total": round(self.run_seconds_total, 6),
+        }
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+
+password_pool = PasswordPool(
+    workers=settings.PASSWORD_POOL_WORKERS,
+    max_queue=settings.PASSWORD_POOL_MAX_QUEUE,
+)
+
+
+def _password_pool_metrics():
+    gauge = Gauge("password_pool", "Password hashing executor state.", ("stat",))
+    for stat, value in password_pool.stats().items():
+        gauge.set(stat, value=value)
+    return [gauge]
+
+
+registry.register_collector(_password_pool_metrics)
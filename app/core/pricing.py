@@ -0,0 +1,146 @@
+"""Vectorized parcel price quoting.
+
+Billable weight is the larger of the actual weight and the volumetric weight
+(``length * width * height / VOLUMETRIC_DIVISOR``, dimensions in cm), rounded
+up to the next half kilogram. The price is the route's base price plus its
+per-kg price for every billable kg. Routes are looked up in the shipping rate
+table, which is cached in process as sorted NumPy arrays and reloaded every
+``RATE_TABLE_TTL_SECONDS``; routes without a rate use the configured default.
+
+All money is computed in integer cents, so batch quotes are exact.
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass
+from decimal import Decimal
+
+import numpy as np
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from . import config
+from app.models.shipping_rate_model import ShippingRate
+
+settings = config.get_settings()
+
+NO_STATION = -1
+# Route key: origin * KEY_STRIDE + destination, so one searchsorted finds a rate.
+KEY_STRIDE = 1 << 31
+
+
+def to_cents(amount: Decimal) -> int:
+    return int((Decimal(amount) * 100).to_integral_value())
+
+
+def from_cents(cents: int) -> Decimal:
+    return Decimal(int(cents)).scaleb(-2)
+
+
+@dataclass(frozen=True)
+class RateTable:
+    keys: np.ndarray  # sorted route keys
+    base_cents: np.ndarray
+    per_kg_cents: np.ndarray
+    loaded_at: float
+
+    @classmethod
+    def from_rates(cls, rates: list[tuple[int, int, Decimal, Decimal]]):
+        columns = list(zip(*rates)) or [()] * 4
+        origins, destinations, base_prices, per_kg_prices = columns
+        keys = np.array(origins, dtype=np.int64) * KEY_STRIDE + np.array(
+            destinations, dtype=np.int64
+        )
+        order = np.argsort(keys)
+        base_cents = np.array([to_cents(p) for p in base_prices], dtype=np.int64)
+        per_kg_cents = np.array([to_cents(p) for p in per_kg_prices], dtype=np.int64)
+        return cls(
+            keys=keys[order],
+            base_cents=base_cents[order],
+            per_kg_cents=per_kg_cents[order],
+            loaded_at=time.monotonic(),
+        )
+
+    def is_fresh(self) -> bool:
+        return time.monotonic() - self.loaded_at < settings.RATE_TABLE_TTL_SECONDS
+
+
+@dataclass(frozen=True)
+class Quotes:
+    billable_weight: np.ndarray  # kg, in half-kg steps
+    price_cents: np.ndarray
+    rate_found: np.ndarray
+
+
+def quote(
+    table: RateTable,
+    origin_station_ids,
+    destination_station_ids,
+    weights,
+    lengths,
+    widths,
+    heights,
+) -> Quotes:
+    """Price every parcel at once; station ids may be ``NO_STATION``."""
+    origins = np.asarray(origin_station_ids, dtype=np.int64)
+    destinations = np.asarray(destination_station_ids, dtype=np.int64)
+    volumetric = (
+        np.asarray(lengths, dtype=np.float64)
+        * np.asarray(widths, dtype=np.float64)
+        * np.asarray(heights, dtype=np.float64)
+        / settings.VOLUMETRIC_DIVISOR
+    )
+    billable = np.maximum(np.asarray(weights, dtype=np.float64), volumetric)
+    half_kgs = np.ceil(np.round(billable * 2, 9)).astype(np.int64)
+
+    keys = origins * KEY_STRIDE + destinations
+    base = np.full(len(keys), to_cents(settings.DEFAULT_BASE_PRICE), dtype=np.int64)
+    per_kg = np.full(len(keys), to_cents(settings.DEFAULT_PRICE_PER_KG), dtype=np.int64)
+    found = np.zeros(len(keys), dtype=bool)
+    if len(table.keys):
+        positions = np.minimum(np.searchsorted(table.keys, keys), len(table.keys) - 1)
+        found = (
+            (origins != NO_STATION)
+            & (destinations != NO_STATION)
+            & (table.keys[positions] == keys)
+        )
+        base[found] = table.base_cents[positions[found]]
+        per_kg[found] = table.per_kg_cents[positions[found]]
+
+    # per_kg * half_kgs / 2, rounded half up, without leaving integers.
+    price_cents = base + (per_kg * half_kgs + 1) // 2
+    return Quotes(
+        billable_weight=half_kgs / 2, price_cents=price_cents, rate_found=found
+    )
+
+
+class RateTableCache:
+    def __init__(self):
+        self._table: RateTable | None = None
+        self._lock = asyncio.Lock()
+
+    async def get(self, session: AsyncSession) -> RateTable:
+        table = self._table
+        if table is not None and table.is_fresh():
+            return table
+
+        async with self._lock:
+            # Another request may have reloaded it while we waited.
+            table = self._table
+            if table is None or not table.is_fresh():
+                result = await session.exec(
+                    select(
+                        ShippingRate.origin_station_id,
+                        ShippingRate.destination_station_id,
+                        ShippingRate.base_price,
+                        ShippingRate.price_per_kg,
+                    )
+                )
+                table = self._table = RateTable.from_rates(result.all())
+        return table
+
+    def clear(self):
+        self._table = None
+
+
+rate_table_cache = RateTableCache()
@@ -0,0 +1,54 @@
+import time
+from uuid import UUID
+
+from app.models.user_model import User
+from . import config
+from .cache import TTLCache
+
+settings = config.get_settings()
+
+
+class PrincipalCache(TTLCache[User]):
+    """Size-bounded TTL + LRU cache from access token to a ``User`` snapshot.
+
+    Entries never outlive the token itself, and every entry for a user can be
+    dropped at once through :meth:`invalidate_user`. The cache is per process,
+    so other workers may serve a stale snapshot for at most ``ttl`` seconds.
+    """
+
+    def __init__(self, max_size: int, ttl: float):
+        super().__init__(max_size=max_size, ttl=ttl)
+        self._tokens_by_user: dict[UUID, set[str]] = {}
+
+    def set(self, token: str, user: User, token_expires_at: float | None = None):
+        """Cache ``user`` for ``token``; ``token_expires_at`` is a unix timestamp."""
+        lifetime = self.ttl
+        if token_expires_at is not None:
+            lifetime = min(lifetime, token_expires_at - time.time())
+        super().set(token, user, ttl=lifetime)
+
+    def invalidate_user(self, user_id: UUID):
+        with self._lock:
+            for token in list(self._tokens_by_user.get(user_id, ())):
+                self._pop(token)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._tokens_by_user.clear()
+
+    def _added(self, token: str, user: User):
+        self._tokens_by_user.setdefault(user.id, set()).add(token)
+
+    def _removed(self, token: str, user: User):
+        tokens = self._tokens_by_user.get(user.id)
+        if tokens is not None:
+            tokens.discard(token)
+            if not tokens:
+                del self._tokens_by_user[user.id]
+
+
+principal_cache = PrincipalCache(
+    max_size=settings.PRINCIPAL_CACHE_MAX_SIZE,
+    ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+)
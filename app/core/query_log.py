@@ -0,0 +1,115 @@
+"""Slow-query log and N+1 detection.
+
+Replaces engine ``echo``: instead of logging every statement, only statements
+slower than ``DB_SLOW_QUERY_MS`` are logged, with their parameters attached
+for a sample of them. Per-request statement shapes are collected by the
+metrics middleware and handed to :func:`detect_n_plus_one` once the request
+is done.
+"""
+
+import logging
+import random
+import time
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from . import config
+
+settings = config.get_settings()
+
+logger = logging.getLogger("app.db")
+
+MAX_PARAMETERS_LENGTH = 500
+MAX_STATEMENT_LENGTH = 2000
+
+
+def statement_shape(statement: str, context) -> str:
+    """SQL with placeholders, before ``IN`` lists are expanded.
+
+    Two executions of the same query with different values share a shape.
+    """
+    compiled = getattr(context, "compiled", None)
+    if compiled is not None:
+        return compiled.string
+    return statement
+
+
+def _truncate(value: str, limit: int) -> str:
+    return value if len(value) <= limit else value[:limit] + "..."
+
+
+def _format_parameters(parameters, executemany: bool) -> str:
+    if executemany:
+        parameters = {"rows": len(parameters), "first": parameters[0]}
+    return _truncate(repr(parameters), MAX_PARAMETERS_LENGTH)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("slow_query_started_at", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed_ms = (time.perf_counter() - conn.info["slow_query_started_at"].pop()) * 1000
+    if elapsed_ms < settings.DB_SLOW_QUERY_MS:
+        return
+
+    extra = {"duration_ms": round(elapsed_ms, 1), "statement": statement}
+    if random.random() < settings.DB_SLOW_QUERY_PARAMS_SAMPLE_RATE:
+        extra["parameters"] = _format_parameters(parameters, executemany)
+    logger.warning(
+        "Slow query (%.1f ms): %s%s",
+        elapsed_ms,
+        _truncate(statement, MAX_STATEMENT_LENGTH),
+        f" parameters={extra['parameters']}" if "parameters" in extra else "",
+        extra=extra,
+    )
+
+
+def _handle_error(exception_context):
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("slow_query_started_at"):
+        conn.info["slow_query_started_at"].pop()
+
+
+def install_slow_query_log(engine: AsyncEngine):
+    """Log statements on ``engine`` slower than ``DB_SLOW_QUERY_MS``.
+
+    Does nothing when the threshold is unset.
+    """
+    if settings.DB_SLOW_QUERY_MS is None:
+        return
+    sync_engine = engine.sync_engine
+    if not event.contains(sync_engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(sync_engine, "handle_error", _handle_error)
+
+
+def detect_n_plus_one(
+    route: str, method: str, shapes: dict[str, int]
+) -> list[tuple[str, int]]:
+    """Warn about statement shapes run more than ``DB_N_PLUS_ONE_THRESHOLD`` times.
+
+    Returns the offending ``(shape, count)`` pairs.
+    """
+    threshold = settings.DB_N_PLUS_ONE_THRESHOLD
+    if not threshold:
+        return []
+
+    repeated = [(shape, count) for shape, count in shapes.items() if count > threshold]
+    for shape, count in repeated:
+        logger.warning(
+            "Possible N+1: %s %s ran the same statement %d times: %s",
+            method,
+            route,
+            count,
+            _truncate(shape, MAX_STATEMENT_LENGTH),
+            extra={
+                "route": route,
+                "method": method,
+                "count": count,
+                "statement": shape,
+            },
+        )
+    return repeated
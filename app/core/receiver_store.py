@@ -0,0 +1,501 @@
+"""Receivers cached in process and persisted to the ``customer`` table.
+
+Reads are answered from memory. Creates and email changes are written through
+because they need the database to hand out the id and arbitrate the unique
+email, and deletes because a receiver still on a parcel must not go. Every
+other change (renames, activation) only touches the cache and records which
+fields changed; a background task writes those columns in batches every
+``RECEIVER_FLUSH_INTERVAL_SECONDS``, so repeated changes to one receiver
+between flushes cost a single write, and two workers changing different
+fields of one receiver both keep their change. The same task pulls rows
+other workers changed since the last pass, and shutdown flushes whatever is
+left. A delete also writes a row to ``customer_tombstone``, which the task
+reads the same way to drop receivers other workers deleted; tombstones are
+pruned after ``RECEIVER_TOMBSTONE_RETENTION_SECONDS``.
+
+The cache is filled in the background at startup, a chunk at a time. Until
+it is full, reads by id fall back to the database, and listings wait.
+"""
+
+import asyncio
+import bisect
+import datetime
+import logging
+import threading
+import time
+from typing import Iterator, Optional
+
+from fastapi import HTTPException
+from sqlalchemy import delete, or_, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import DataError, IntegrityError, SQLAlchemyError
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from . import config, database
+from app.models.customer_model import Customer
+from app.models.customer_tombstone_model import CustomerTombstone
+from app.models.parcel_model import Parcel
+from app.schemas.receiver_schemas import Receiver, ReceiverCreate
+
+settings = config.get_settings()
+
+logger = logging.getLogger(__name__)
+
+# Errors that condemn a single row rather than the connection or the batch.
+ROW_ERRORS = (DataError, IntegrityError)
+
+PRUNE_INTERVAL_SECONDS = 5 * 60
+# Rows loaded between yields to the event loop while filling the cache.
+LOAD_CHUNK_SIZE = 500
+
+
+class EmailAlreadyRegisteredError(HTTPException):
+    def __init__(self):
+        super().__init__(status_code=400, detail="Email already registered")
+
+
+class ReceiverInUseError(HTTPException):
+    def __init__(self):
+        super().__init__(status_code=409, detail="Receiver is referenced by parcels")
+
+
+class ReceiverStore:
+    """In-memory receivers with an email index and an ``is_active`` index.
+
+    Every index is a sorted id list. New ids are normally the largest seen,
+    so inserts append, and a filtered page is a slice. Stored receivers are
+    never mutated in place; updates swap in a new copy, so readers holding one
+    never see a half-applied change.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reset()
+        # receiver id -> fields changed in the cache but not yet written
+        self._pending: dict[int, set[str]] = {}
+        self._synced_at: datetime.datetime | None = None
+        self._next_prune = 0.0
+        self._loaded = asyncio.Event()
+        self._flush_task: asyncio.Task | None = None
+
+    def _reset(self):
+        self._receivers: dict[int, Receiver] = {}
+        self._ids: list[int] = []
+        self._ids_by_active: dict[bool, list[int]] = {True: [], False: []}
+        self._id_by_email: dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._receivers)
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def _index(self, is_active: Optional[bool]) -> list[int]:
+        return self._ids if is_active is None else self._ids_by_active[is_active]
+
+    @staticmethod
+    def _remove_id(ids: list[int], receiver_id: int):
+        del ids[bisect.bisect_left(ids, receiver_id)]
+
+    def _put(self, receiver: Receiver):
+        """Insert or replace ``receiver`` in the cache and its indexes."""
+        existing = self._receivers.get(receiver.id)
+        self._receivers[receiver.id] = receiver
+        if existing is None:
+            bisect.insort(self._ids, receiver.id)
+            bisect.insort(self._ids_by_active[receiver.is_active], receiver.id)
+            self._id_by_email[receiver.email] = receiver.id
+            return
+
+        if receiver.email != existing.email:
+            if self._id_by_email.get(existing.email) == receiver.id:
+                del self._id_by_email[existing.email]
+            self._id_by_email[receiver.email] = receiver.id
+        if receiver.is_active != existing.is_active:
+            self._remove_id(self._ids_by_active[existing.is_active], receiver.id)
+            bisect.insort(self._ids_by_active[receiver.is_active], receiver.id)
+
+    def _drop(self, receiver_id: int) -> Receiver | None:
+        receiver = self._receivers.pop(receiver_id, None)
+        if receiver is not None:
+            self._remove_id(self._ids, receiver_id)
+            self._remove_id(self._ids_by_active[receiver.is_active], receiver_id)
+            if self._id_by_email.get(receiver.email) == receiver_id:
+                del self._id_by_email[receiver.email]
+        return receiver
+
+    def _email_taken(self, email: str, receiver_id: int | None = None) -> bool:
+        return self._id_by_email.get(email, receiver_id) != receiver_id
+
+    async def get(self, session: AsyncSession, receiver_id: int) -> Receiver | None:
+        """Cached receiver, falling back to the database for unseen ids."""
+        receiver = self._receivers.get(receiver_id)
+        if receiver is not None:
+            return receiver
+
+        customer = await session.get(Customer, receiver_id)
+        if customer is None:
+            return None
+        receiver = Receiver.model_validate(customer)
+        with self._lock:
+            if receiver_id not in self._receivers:
+                self._put(receiver)
+        return receiver
+
+    async def create(self, session: AsyncSession, data: ReceiverCreate) -> Receiver:
+        if self._email_taken(data.email):
+            raise EmailAlreadyRegisteredError()
+
+        customer = Customer(**data.model_dump())
+        session.add(customer)
+        try:
+            await session.commit()
+        except IntegrityError:
+            await session.rollback()
+            raise EmailAlreadyRegisteredError()
+        await session.refresh(customer)
+
+        receiver = Receiver.model_validate(customer)
+        with self._lock:
+            self._put(receiver)
+        return receiver
+
+    async def update(
+        self, session: AsyncSession, receiver_id: int, changes: dict
+    ) -> Receiver | None:
+        existing = await self.get(session, receiver_id)
+        if existing is None or not changes:
+            return existing
+
+        changes = dict(changes)
+        email = changes.pop("email", None)
+        if email is not None and email != existing.email:
+            if self._email_taken(email, receiver_id):
+                raise EmailAlreadyRegisteredError()
+            await self._write_email(session, receiver_id, email)
+
+        with self._lock:
+            # Re-read: the cached row may have changed while we were writing.
+            current = self._receivers.get(receiver_id)
+            if current is None:
+                return None
+            # Email was written above; the rest waits for the next flush.
+            updated = current.model_copy(
+                update={
+                    **changes,
+                    **({"email": email} if email is not None else {}),
+                    "updated_at": datetime.datetime.now(),
+                }
+            )
+            self._put(updated)
+            if changes:
+                self._pending.setdefault(receiver_id, set()).update(changes)
+        return updated
+
+    async def _write_email(self, session: AsyncSession, receiver_id: int, email: str):
+        try:
+            await session.exec(
+                update(Customer)
+                .where(Customer.id == receiver_id)
+                .values(email=email, updated_at=datetime.datetime.now())
+            )
+            await session.commit()
+        except IntegrityError:
+            await session.rollback()
+            raise EmailAlreadyRegisteredError()
+
+    async def delete(self, session: AsyncSession, receiver_id: int) -> bool:
+        """Delete the receiver row now, or raise if a parcel still refers to it."""
+        if await self.get(session, receiver_id) is None:
+            return False
+
+        referenced = await session.exec(
+            select(Parcel.id)
+            .where(
+                or_(Parcel.sender_id == receiver_id, Parcel.receiver_id == receiver_id)
+            )
+            .limit(1)
+        )
+        if referenced.first() is not None:
+            raise ReceiverInUseError()
+        connection = await session.connection()
+        dialect = postgresql if connection.dialect.name == "postgresql" else sqlite
+        deleted_at = datetime.datetime.now()
+        try:
+            result = await session.exec(
+                delete(Customer).where(Customer.id == receiver_id)
+            )
+            # Tells other workers to drop it; ids can be reused on SQLite.
+            tombstone = dialect.insert(CustomerTombstone.__table__).values(
+                customer_id=receiver_id, deleted_at=deleted_at
+            )
+            await session.exec(
+                tombstone.on_conflict_do_update(
+                    index_elements=["customer_id"], set_={"deleted_at": deleted_at}
+                )
+            )
+            await session.commit()
+        except IntegrityError:
+            # A parcel created since the check; the foreign key catches it.
+            await session.rollback()
+            raise ReceiverInUseError()
+
+        with self._lock:
+            self._drop(receiver_id)
+            self._pending.pop(receiver_id, None)
+        return result.rowcount > 0
+
+    def page(self, is_active: Optional[bool], skip: int, limit: int) -> list[Receiver]:
+        with self._lock:
+            ids = self._index(is_active)[skip : skip + limit]
+            return [self._receivers[receiver_id] for receiver_id in ids]
+
+    def iter(self, is_active: Optional[bool], skip: int = 0) -> Iterator[Receiver]:
+        """Yield matching receivers in id order, from a snapshot of the index."""
+        with self._lock:
+            ids = self._index(is_active)[skip:]
+        for receiver_id in ids:
+            receiver = self._receivers.get(receiver_id)
+            if receiver is not None:
+                yield receiver
+
+    async def flush(self, session: AsyncSession) -> int:
+        """Write every pending change in one batch; returns how many were written.
+
+        Only the changed columns are written, so a change another worker made
+        to a different field of the same receiver survives.
+        """
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            rows = [
+                self._row(self._receivers[receiver_id], fields)
+                for receiver_id, fields in pending.items()
+                if receiver_id in self._receivers
+            ]
+        if not rows:
+            return 0
+
+        try:
+            await self._write(session, rows)
+        except ROW_ERRORS:
+            # One bad row must not hold back the rest: write them one by one.
+            await session.rollback()
+            return await self._write_each(session, rows)
+        except SQLAlchemyError:
+            await session.rollback()
+            self._requeue(rows)
+            raise
+        return len(rows)
+
+    @staticmethod
+    def _row(receiver: Receiver, fields: set[str]) -> dict:
+        return {
+            "id": receiver.id,
+            **{field: getattr(receiver, field) for field in fields},
+            "updated_at": receiver.updated_at,
+        }
+
+    @staticmethod
+    async def _write(session: AsyncSession, rows: list[dict]):
+        # ORM bulk UPDATE by primary key: one executemany round trip per set
+        # of changed columns.
+        await session.exec(update(Customer), params=rows)
+        await session.commit()
+
+    async def _write_each(self, session: AsyncSession, rows: list[dict]) -> int:
+        written = 0
+        for position, row in enumerate(rows):
+            try:
+                await self._write(session, [row])
+            except ROW_ERRORS:
+                await session.rollback()
+                logger.error(
+                    "Dropping receiver change the database rejects",
+                    extra={"receiver_id": row["id"]},
+                    exc_info=True,
+                )
+                with self._lock:
+                    # The next read reloads the receiver as the database has it.
+                    if row["id"] not in self._pending:
+                        self._drop(row["id"])
+                continue
+            except SQLAlchemyError:
+                await session.rollback()
+                self._requeue(rows[position:])
+                raise
+            written += 1
+        return written
+
+    def _requeue(self, rows: list[dict]):
+        with self._lock:
+            for row in rows:
+                if row["id"] in self._receivers:
+                    self._pending.setdefault(row["id"], set()).update(
+                        row.keys() - {"id", "updated_at"}
+                    )
+
+    async def load(self, session: AsyncSession):
+        """Fill the cache from every customer row, yielding between chunks.
+
+        Receivers cached meanwhile by reads and writes are at least as new as
+        the rows being loaded, so those are kept.
+        """
+        started = datetime.datetime.now()
+        columns = Customer.__table__.columns
+        names = [column.name for column in columns]
+        result = await session.stream(select(*columns).order_by(Customer.id))
+        async for rows in result.partitions(LOAD_CHUNK_SIZE):
+            # Rows were validated when written; re-checking every email
+            # (IDNA and all) would be nine tenths of the load.
+            receivers = [
+                Receiver.model_construct(**dict(zip(names, row))) for row in rows
+            ]
+            with self._lock:
+                for receiver in receivers:
+                    if receiver.id not in self._receivers:
+                        self._put(receiver)
+            await asyncio.sleep(0)
+        self._synced_at = started
+        self._loaded.set()
+
+    async def wait_loaded(self):
+        """Wait until the cache holds every receiver, for listings."""
+        await self._loaded.wait()
+
+    async def refresh(self, session: AsyncSession):
+        """Pull rows changed by other workers since the last sync."""
+        if self._synced_at is None:
+            return await self.load(session)
+
+        started = datetime.datetime.now()
+        if started - self._synced_at > datetime.timedelta(
+            seconds=settings.RECEIVER_TOMBSTONE_RETENTION_SECONDS
+        ):
+            # Tombstones since the last sync may be pruned; check every id.
+            await self._drop_missing(session)
+        # Rows are stamped when changed but may be written up to one flush
+        # interval later; look back far enough to catch them.
+        since = self._synced_at - datetime.timedelta(
+            seconds=2 * settings.RECEIVER_FLUSH_INTERVAL_SECONDS
+        )
+        result = await session.exec(select(Customer).where(Customer.updated_at > since))
+        receivers = [Receiver.model_validate(customer) for customer in result.all()]
+        result = await session.exec(
+            select(CustomerTombstone.customer_id).where(
+                CustomerTombstone.deleted_at > since
+            )
+        )
+        deleted = result.all()
+        with self._lock:
+            for receiver in receivers:
+                current = self._receivers.get(receiver.id)
+                fields = self._pending.get(receiver.id)
+                if fields is not None and current is not None:
+                    # Take the other workers' columns, keep our unwritten ones.
+                    receiver = receiver.model_copy(
+                        update={
+                            **{field: getattr(current, field) for field in fields},
+                            "updated_at": max(current.updated_at, receiver.updated_at),
+                        }
+                    )
+                elif current is not None and current.updated_at >= receiver.updated_at:
+                    continue
+                if self._email_taken(receiver.email, receiver.id):
+                    # The previous owner changed email elsewhere; drop its stale claim.
+                    self._drop(self._id_by_email[receiver.email])
+                self._put(receiver)
+            self._synced_at = started
+            deleted = [
+                receiver_id for receiver_id in deleted if receiver_id in self._receivers
+            ]
+        await self._drop_deleted(session, deleted)
+        await self._prune(session)
+
+    async def _drop_deleted(self, session: AsyncSession, receiver_ids: list[int]):
+        """Drop cached receivers whose rows are gone."""
+        if not receiver_ids:
+            return
+        # A tombstoned id may have been reused by a row created since.
+        result = await session.exec(
+            select(Customer.id).where(Customer.id.in_(receiver_ids))
+        )
+        existing = set(result.all())
+        with self._lock:
+            for receiver_id in receiver_ids:
+                if receiver_id not in existing:
+                    self._drop(receiver_id)
+                    self._pending.pop(receiver_id, None)
+
+    async def _drop_missing(self, session: AsyncSession):
+        """Drop every cached receiver whose row is gone (a full scan)."""
+        ids = set((await session.exec(select(Customer.id))).all())
+        with self._lock:
+            missing = [
+                receiver_id for receiver_id in self._ids if receiver_id not in ids
+            ]
+        await self._drop_deleted(session, missing)
+
+    async def _prune(self, session: AsyncSession):
+        """Drop tombstones every worker has synced past, at most once per interval."""
+        if time.monotonic() < self._next_prune:
+            return
+        self._next_prune = time.monotonic() + PRUNE_INTERVAL_SECONDS
+        await session.exec(
+            delete(CustomerTombstone).where(
+                CustomerTombstone.deleted_at
+                < datetime.datetime.now()
+                - datetime.timedelta(
+                    seconds=settings.RECEIVER_TOMBSTONE_RETENTION_SECONDS
+                )
+            )
+        )
+        await session.commit()
+
+    async def _sync(self):
+        async with database.async_session_factory() as session:
+            await self.flush(session)
+            await self.refresh(session)
+
+    async def _flush_loop(self):
+        # The first pass fills the cache; a failed one is retried next interval.
+        while True:
+            try:
+                await self._sync()
+            except Exception:
+                logger.exception(
+                    "Receiver sync failed", extra={"pending": self.pending}
+                )
+            await asyncio.sleep(settings.RECEIVER_FLUSH_INTERVAL_SECONDS)
+
+    def start(self):
+        """Start the background task, which first fills the cache."""
+        self._flush_task = asyncio.create_task(self._flush_loop())
+
+    async def stop(self):
+        """Stop the background task and write out what is still pending."""
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+        if self._pending:
+            async with database.async_session_factory() as session:
+                await self.flush(session)
+
+    def clear(self):
+        """Forget every cached receiver and pending change (tests only).
+
+        The empty cache counts as loaded; tests fill it through the API.
+        """
+        with self._lock:
+            self._reset()
+            self._pending = {}
+            self._synced_at = None
+        self._loaded.set()
+
+
+receiver_store = ReceiverStore()
@@ -0,0 +1,137 @@
+"""Single-use, rotating refresh tokens.
+
+Every refresh token carries a ``jti`` and a ``fam`` (family) id. The family is
+created at login and shared by every token rotated from it. Redeeming a token
+inserts its jti into the ``revoked_token`` table, whose primary key makes
+redemption single use across workers. A token presented again after that has
+leaked, so its whole family is revoked: the thief's token and the owner's
+current one both stop working, and the owner logs in again.
+
+Revoked ids are also held in a size-bounded TTL cache, each entry expiring
+with the token it covers, so replays of known-revoked tokens are turned away
+with one dict lookup and no database work. An id evicted from the cache is
+still caught by the database.
+"""
+
+import datetime
+import logging
+import time
+
+from fastapi import HTTPException, status
+from sqlalchemy import delete, insert
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from . import config
+from .cache import TTLCache
+from app.models.revoked_token_model import RevokedToken
+
+settings = config.get_settings()
+
+logger = logging.getLogger(__name__)
+
+
+class InvalidRefreshTokenError(HTTPException):
+    def __init__(self, detail: str = "Invalid refresh token"):
+        super().__init__(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail=detail,
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+
+class RefreshTokenStore:
+    def __init__(self, max_size: int):
+        # revoked id -> True; entries live until the covered token expires
+        self._revoked: TTLCache[bool] = TTLCache(
+            max_size=max_size, ttl=settings.REFRESH_TOKEN_EXPIRE_MINUTES * 60
+        )
+        self._next_prune = 0.0
+
+    def _remember(self, token_id: str, expires_at: datetime.datetime):
+        self._revoked.set(token_id, True, ttl=expires_at.timestamp() - time.time())
+
+    def is_revoked(self, token_id: str) -> bool:
+        return self._revoked.get(token_id, False)
+
+    async def redeem(
+        self,
+        session: AsyncSession,
+        jti: str,
+        family: str,
+        expires_at: datetime.datetime,
+    ):
+        """Use up a refresh token, or raise if it was used or its family revoked."""
+        if self.is_revoked(family):
+            raise InvalidRefreshTokenError()
+        if self.is_revoked(jti):
+            await self._reused(session, family)
+
+        revoked_family = await session.get(RevokedToken, family)
+        if revoked_family is not None:
+            self._remember(family, revoked_family.expires_at)
+            raise InvalidRefreshTokenError()
+
+        try:
+            # The primary key arbitrates concurrent redemptions across workers.
+            await session.exec(
+                insert(RevokedToken.__table__).values(
+                    id=jti,
+                    family=False,
+                    expires_at=expires_at,
+                    revoked_at=datetime.datetime.now(),
+                )
+            )
+            await session.commit()
+        except IntegrityError:
+            await session.rollback()
+            await self._reused(session, family)
+        self._remember(jti, expires_at)
+        await self._prune(session)
+
+    async def _reused(self, session: AsyncSession, family: str):
+        logger.warning("Refresh token reuse detected", extra={"family": family})
+        await self.revoke_family(session, family)
+        raise InvalidRefreshTokenError("Refresh token reuse detected")
+
+    async def revoke_family(self, session: AsyncSession, family: str):
+        # Tokens rotated before now expire within one refresh lifetime.
+        expires_at = datetime.datetime.now() + datetime.timedelta(
+            minutes=settings.REFRESH_TOKEN_EXPIRE_MINUTES
+        )
+        connection = await session.connection()
+        dialect = postgresql if connection.dialect.name == "postgresql" else sqlite
+        await session.exec(
+            dialect.insert(RevokedToken.__table__)
+            .values(
+                id=family,
+                family=True,
+                expires_at=expires_at,
+                revoked_at=datetime.datetime.now(),
+            )
+            .on_conflict_do_nothing()
+        )
+        await session.commit()
+        self._remember(family, expires_at)
+
+    async def _prune(self, session: AsyncSession):
+        """Drop rows for tokens that have expired, at most once per interval."""
+        if time.monotonic() < self._next_prune:
+            return
+        self._next_prune = (
+            time.monotonic() + settings.REVOKED_TOKEN_PRUNE_INTERVAL_SECONDS
+        )
+        await session.exec(
+            delete(RevokedToken).where(
+                RevokedToken.expires_at < datetime.datetime.now()
+            )
+        )
+        await session.commit()
+
+    def clear(self):
+        """Forget every cached revocation (tests only)."""
+        self._revoked.clear()
+
+
+refresh_token_store = RefreshTokenStore(max_size=settings.REVOKED_TOKEN_CACHE_MAX_SIZE)
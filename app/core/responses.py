@@ -0,0 +1,27 @@
+from typing import Any
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json", by_alias=True)
+    return jsonable_encoder(value)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response rendered without a second validation pass.
+
+    Pydantic models are dumped straight to bytes by pydantic-core (by alias),
+    and anything else goes through orjson. Handlers that return this
+    directly skip FastAPI's response_model re-validation; the decorator's
+    response_model is still used for the OpenAPI schema.
+    """
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, BaseModel):
+            return content.__pydantic_serializer__.to_json(content, by_alias=True)
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
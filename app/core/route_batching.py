@@ -0,0 +1,108 @@
+"""Split out-for-delivery parcels among delivery staff by postal area.
+
+Batching is incremental: only parcels without a courier are placed, on top of
+what every courier already carries today. Parcels are grouped by postal area
+(a prefix of the delivery postal code) and the groups are handed out largest
+first. A group stays with a courier already serving that area while that
+keeps the courier within ``BALANCE_TOLERANCE`` of a fair share; otherwise it
+goes to the least loaded courier. Groups bigger than a fair share are split so
+no single busy area lands on one person.
+"""
+
+import heapq
+from dataclasses import dataclass, field
+
+BALANCE_TOLERANCE = 0.25
+NO_AREA = ""
+
+
+@dataclass
+class StaffLoad:
+    parcels: int = 0
+    weight: float = 0.0
+    areas: set[str] = field(default_factory=set)
+
+
+@dataclass(frozen=True)
+class PendingParcel:
+    id: int
+    postal_code: str | None
+    weight: float
+
+
+def postal_area(postal_code: str | None, length: int) -> str:
+    return postal_code.strip()[:length] if postal_code else NO_AREA
+
+
+def batch_deliveries(
+    parcels: list[PendingParcel],
+    staff: dict[int, StaffLoad],
+    area_length: int,
+) -> dict[int, list[int]]:
+    """Return new parcel ids per staff id; ``staff`` loads are updated in place."""
+    if not parcels or not staff:
+        return {}
+
+    groups: dict[str, list[PendingParcel]] = {}
+    for parcel in sorted(parcels, key=lambda p: (p.postal_code or "", p.id)):
+        groups.setdefault(postal_area(parcel.postal_code, area_length), []).append(
+            parcel
+        )
+
+    total_parcels = sum(load.parcels for load in staff.values()) + len(parcels)
+    total_weight = sum(load.weight for load in staff.values()) + sum(
+        parcel.weight for parcel in parcels
+    )
+    fair_parcels = total_parcels / len(staff)
+    fair_weight = total_weight / len(staff) or 1.0
+
+    def load_of(load: StaffLoad, parcels: int = 0, weight: float = 0.0) -> float:
+        # 1.0 means exactly a fair share of both parcels and weight.
+        return (
+            (load.parcels + parcels) / fair_parcels
+            + (load.weight + weight) / fair_weight
+        ) / 2
+
+    # Least loaded courier first. Loads only grow, so a stale entry is simply
+    # re-keyed when it reaches the top.
+    heap = [(load_of(load), staff_id) for staff_id, load in staff.items()]
+    heapq.heapify(heap)
+
+    def least_loaded() -> int:
+        while True:
+            recorded, staff_id = heap[0]
+            current = load_of(staff[staff_id])
+            if current == recorded:
+                return staff_id
+            heapq.heapreplace(heap, (current, staff_id))
+
+    chunk_size = max(1, int(fair_parcels))
+    chunks = [
+        (area, members[start : start + chunk_size])
+        for area, members in groups.items()
+        for start in range(0, len(members), chunk_size)
+    ]
+    chunks.sort(key=lambda chunk: (-len(chunk[1]), chunk[0]))
+
+    assignments: dict[int, list[int]] = {}
+    for area, chunk in chunks:
+        weight = sum(parcel.weight for parcel in chunk)
+        serving = [
+            staff_id
+            for staff_id, load in staff.items()
+            if area != NO_AREA and area in load.areas
+        ]
+        target = None
+        if serving:
+            target = min(serving, key=lambda staff_id: load_of(staff[staff_id]))
+            if load_of(staff[target], len(chunk), weight) > 1 + BALANCE_TOLERANCE:
+                target = None
+        if target is None:
+            target = least_loaded()
+
+        load = staff[target]
+        load.parcels += len(chunk)
+        load.weight += weight
+        load.areas.add(area)
+        assignments.setdefault(target, []).extend(parcel.id for parcel in chunk)
+    return assignments
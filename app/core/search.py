@@ -0,0 +1,599 @@
+"""Prefix and fuzzy search over customers and stations.
+
+On Postgres, search runs in the database against the pg_trgm GIN indexes
+added by migrations 7 and 10. SQLite has no trigram support, so there every
+searchable model keeps an in-process trigram index instead. Fuzzy matches are
+scored like pg_trgm's ``similarity`` (shared trigrams over the union of both
+trigram sets). Prefix matches need no structure of their own: a word starting
+with "smi" has the trigrams "  s", " sm" and "smi", so the entries in all of
+those postings are the candidates, and their text confirms the match.
+
+Both backends split text into words on anything but letters and digits, and
+search only the local part of email addresses: the domain is shared by too
+many rows to tell them apart. Prefix matches rank above fuzzy ones, then by
+similarity. The index holds only ids and words: hits are re-read by primary
+key, which also drops rows deleted since the last sync. Each search first
+pulls rows changed since then, at most every ``SEARCH_INDEX_REFRESH_SECONDS``.
+"""
+
+import asyncio
+import copy
+import datetime
+import logging
+import math
+import re
+import time
+from array import array
+from collections import defaultdict
+from itertools import compress, repeat
+
+import numpy as np
+from sqlalchemy import and_, func, literal_column, or_, text
+from sqlmodel import SQLModel, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from . import config, database
+from app.models.customer_model import Customer
+from app.models.station_model import Station
+
+settings = config.get_settings()
+
+logger = logging.getLogger(__name__)
+
+_WORD = re.compile(r"[^\W_]+")
+# Prefix matches ranked per search, so "a" stays cheap.
+PREFIX_SCAN_LIMIT = 1000
+PREFIX_CHUNK_SIZE = 4096
+# Posting entries read for fuzzy candidates per search; see _fuzzy_matches().
+FUZZY_SCAN_LIMIT = 20_000
+# Rows indexed between yields to the event loop while building.
+BUILD_CHUNK_SIZE = 2000
+# Compact once entries put or removed since the last compact pass this share
+# of the index (and this floor), so changed rows do not pile up.
+COMPACT_SHARE = 0.1
+COMPACT_MIN_ENTRIES = 10_000
+
+
+def words(value: str) -> list[str]:
+    return _WORD.findall(value.lower())
+
+
+def _word_trigrams(value_words: list[str]) -> set[str]:
+    grams = set()
+    for word in value_words:
+        padded = f"  {word} "
+        grams.update(padded[i : i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def _start_trigrams(word: str) -> set[str]:
+    """Trigrams of every word that starts with ``word``: no trailing pad."""
+    padded = f"  {word}"
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+def trigrams(value: str) -> set[str]:
+    """pg_trgm's trigrams: each word padded with two spaces before, one after."""
+    return _word_trigrams(words(value))
+
+
+def local_part(email: str | None) -> str | None:
+    return email if email is None else email.partition("@")[0]
+
+
+def _contains(posting: np.ndarray, entries: np.ndarray) -> np.ndarray:
+    # Postings are sorted (entries only ever grow), so binary search.
+    positions = np.searchsorted(posting, entries)
+    positions[positions == len(posting)] = 0
+    return posting[positions] == entries
+
+
+class TrigramIndex:
+    """Trigram postings over a fixed number of text fields per document.
+
+    Each (document, field) pair is an entry holding the field's words, and a
+    document's entries are consecutive. Postings from :meth:`extend` are
+    folded by :meth:`compact` into one array sorted by trigram, four bytes
+    each; entries from :meth:`put` go to small per-trigram arrays. Entries are
+    append-only between compacts: changing a document marks its old entries
+    dead and appends new ones, and :meth:`compact` drops the dead ones.
+    """
+
+    def __init__(self, width: int):
+        self._width = width  # fields per document
+        # trigram -> id, numbered as first seen
+        self._gram_ids: defaultdict[str, int] = defaultdict()
+        # Bound to the dict, not to self, so a compacted copy frees this index.
+        self._gram_ids.default_factory = self._gram_ids.__len__
+        # Postings of trigram g: _postings[_offsets[g] : _offsets[g + 1]]
+        self._offsets = np.zeros(1, dtype=np.int64)
+        self._postings = np.zeros(0, dtype=np.int32)
+        self._unsorted = (array("i"), array("i"))  # (trigram, entry) to compact
+        self._added: dict[int, array] = {}  # trigram -> entries put since
+        self._arrays: dict[int, np.ndarray] = {}  # merged postings, on demand
+        self._strings: list[str] = []  # entry -> its words, space separated
+        self._docs = np.zeros(0, dtype=np.int64)  # entry -> document id
+        self._sizes = np.zeros(0, dtype=np.int32)  # entry -> trigram count
+        self._live = np.zeros(0, dtype=bool)
+        # document id -> first entry, or -1; ids are autoincrement keys
+        self._first = np.zeros(0, dtype=np.int64)
+        self._count = 0
+        self._size = 0
+        self._compacted = 0  # entries as of the last compact
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _first_entry(self, doc_id: int) -> int:
+        return int(self._first[doc_id]) if doc_id < len(self._first) else -1
+
+    def _add(self, doc_id: int, texts, sort_later: bool):
+        first = self._count
+        if first + self._width > len(self._docs):
+            capacity = max(1024, 2 * (first + self._width))
+            self._docs = np.resize(self._docs, capacity)
+            self._sizes = np.resize(self._sizes, capacity)
+            self._live = np.resize(self._live, capacity)
+        if doc_id >= len(self._first):
+            grown = np.full(max(1024, 2 * doc_id + 1), -1, dtype=np.int64)
+            grown[: len(self._first)] = self._first
+            self._first = grown
+        self._first[doc_id] = first
+
+        unsorted_grams, unsorted_entries = self._unsorted
+        for entry, value in enumerate(texts, start=first):
+            value_words = words(value or "")
+            gram_ids = list(
+                map(self._gram_ids.__getitem__, _word_trigrams(value_words))
+            )
+            self._strings.append(" ".join(value_words))
+            self._docs[entry] = doc_id
+            self._sizes[entry] = len(gram_ids)
+            self._live[entry] = True
+            if sort_later:
+                unsorted_grams.extend(gram_ids)
+                unsorted_entries.extend(repeat(entry, len(gram_ids)))
+                continue
+            for gram_id in gram_ids:
+                self._added.setdefault(gram_id, array("i")).append(entry)
+                self._arrays.pop(gram_id, None)
+        self._count += self._width
+        self._size += 1
+
+    def extend(self, rows):
+        """Index ``(doc_id, *texts)`` rows of new documents.
+
+        They are not searchable until :meth:`compact` sorts them in.
+        """
+        for doc_id, *texts in rows:
+            self._add(doc_id, texts, sort_later=True)
+
+    def compact(self):
+        """Sort new postings into place and drop the entries of removed documents.
+
+        Attributes are replaced, never changed in place, so a copy can be
+        compacted while the original goes on serving; see :meth:`compacted`.
+        """
+        count = self._count
+        unsorted_grams, unsorted_entries = self._unsorted
+        added = self._added
+        base = np.repeat(
+            np.arange(len(self._offsets) - 1, dtype=np.int32), np.diff(self._offsets)
+        )
+        grams = np.concatenate(
+            [
+                base,
+                np.frombuffer(unsorted_grams, dtype=np.int32),
+                np.repeat(
+                    np.fromiter(added, dtype=np.int32, count=len(added)),
+                    [len(entries) for entries in added.values()],
+                ).astype(np.int32),
+            ]
+        )
+        entries = np.concatenate(
+            [
+                self._postings,
+                np.frombuffer(unsorted_entries, dtype=np.int32),
+                *(np.frombuffer(entries, dtype=np.int32) for entries in added.values()),
+            ]
+        )
+        del base, unsorted_grams, unsorted_entries, added
+        self._unsorted = (array("i"), array("i"))
+        self._added = {}
+        self._arrays = {}
+
+        new = len(self._postings)
+        if np.any(entries[new + 1 :] < entries[new:-1]):
+            # put() and extend() interleaved; new entries must be in order.
+            order = np.argsort(entries[new:], kind="stable")
+            grams[new:], entries[new:] = grams[new:][order], entries[new:][order]
+
+        live = self._live[:count]
+        if not live.all():
+            keep = live[entries]
+            # Renumbering keeps entry order, so postings stay ascending.
+            renumber = np.cumsum(live, dtype=np.int32) - 1
+            grams, entries = grams[keep], renumber[entries[keep]]
+            self._strings = list(compress(self._strings, live.tolist()))
+            self._docs = self._docs[:count][live]
+            self._sizes = self._sizes[:count][live]
+            self._live = np.ones(len(self._docs), dtype=bool)
+            first = self._first.copy()
+            linked = first >= 0
+            first[linked] = renumber[first[linked]]
+            self._first = first
+            self._count = len(self._docs)
+
+        # Stable, so each trigram's entries stay ascending.
+        self._postings = entries[np.argsort(grams, kind="stable")]
+        counts = np.bincount(grams, minlength=len(self._gram_ids))
+        self._offsets = np.concatenate([[0], np.cumsum(counts)])
+        self._compacted = self._count
+
+    def compacted(self) -> "TrigramIndex":
+        """A compacted copy; this index is left as it was."""
+        index = copy.copy(self)
+        index.compact()
+        return index
+
+    def needs_compact(self) -> bool:
+        """Whether enough was put or removed since the last compact to redo it."""
+        added = self._count - self._compacted
+        dead = self._count - self._size * self._width
+        return added + dead > max(COMPACT_MIN_ENTRIES, COMPACT_SHARE * self._count)
+
+    def build(self, rows):
+        """Index many ``(doc_id, *texts)`` rows into an empty index at once."""
+        self.extend(rows)
+        self.compact()
+
+    def put(self, doc_id: int, texts: tuple):
+        """Index ``texts`` for ``doc_id``, replacing what it had before."""
+        first = self._first_entry(doc_id)
+        if first >= 0 and self._strings[first : first + self._width] == [
+            " ".join(words(value or "")) for value in texts
+        ]:
+            return
+        self.remove(doc_id)
+        self._add(doc_id, texts, sort_later=False)
+
+    def remove(self, doc_id: int):
+        # Dead entries stay in the postings and are skipped at query time
+        # until the next compact.
+        first = self._first_entry(doc_id)
+        if first < 0:
+            return
+        self._live[first : first + self._width] = False
+        self._first[doc_id] = -1
+        self._size -= 1
+
+    def _posting(self, gram: str) -> np.ndarray | None:
+        gram_id = self._gram_ids.get(gram)
+        if gram_id is None:
+            return None
+        posting = self._arrays.get(gram_id)
+        if posting is not None:
+            return posting
+        if gram_id + 1 < len(self._offsets):
+            start, stop = self._offsets[gram_id], self._offsets[gram_id + 1]
+            posting = self._postings[start:stop]
+        else:
+            posting = self._postings[:0]
+        added = self._added.get(gram_id)
+        if added is not None:
+            posting = self._arrays[gram_id] = np.concatenate(
+                [posting, np.array(added, dtype=np.int32)]
+            )
+        return posting if len(posting) else None
+
+    def _prefix_matches(self, needle_words: list[str]) -> np.ndarray:
+        """Live entries with a run of words starting with ``needle_words``."""
+        *whole, last = needle_words
+        postings = [
+            self._posting(gram)
+            for gram in _word_trigrams(whole) | _start_trigrams(last)
+        ]
+        if any(posting is None for posting in postings):
+            return np.zeros(0, dtype=np.int32)
+
+        postings.sort(key=len)
+        rarest, others = postings[0], postings[1:]
+        needle = " ".join(needle_words)
+        # "  a" and " ab" only occur at the start of a word; a longer needle
+        # can have every trigram without the run of words, so check the text.
+        exact = not whole and len(last) <= 2
+        found, total = [], 0
+        for start in range(0, len(rarest), PREFIX_CHUNK_SIZE):
+            chunk = rarest[start : start + PREFIX_CHUNK_SIZE]
+            for posting in others:
+                chunk = chunk[_contains(posting, chunk)]
+            chunk = chunk[self._live[chunk]]
+            if not exact:
+                chunk = np.array(
+                    [
+                        entry
+                        for entry in chunk.tolist()
+                        if self._strings[entry].startswith(needle)
+                        or f" {needle}" in self._strings[entry]
+                    ],
+                    dtype=np.int32,
+                )
+            found.append(chunk)
+            total += len(chunk)
+            if total >= PREFIX_SCAN_LIMIT:
+                break
+        return np.concatenate(found)[:PREFIX_SCAN_LIMIT]
+
+    def _similarity(
+        self, gram_count: int, entries: np.ndarray, shared: np.ndarray
+    ) -> np.ndarray:
+        return shared / (gram_count + self._sizes[entries] - shared)
+
+    def _fuzzy_matches(
+        self,
+        gram_count: int,
+        postings: list[np.ndarray],
+        limit: int,
+        min_similarity: float,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Entries at least ``min_similarity`` alike, with their similarity.
+
+        ``postings`` are those of the needle's ``gram_count`` trigrams that
+        occur at all, rarest first.
+        """
+        # Similarity is at most shared / gram_count, so a match shares at least
+        # `needed` trigrams and appears in one of the rarest
+        # gram_count - needed + 1 postings. Candidates come from those; the
+        # common postings are only probed for candidates that could still
+        # reach min_similarity, rarest first.
+        needed = max(1, math.ceil(min_similarity * gram_count - 1e-9))
+        split = max(0, len(postings) - needed + 1)
+        # Common trigrams ("  j", "son") bring in many weak candidates. Past
+        # FUZZY_SCAN_LIMIT read fewer, rarer postings instead: that finds only
+        # entries sharing more trigrams, which is where the best matches are.
+        read = np.cumsum([len(posting) for posting in postings[:split]])
+        split = min(
+            split, max(1, int(np.searchsorted(read, FUZZY_SCAN_LIMIT, "right")))
+        )
+        rare, common = postings[:split], postings[split:]
+        matches = np.concatenate(rare) if rare else np.zeros(0, dtype=np.int32)
+        if len(matches) > self._count // 4:
+            # Unselective query: counting beats sorting.
+            shared = np.bincount(matches, minlength=self._count)
+            fuzzy = np.flatnonzero(shared).astype(np.int32)
+            shared = shared[fuzzy]
+        else:
+            fuzzy, shared = np.unique(matches, return_counts=True)
+        live = self._live[fuzzy]
+        fuzzy, shared = fuzzy[live], shared[live].astype(np.int32)
+        sizes = self._sizes[fuzzy]
+        # A document has one entry per field; keep enough to fill the limit.
+        top = limit * self._width
+        for unread in range(len(common), -1, -1):
+            # Scores only grow as postings are read, so the top-th best score
+            # so far is a floor too. Drop candidates that cannot reach it.
+            floor = min_similarity
+            if len(fuzzy) > top:
+                so_far = shared / (gram_count + sizes - shared)
+                floor = max(floor, np.partition(so_far, -top)[-top])
+            best_case = np.minimum(shared + unread, sizes)
+            viable = best_case >= floor * (gram_count + sizes - best_case)
+            fuzzy, shared, sizes = fuzzy[viable], shared[viable], sizes[viable]
+            if unread:
+                shared += _contains(common[-unread], fuzzy)
+        scores = self._similarity(gram_count, fuzzy, shared)
+        keep = scores >= min_similarity
+        fuzzy, scores = fuzzy[keep], scores[keep]
+        if len(fuzzy) > top:
+            best = np.argpartition(-scores, top - 1)[:top]
+            fuzzy, scores = fuzzy[best], scores[best]
+        return fuzzy, scores
+
+    def search(
+        self, query: str, limit: int, min_similarity: float
+    ) -> list[tuple[int, float]]:
+        """Best ``limit`` documents as ``(doc_id, similarity)``, best first."""
+        needle_words = words(query)
+        if not needle_words:
+            return []
+
+        grams = _word_trigrams(needle_words)
+        postings = sorted(
+            (p for p in map(self._posting, grams) if p is not None), key=len
+        )
+        prefix = self._prefix_matches(needle_words)
+        shared = np.zeros(len(prefix), dtype=np.int64)
+        for posting in postings:
+            shared += _contains(posting, prefix)
+        prefix_scores = self._similarity(len(grams), prefix, shared)
+
+        if len(np.unique(self._docs[prefix])) >= limit:
+            # Prefix matches fill the page and always rank first.
+            fuzzy, fuzzy_scores = np.zeros(0, dtype=np.int32), np.zeros(0)
+        else:
+            fuzzy, fuzzy_scores = self._fuzzy_matches(
+                len(grams), postings, limit, min_similarity
+            )
+
+        candidates = np.concatenate([prefix, fuzzy])
+        scores = np.concatenate([prefix_scores, fuzzy_scores])
+        # Prefix matches first, then by similarity, then by id for stable order.
+        ranks = scores + np.concatenate([np.ones(len(prefix)), np.zeros(len(fuzzy))])
+        order = np.lexsort((self._docs[candidates], -ranks))
+
+        results: dict[int, float] = {}
+        for index in order:
+            doc_id = int(self._docs[candidates[index]])
+            if doc_id not in results:
+                results[doc_id] = round(float(scores[index]), 4)
+                if len(results) == limit:
+                    break
+        return list(results.items())
+
+
+class ModelSearch:
+    """Search one model's text ``fields``, in the database or in process.
+
+    Of the fields named in ``emails``, only the local part is searched.
+    """
+
+    def __init__(
+        self,
+        model: type[SQLModel],
+        fields: tuple[str, ...],
+        emails: tuple[str, ...] = (),
+    ):
+        self.model = model
+        self.fields = fields
+        self.emails = emails
+        self._index = TrigramIndex(len(fields))
+        self._lock = asyncio.Lock()
+        self._synced_at: datetime.datetime | None = None
+        self._checked_at = 0.0
+        self._warming: asyncio.Task | None = None
+
+    def index_texts(self, values) -> tuple:
+        """What the index holds for a row's ``fields`` values."""
+        return tuple(
+            local_part(value) if field in self.emails else value
+            for field, value in zip(self.fields, values)
+        )
+
+    def _columns(self):
+        return [getattr(self.model, field) for field in self.fields]
+
+    def _fresh(self) -> bool:
+        elapsed = time.monotonic() - self._checked_at
+        return elapsed < settings.SEARCH_INDEX_REFRESH_SECONDS
+
+    async def _build(self, session: AsyncSession) -> TrigramIndex:
+        """Index every row, yielding to the event loop between chunks."""
+        index = TrigramIndex(len(self.fields))
+        result = await session.stream(select(self.model.id, *self._columns()))
+        async for rows in result.partitions(BUILD_CHUNK_SIZE):
+            index.extend(
+                (doc_id, *self.index_texts(values)) for doc_id, *values in rows
+            )
+            await asyncio.sleep(0)
+        # Sorting the postings is numpy work, which releases the GIL.
+        await asyncio.to_thread(index.compact)
+        return index
+
+    async def sync(self, session: AsyncSession):
+        """Load the index, or pull rows changed since the last sync."""
+        if self._fresh() or (self._lock.locked() and self._synced_at is not None):
+            return  # a sync is under way; search the index as it stands
+        async with self._lock:
+            if self._fresh():
+                return
+            started = datetime.datetime.now()
+            if self._synced_at is None:
+                self._index = await self._build(session)
+            else:
+                # Rows are stamped when changed but some are written later
+                # (receivers are write-behind); look back to catch them.
+                since = self._synced_at - datetime.timedelta(
+                    seconds=2 * settings.SEARCH_INDEX_REFRESH_SECONDS
+                    + settings.RECEIVER_FLUSH_INTERVAL_SECONDS
+                )
+                result = await session.exec(
+                    select(self.model.id, *self._columns()).where(
+                        self.model.updated_at > since
+                    )
+                )
+                for doc_id, *values in result.all():
+                    self._index.put(doc_id, self.index_texts(values))
+            self._synced_at = started
+            self._checked_at = time.monotonic()
+            if self._index.needs_compact():
+                # Searches keep using the current index until the swap.
+                self._index = await asyncio.to_thread(self._index.compacted)
+
+    async def search(
+        self, session: AsyncSession, query: str, limit: int
+    ) -> list[tuple[SQLModel, float]]:
+        if session.bind.dialect.name == "postgresql":
+            return await self._search_postgres(session, query, limit)
+
+        await self.sync(session)
+        hits = self._index.search(query, limit, settings.SEARCH_MIN_SIMILARITY)
+        if not hits:
+            return []
+        result = await session.exec(
+            select(self.model).where(self.model.id.in_([doc_id for doc_id, _ in hits]))
+        )
+        rows = {row.id: row for row in result.all()}
+        return [(rows[doc_id], score) for doc_id, score in hits if doc_id in rows]
+
+    def _search_columns(self):
+        """The searched expressions, each backed by a trigram index."""
+        return [
+            # Literal arguments, so the planner matches the expression index.
+            (
+                func.split_part(column, literal_column("'@'"), literal_column("1"))
+                if field in self.emails
+                else column
+            )
+            for field, column in zip(self.fields, self._columns())
+        ]
+
+    async def _search_postgres(
+        self, session: AsyncSession, query: str, limit: int
+    ) -> list[tuple[SQLModel, float]]:
+        needle_words = words(query)
+        if not needle_words:
+            return []
+        # Words are letters and digits only, so there is nothing to escape.
+        needle = " ".join(needle_words)
+        columns = self._search_columns()
+        similarity = func.greatest(*(func.similarity(c, needle) for c in columns))
+        prefixes = []
+        for column in columns:
+            # Split into words as words() does, then match at a word start.
+            spaced = func.regexp_replace(func.lower(column), "[^[:alnum:]]+", " ", "g")
+            prefixes.append(
+                and_(
+                    column.ilike(f"%{'%'.join(needle_words)}%"),  # index-backed
+                    or_(spaced.like(f"{needle}%"), spaced.like(f"% {needle}%")),
+                )
+            )
+        prefix = or_(*prefixes)
+        # `%` uses this threshold; local to the transaction.
+        await session.exec(
+            text("SELECT set_config('pg_trgm.similarity_threshold', :t, true)"),
+            params={"t": str(settings.SEARCH_MIN_SIMILARITY)},
+        )
+        result = await session.exec(
+            select(self.model, similarity)
+            .where(or_(prefix, *(c.op("%")(needle) for c in columns)))
+            .order_by(prefix.desc(), similarity.desc(), self.model.id)
+            .limit(limit)
+        )
+        return [(row, round(float(score), 4)) for row, score in result.all()]
+
+    async def _warm(self):
+        try:
+            async with database.async_session_factory() as session:
+                if session.bind.dialect.name != "postgresql":
+                    await self.sync(session)
+        except Exception:
+            logger.exception(
+                "Search index build failed", extra={"model": self.model.__name__}
+            )
+
+    def warm(self):
+        """Start loading the in-process index without holding up startup.
+
+        Searches that arrive before it is ready wait for it.
+        """
+        self._warming = asyncio.create_task(self._warm())
+
+    def clear(self):
+        """Forget the in-process index (tests only)."""
+        self._index = TrigramIndex(len(self.fields))
+        self._synced_at = None
+        self._checked_at = 0.0
+
+
+customer_search = ModelSearch(Customer, ("name", "email"), emails=("email",))
+station_search = ModelSearch(Station, ("name", "city"))
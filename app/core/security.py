@@ -1,4 +1,5 @@
 import datetime
+import uuid
 from jose import jwt
 from . import config
 
@@ -16,7 +17,7 @@ def create_access_token(data: dict, expires_delta: datetime.timedelta | None = N
         expire = datetime.datetime.now(tz=datetime.timezone.utc) + datetime.timedelta(
             minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES
         )
-    to_encode.update({"exp": expire, "sub": str(data.get("sub", 0))})
+    to_encode.update({"exp": expire, "sub": str(data.get("sub", 0)), "type": "access"})
 
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
@@ -25,6 +26,7 @@ def create_access_token(data: dict, expires_delta: datetime.timedelta | None = N
 def create_refresh_token(
     data: dict, expires_delta: datetime.timedelta | None = None
 ) -> str:
+    """Single-use refresh token; pass ``fam`` in ``data`` to rotate a family."""
     to_encode = data.copy()
     if expires_delta:
         expire = datetime.datetime.now(tz=datetime.timezone.utc) + expires_delta
@@ -32,6 +34,14 @@ def create_refresh_token(
         expire = datetime.datetime.now(tz=datetime.timezone.utc) + datetime.timedelta(
             minutes=settings.REFRESH_TOKEN_EXPIRE_MINUTES
         )
-    to_encode.update({"exp": expire, "sub": str(data.get("sub", 0))})
+    to_encode.update(
+        {
+            "exp": expire,
+            "sub": str(data.get("sub", 0)),
+            "type": "refresh",
+            "jti": uuid.uuid4().hex,
+            "fam": data.get("fam") or uuid.uuid4().hex,
+        }
+    )
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
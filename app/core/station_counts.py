@@ -0,0 +1,77 @@
+"""Incremental upkeep of the ``station_parcel_count`` rollup.
+
+Writers describe each parcel before and after a change; the difference is
+applied as ``count = count + delta`` upserts in the caller's transaction, so
+concurrent writers never overwrite each other's counts.
+"""
+
+from collections import Counter
+from typing import NamedTuple
+
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.models.parcel_model import Parcel, ParcelStatus
+from app.models.station_parcel_count_model import StationParcelCount
+
+ORIGIN = "origin"
+DESTINATION = "destination"
+
+CountKey = tuple[int, str, ParcelStatus]
+
+
+class ParcelPlacement(NamedTuple):
+    origin_station_id: int | None
+    destination_station_id: int | None
+    status: ParcelStatus
+
+    @classmethod
+    def of(cls, parcel: Parcel) -> "ParcelPlacement":
+        return cls(
+            parcel.origin_station_id, parcel.destination_station_id, parcel.status
+        )
+
+    def keys(self) -> list[CountKey]:
+        keys = []
+        if self.origin_station_id is not None:
+            keys.append((self.origin_station_id, ORIGIN, self.status))
+        if self.destination_station_id is not None:
+            keys.append((self.destination_station_id, DESTINATION, self.status))
+        return keys
+
+
+def count_deltas(
+    before: ParcelPlacement | None,
+    after: ParcelPlacement | None,
+    deltas: Counter | None = None,
+) -> Counter:
+    """Add the change from ``before`` to ``after`` (None: no parcel) to ``deltas``."""
+    deltas = Counter() if deltas is None else deltas
+    if before is not None:
+        for key in before.keys():
+            deltas[key] -= 1
+    if after is not None:
+        for key in after.keys():
+            deltas[key] += 1
+    return deltas
+
+
+async def apply_count_deltas(session: AsyncSession, deltas: Counter):
+    """Upsert ``deltas`` in one executemany; the caller commits."""
+    rows = [
+        {"station_id": station_id, "role": role, "status": status, "count": delta}
+        for (station_id, role, status), delta in deltas.items()
+        if delta
+    ]
+    if not rows:
+        return
+
+    connection = await session.connection()
+    dialect = postgresql if connection.dialect.name == "postgresql" else sqlite
+    table = StationParcelCount.__table__
+    statement = dialect.insert(table)
+    statement = statement.on_conflict_do_update(
+        index_elements=[table.c.station_id, table.c.role, table.c.status],
+        set_={"count": table.c.count + statement.excluded.count},
+    )
+    await session.exec(statement, params=rows)
@@ -0,0 +1,55 @@
+from typing import AsyncIterable, Iterable, Literal
+
+from fastapi import Request
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+JSON_MEDIA_TYPE = "application/json"
+
+StreamFormat = Literal["ndjson", "json"]
+
+
+def stream_format(request: Request, stream: bool = False) -> StreamFormat | None:
+    """Pick a streaming format from the Accept header.
+
+    ``Accept: application/x-ndjson`` always streams NDJSON. Otherwise
+    ``stream=true`` streams a chunked JSON array, and None means the caller
+    should build a regular paged response.
+    """
+    if NDJSON_MEDIA_TYPE in request.headers.get("accept", ""):
+        return "ndjson"
+    if stream:
+        return "json"
+    return None
+
+
+async def _aiter(items: Iterable | AsyncIterable):
+    if hasattr(items, "__aiter__"):
+        async for item in items:
+            yield item
+    else:
+        for item in items:
+            yield item
+
+
+async def _encode(items, fmt: StreamFormat):
+    if fmt == "ndjson":
+        async for item in _aiter(items):
+            yield item.model_dump_json(by_alias=True) + "\n"
+        return
+
+    yield "["
+    first = True
+    async for item in _aiter(items):
+        yield ("" if first else ",") + item.model_dump_json(by_alias=True)
+        first = False
+    yield "]"
+
+
+def stream_models(
+    items: Iterable[BaseModel] | AsyncIterable[BaseModel], fmt: StreamFormat
+) -> StreamingResponse:
+    """Serialize models one at a time as they are produced."""
+    media_type = NDJSON_MEDIA_TYPE if fmt == "ndjson" else JSON_MEDIA_TYPE
+    return StreamingResponse(_encode(items, fmt), media_type=media_type)
@@ -1,8 +1,16 @@
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from app.core.database import (
     init_db,
     close_db,
+    get_pool_status,
 )
+from app.core.log import start_logging, stop_logging
+from app.core.password_pool import password_pool
+from app.core.receiver_store import receiver_store
+from app.core.search import customer_search, station_search
+from app.core.metrics import MetricsMiddleware, registry
+from app.core.responses import FastJSONResponse
 from app.routers.routers import router
 from contextlib import asynccontextmanager
 
@@ -10,9 +18,16 @@ from contextlib import asynccontextmanager
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan manager."""
-    await init_db()  # This already handles drop, create, and init
+    start_logging()
+    await init_db()  # Creates the engine and applies pending migrations
+    receiver_store.start()  # Fills the receiver cache in the background
+    customer_search.warm()  # SQLite only; builds in the background
+    station_search.warm()
     yield
+    await receiver_store.stop()  # Writes out buffered receiver changes
     await close_db()
+    password_pool.shutdown()
+    stop_logging()
 
 
 app = FastAPI(
@@ -20,6 +35,7 @@ app = FastAPI(
     description="A simple API for managing items and users.",
     version="1.0.0",
     lifespan=lifespan,
+    default_response_class=FastJSONResponse,
 )
 
 
@@ -28,4 +44,22 @@ async def root():
     return {"message": "Hello World"}
 
 
+@app.get("/health/db", include_in_schema=False)
+async def database_health():
+    return get_pool_status()
+
+
+@app.get("/health/password-pool", include_in_schema=False)
+async def password_pool_health():
+    return password_pool.stats()
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    return PlainTextResponse(
+        registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
 app.include_router(router, prefix="/api/v1")
+app.add_middleware(MetricsMiddleware)
@@ -17,7 +17,7 @@ class CustomerBase(SQLModel):
 class Customer(CustomerBase, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
     created_at: datetime = Field(default_factory=datetime.now)
-    updated_at: datetime = Field(default_factory=datetime.now)
+    updated_at: datetime = Field(default_factory=datetime.now, index=True)
 
     # Relationships
     sent_parcels: list["Parcel"] = Relationship(
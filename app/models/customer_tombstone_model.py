@@ -0,0 +1,16 @@
+import datetime
+
+from sqlmodel import SQLModel, Field
+
+
+class CustomerTombstone(SQLModel, table=True):
+    """A deleted customer, so other workers can drop it from their caches.
+
+    Rows are only needed until every worker has synced past ``deleted_at``,
+    after which they are pruned.
+    """
+
+    __tablename__ = "customer_tombstone"
+
+    customer_id: int = Field(primary_key=True)  # no foreign key: the row is gone
+    deleted_at: datetime.datetime = Field(index=True)
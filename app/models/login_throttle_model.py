@@ -0,0 +1,12 @@
+from sqlmodel import SQLModel, Field
+
+
+class LoginThrottleBucket(SQLModel, table=True):
+    """A login token bucket shared by every worker (database backend only)."""
+
+    __tablename__ = "login_throttle"
+
+    key: str = Field(primary_key=True)  # "ip:<address>" or "user:<login>"
+    tokens: float
+    updated_at: float = Field(index=True)  # unix time of the last attempt
+    granted: bool = Field(default=True)  # whether the last attempt got a token
@@ -32,6 +32,7 @@ class ParcelBase(SQLModel):
     status: ParcelStatus = Field(default=ParcelStatus.CREATED)
     description: Optional[str] = None
     special_instructions: Optional[str] = None
+    delivery_postal_code: Optional[str] = Field(default=None, index=True)
 
 
 class Parcel(ParcelBase, table=True):
@@ -0,0 +1,18 @@
+import datetime
+
+from sqlmodel import SQLModel, Field
+
+
+class RevokedToken(SQLModel, table=True):
+    """A redeemed refresh token (by jti) or a revoked token family.
+
+    Rows are only needed until every token they cover has expired, after
+    which ``expires_at`` lets them be pruned.
+    """
+
+    __tablename__ = "revoked_token"
+
+    id: str = Field(primary_key=True)  # jti or family id
+    family: bool = Field(default=False)
+    expires_at: datetime.datetime = Field(index=True)
+    revoked_at: datetime.datetime = Field(default_factory=datetime.datetime.now)
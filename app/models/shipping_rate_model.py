@@ -0,0 +1,19 @@
+from typing import Optional
+from datetime import datetime
+from decimal import Decimal
+from sqlmodel import SQLModel, Field, UniqueConstraint
+
+
+class ShippingRateBase(SQLModel):
+    origin_station_id: int = Field(foreign_key="station.id", index=True)
+    destination_station_id: int = Field(foreign_key="station.id", index=True)
+    base_price: Decimal
+    price_per_kg: Decimal  # per billable kg
+
+
+class ShippingRate(ShippingRateBase, table=True):
+    __table_args__ = (UniqueConstraint("origin_station_id", "destination_station_id"),)
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    created_at: datetime = Field(default_factory=datetime.now)
+    updated_at: datetime = Field(default_factory=datetime.now)
@@ -0,0 +1,18 @@
+from sqlmodel import SQLModel, Field
+
+from .parcel_model import ParcelStatus
+
+
+class StationParcelCount(SQLModel, table=True):
+    """Rollup of parcels per station, role and status.
+
+    Maintained in the same transaction as every parcel write, so reading it
+    never needs a GROUP BY over the parcel table.
+    """
+
+    __tablename__ = "station_parcel_count"
+
+    station_id: int = Field(foreign_key="station.id", primary_key=True)
+    role: str = Field(primary_key=True)  # "origin" or "destination"
+    status: ParcelStatus = Field(primary_key=True)
+    count: int = Field(default=0)
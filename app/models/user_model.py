@@ -6,7 +6,7 @@ import pydantic
 from pydantic import BaseModel, ConfigDict
 from sqlmodel import SQLModel, Field
 
-import bcrypt
+from app.core.password_pool import password_pool
 
 
 class BaseUser(BaseModel):
@@ -31,6 +31,10 @@ class User(BaseUser):
 class DBUser(BaseUser, SQLModel, table=True):
     id: UUID = Field(default_factory=uuid.uuid4, primary_key=True)
 
+    # Unique indexes back both the 409 on create/update and the login lookup.
+    email: str = Field(unique=True, index=True)
+    username: str = Field(unique=True, index=True)
+
     password: str
 
     register_date: datetime.datetime = Field(default_factory=datetime.datetime.now)
@@ -39,17 +43,13 @@ class DBUser(BaseUser, SQLModel, table=True):
     status: str = Field(default="active")
 
     async def get_encrypted_password(self, plain_password):
-        return bcrypt.hashpw(
-            plain_password.encode("utf-8"), salt=bcrypt.gensalt()
-        ).decode("utf-8")
+        return await password_pool.hash_password(plain_password)
 
     async def set_password(self, plain_password):
         self.password = await self.get_encrypted_password(plain_password)
 
     async def verify_password(self, plain_password):
-        return bcrypt.checkpw(
-            plain_password.encode("utf-8"), self.password.encode("utf-8")
-        )
+        return await password_pool.verify_password(plain_password, self.password)
 
 
 class Token(BaseModel):
@@ -61,3 +61,7 @@ class Token(BaseModel):
     scope: str
     issued_at: datetime.datetime
     user_id: UUID
+
+
+class RefreshTokenRequest(BaseModel):
+    refresh_token: str
@@ -10,6 +10,7 @@ class VehicleBase(SQLModel):
     license_plate: str = Field(unique=True, index=True)
     type: str = Field(index=True)  # truck, van, motorcycle, etc.
     capacity: float  # in kg
+    volume_capacity: Optional[float] = None  # in m^3; None means unlimited
     is_active: bool = Field(default=True)
 
 
@@ -1,7 +1,15 @@
 from fastapi import APIRouter
 from app.routers.v1.users_router import router as users_router
+from app.routers.v1.user_import_router import router as user_import_router
 from app.routers.v1.authentication_router import router as auth_router
+from app.routers.v1.parcels_router import router as parcels_router
+from app.routers.v1.receivers import router as receivers_router
+from app.routers.v1.search_router import router as search_router
 
 router = APIRouter()
 router.include_router(users_router, prefix="/users", tags=["users"])
+router.include_router(user_import_router, prefix="/users", tags=["users"])
 router.include_router(auth_router, prefix="/auth", tags=["authentication"])
+router.include_router(parcels_router, prefix="/parcels", tags=["parcels"])
+router.include_router(receivers_router, prefix="/receivers", tags=["receivers"])
+router.include_router(search_router, prefix="/search", tags=["search"])
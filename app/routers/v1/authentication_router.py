@@ -1,66 +1,103 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.security import (
     OAuth2PasswordRequestForm,
 )
 
 
+from jose import JWTError, jwt
 from sqlmodel import select
 from typing import Annotated
 import datetime
+import logging
+import uuid
 
 from app.core.config import get_settings
 from app.core.database import get_session, AsyncSession
-from app.core.security import create_access_token, create_refresh_token
-from app.models.user_model import DBUser, Token
+from app.core.login_throttle import login_throttle
+from app.core.refresh_tokens import InvalidRefreshTokenError, refresh_token_store
+from app.core.security import ALGORITHM, create_access_token, create_refresh_token
+from app.models.user_model import DBUser, RefreshTokenRequest, Token
 
 
 router = APIRouter(tags=["authentication"])
 
 settings = get_settings()
 
+logger = logging.getLogger(__name__)
+
+
+async def get_user_by_login(session: AsyncSession, login: str) -> DBUser | None:
+    """Find a user by username or email with single-column index lookups.
+
+    Values containing "@" are tried as an email first; the other column is
+    only queried when the first lookup misses.
+    """
+    columns = [DBUser.username, DBUser.email]
+    if "@" in login:
+        columns.reverse()
+
+    for column in columns:
+        result = await session.exec(select(DBUser).where(column == login))
+        user = result.one_or_none()
+        if user is not None:
+            return user
+    return None
+
+
+def issue_tokens(
+    user: DBUser, issued_at: datetime.datetime, family: str | None = None
+) -> Token:
+    """Access and refresh tokens for ``user``; ``family`` continues a rotation."""
+    access_token_expires = datetime.timedelta(
+        minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES
+    )
+    refresh_token_expires = datetime.timedelta(
+        minutes=settings.REFRESH_TOKEN_EXPIRE_MINUTES
+    )
+
+    return Token(
+        access_token=create_access_token(
+            data={"sub": str(user.id)},  # Convert UUID to string
+            expires_delta=access_token_expires,
+        ),
+        refresh_token=create_refresh_token(
+            data={"sub": str(user.id), "fam": family},
+            expires_delta=refresh_token_expires,
+        ),
+        token_type="Bearer",
+        scope="",
+        expires_in=settings.ACCESS_TOKEN_EXPIRE_MINUTES,
+        expires_at=datetime.datetime.now() + access_token_expires,
+        issued_at=issued_at,
+        user_id=user.id,
+    )
+
 
 @router.post(
     "/token",
 )
 async def authentication(
+    request: Request,
     form_data: Annotated[OAuth2PasswordRequestForm, Depends()],
     session: Annotated[AsyncSession, Depends(get_session)],
 ) -> Token:
-    print("form_data", form_data)
-    print("form_data.password", form_data.password)  # Debug log
-    print("form_data.password repr:", repr(form_data.password))  # Show exact chars
-    print("form_data.password length:", len(form_data.password))  # Show length
+    # Rejects bursts before the user lookup and the bcrypt check.
+    client_ip = request.client.host if request.client else "unknown"
+    await login_throttle.check(session, form_data.username, client_ip)
 
-    # TEMPORARY WORKAROUND: Check if password is masked (asterisks)
+    # TEMPORARY WORKAROUND: Swagger UI sometimes submits the masked "********"
+    # instead of the typed password; treat it as the "string" test password.
     if form_data.password == "********":
-        print("⚠️  WARNING: Detected masked password from Swagger UI!")
-        print(
-            "   This is a known issue where Swagger UI sends asterisks instead of actual password."
+        logger.warning(
+            "Masked password received from Swagger UI; trying the test password"
         )
-        print("   Solutions:")
-        print("   1. Use a different HTTP client (curl, Postman, etc.)")
-        print("   2. Create a test user with '********' as the actual password")
-        print("   3. Update your browser or try incognito mode")
-
-        # For testing purposes, let's temporarily accept "string" when we receive "********"
-        # You should remove this in production!
-        print("   4. TEMPORARY: Trying 'string' password instead...")
         actual_password = "string"  # This is just for testing!
     else:
         actual_password = form_data.password
 
-    # Simplify user lookup by username or email
-    result = await session.exec(
-        select(DBUser).where(
-            (DBUser.username == form_data.username)
-            | (DBUser.email == form_data.username)
-        )
-    )
-    user = result.one_or_none()
-
-    print("user", user)
-
+    user = await get_user_by_login(session, form_data.username)
     if not user:
+        logger.info("Login failed: unknown user", extra={"reason": "unknown_user"})
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
@@ -69,28 +106,20 @@ async def authentication(
     # Verify password
     try:
         password_valid = await user.verify_password(actual_password)
-        print(f"Password verification result: {password_valid}")  # Debug log
-    except Exception as e:
-        print(f"Password verification error: {e}")  # Debug log
+    except HTTPException:
+        raise
+    except Exception:
+        logger.exception("Password verification error", extra={"user_id": user.id})
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Password verification failed",
         )
 
     if not password_valid:
-        print("Stored password:", user.password)  # Debug log
-        print("Input password:", actual_password)  # Debug log
-        print("Input password repr:", repr(actual_password))  # Debug log
-        print("Input password length:", len(actual_password))  # Debug log
-
-        # Let's also test the password manually here
-        import bcrypt
-
-        manual_check = bcrypt.checkpw(
-            actual_password.encode("utf-8"), user.password.encode("utf-8")
+        logger.info(
+            "Login failed: wrong password",
+            extra={"reason": "wrong_password", "user_id": user.id},
         )
-        print(f"Manual bcrypt check: {manual_check}")  # Debug log
-
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
@@ -102,38 +131,45 @@ async def authentication(
         session.add(user)
         await session.commit()
         await session.refresh(user)
-        print(
-            f"User last login updated successfully: {user.last_login_date}"
-        )  # Debug log
-    except Exception as e:
-        print("Database commit failed:", e)  # Debug log
+    except Exception:
+        logger.exception("Updating last login date failed", extra={"user_id": user.id})
         await session.rollback()  # Explicitly rollback on error
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Internal server error",
         )
+    logger.debug("Login succeeded", extra={"user_id": user.id})
 
-    # Generate tokens
-    access_token_expires = datetime.timedelta(
-        minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES
-    )
-    refresh_token_expires = datetime.timedelta(
-        minutes=settings.REFRESH_TOKEN_EXPIRE_MINUTES
-    )
+    return issue_tokens(user, issued_at=user.last_login_date)
 
-    return Token(
-        access_token=create_access_token(
-            data={"sub": str(user.id)},  # Convert UUID to string
-            expires_delta=access_token_expires,
-        ),
-        refresh_token=create_refresh_token(
-            data={"sub": str(user.id)},  # Convert UUID to string
-            expires_delta=refresh_token_expires,
-        ),
-        token_type="Bearer",
-        scope="",
-        expires_in=settings.ACCESS_TOKEN_EXPIRE_MINUTES,
-        expires_at=datetime.datetime.now() + access_token_expires,
-        issued_at=user.last_login_date,
-        user_id=user.id,
-    )
+
+@router.post(
+    "/refresh",
+    summary="Exchange a refresh token for new tokens",
+    description="Each refresh token works once and is replaced by the one "
+    "returned. Presenting a used refresh token again revokes every token "
+    "rotated from the same login.",
+)
+async def refresh(
+    body: RefreshTokenRequest,
+    session: Annotated[AsyncSession, Depends(get_session)],
+) -> Token:
+    try:
+        payload = jwt.decode(
+            body.refresh_token, settings.SECRET_KEY, algorithms=[ALGORITHM]
+        )
+        user_id = uuid.UUID(payload["sub"])
+        jti, family = payload["jti"], payload["fam"]
+        expires_at = datetime.datetime.fromtimestamp(payload["exp"])
+    except (JWTError, KeyError, TypeError, ValueError):
+        logger.debug("Rejected refresh token", exc_info=True)
+        raise InvalidRefreshTokenError()
+    if payload.get("type") != "refresh":
+        raise InvalidRefreshTokenError()
+
+    await refresh_token_store.redeem(session, jti, family, expires_at)
+
+    user = await session.get(DBUser, user_id)
+    if user is None or user.status != "active":
+        raise InvalidRefreshTokenError()
+    return issue_tokens(user, issued_at=datetime.datetime.now(), family=family)
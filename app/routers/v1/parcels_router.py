@@ -0,0 +1,699 @@
+import datetime
+from collections import Counter
+from typing import Annotated
+
+import numpy as np
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import aliased
+from sqlmodel import func, select, update
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.cache import TTLCache
+from app.core.config import get_settings
+from app.core.database import get_session
+from app.core.load_planner import (
+    CM3_PER_M3,
+    UNASSIGNED,
+    parcel_volumes,
+    plan_loads,
+)
+from app.core.pagination import decode_cursor, encode_cursor
+from app.core.parcel_query import parcel_load_options, parse_fields, parse_include
+from app.core.pricing import NO_STATION, from_cents, quote, rate_table_cache
+from app.core.responses import FastJSONResponse
+from app.core.route_batching import (
+    PendingParcel,
+    StaffLoad,
+    batch_deliveries,
+    postal_area,
+)
+from app.core.station_counts import ParcelPlacement, apply_count_deltas, count_deltas
+from app.models.delivery_staff_model import DeliveryStaff
+from app.models.parcel_model import Parcel, ParcelStatus
+from app.models.station_model import Station
+from app.models.station_parcel_count_model import StationParcelCount
+from app.models.vehicle_model import Vehicle
+from app.schemas.parcel_schemas import (
+    CreateParcel,
+    DeliveryBatchRequest,
+    DeliveryBatchResponse,
+    LoadPlanRequest,
+    LoadPlanResponse,
+    ParcelResponse,
+    ParcelScan,
+    Quote,
+    QuoteBatch,
+    QuoteBatchResponse,
+    ReadParcelsResponse,
+    ScanBatch,
+    ScanBatchResponse,
+    ScanOutcome,
+    ScanResult,
+    StaffBatch,
+    StationParcelCounts,
+    StationSummary,
+    TrackingResponse,
+    UpdatedParcel,
+    VehicleLoad,
+    parcel_view,
+)
+
+router = APIRouter(tags=["parcels"])
+
+settings = get_settings()
+
+# tracking_number -> TrackingResponse, or None for numbers known not to exist
+tracking_cache: TTLCache[TrackingResponse | None] = TTLCache(
+    max_size=settings.TRACKING_CACHE_MAX_SIZE,
+    ttl=settings.TRACKING_CACHE_TTL_SECONDS,
+)
+
+_MISSING = object()
+
+# Parcels waiting at their origin station to be put on a vehicle
+LOADABLE_STATUSES = (ParcelStatus.CREATED, ParcelStatus.PICKED_UP)
+# Parcels that still take up room on the vehicle they were assigned to
+ON_BOARD_STATUSES = (
+    ParcelStatus.CREATED,
+    ParcelStatus.PICKED_UP,
+    ParcelStatus.IN_TRANSIT,
+    ParcelStatus.AT_DESTINATION,
+)
+ASSIGN_CHUNK_SIZE = 10_000
+
+OriginStation = aliased(Station)
+DestinationStation = aliased(Station)
+
+
+def station_summary(station_id, code, name, city) -> StationSummary | None:
+    if station_id is None:
+        return None
+    return StationSummary(id=station_id, code=code, name=name, city=city)
+
+
+async def load_tracking(
+    session: AsyncSession, tracking_number: str
+) -> TrackingResponse | None:
+    """Fetch the tracking view (parcel plus both stations) in one query."""
+    result = await session.exec(
+        select(
+            Parcel.tracking_number,
+            Parcel.status,
+            Parcel.updated_at,
+            OriginStation.id,
+            OriginStation.code,
+            OriginStation.name,
+            OriginStation.city,
+            DestinationStation.id,
+            DestinationStation.code,
+            DestinationStation.name,
+            DestinationStation.city,
+        )
+        .outerjoin(OriginStation, Parcel.origin_station_id == OriginStation.id)
+        .outerjoin(
+            DestinationStation,
+            Parcel.destination_station_id == DestinationStation.id,
+        )
+        .where(Parcel.tracking_number == tracking_number)
+    )
+    row = result.one_or_none()
+    if row is None:
+        return None
+
+    return TrackingResponse(
+        tracking_number=row[0],
+        status=row[1],
+        updated_at=row[2],
+        origin_station=station_summary(*row[3:7]),
+        destination_station=station_summary(*row[7:11]),
+    )
+
+
+def invalidate_tracking(*tracking_numbers: str):
+    for tracking_number in tracking_numbers:
+        tracking_cache.delete(tracking_number)
+
+
+@router.get(
+    "/track/{tracking_number}",
+    response_model=TrackingResponse,
+    summary="Track a parcel",
+    description="Public tracking lookup, served from a read-through cache.",
+)
+async def track_parcel(
+    tracking_number: str,
+    session: Annotated[AsyncSession, Depends(get_session)],
+) -> TrackingResponse:
+    tracking = tracking_cache.get(tracking_number, default=_MISSING)
+    if tracking is _MISSING:
+        tracking = await load_tracking(session, tracking_number)
+        # Cache misses briefly too, so scans of bogus numbers stay off the DB.
+        tracking_cache.set(
+            tracking_number,
+            tracking,
+            ttl=(
+                settings.TRACKING_CACHE_NEGATIVE_TTL_SECONDS
+                if tracking is None
+                else None
+            ),
+        )
+
+    if tracking is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Parcel not found"
+        )
+    return FastJSONResponse(tracking)
+
+
+@router.post("", response_model=ParcelResponse, status_code=status.HTTP_201_CREATED)
+async def create_parcel(
+    parcel: CreateParcel,
+    session: Annotated[AsyncSession, Depends(get_session)],
+) -> ParcelResponse:
+    if parcel.service_price is None:
+        quotes = quote(
+            await rate_table_cache.get(session),
+            [parcel.origin_station_id or NO_STATION],
+            [parcel.destination_station_id or NO_STATION],
+            [parcel.weight],
+            [parcel.length],
+            [parcel.width],
+            [parcel.height],
+        )
+        parcel.service_price = from_cents(quotes.price_cents[0])
+    db_parcel = Parcel(**parcel.model_dump())
+
+    session.add(db_parcel)
+    try:
+        # Flushes the parcel first, so a duplicate fails before any counting.
+        await apply_count_deltas(
+            session, count_deltas(None, ParcelPlacement.of(db_parcel))
+        )
+        await session.commit()
+    except IntegrityError:
+        await session.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Parcel with this tracking number already exists",
+        )
+    await session.refresh(db_parcel)
+    invalidate_tracking(db_parcel.tracking_number)
+    return FastJSONResponse(
+        ParcelResponse.model_validate(db_parcel), status_code=status.HTTP_201_CREATED
+    )
+
+
+def triage_scans(
+    scans: list[ParcelScan], known_stations: set[int]
+) -> tuple[dict[int, ScanOutcome], dict[str, int]]:
+    """Settle what can be decided without the parcel rows.
+
+    Returns outcomes for the scans that are already settled (by position) and
+    the position of the winning, latest scan for each tracking number.
+    """
+    outcomes: dict[int, ScanOutcome] = {}
+    latest: dict[str, int] = {}
+    seen = set()
+    for position, scan in enumerate(scans):
+        key = (scan.tracking_number, scan.status, scan.station_id, scan.timestamp)
+        if key in seen:
+            outcomes[position] = ScanOutcome.DUPLICATE
+            continue
+        seen.add(key)
+        if scan.station_id is not None and scan.station_id not in known_stations:
+            outcomes[position] = ScanOutcome.UNKNOWN_STATION
+            continue
+
+        previous = latest.get(scan.tracking_number)
+        if previous is None:
+            latest[scan.tracking_number] = position
+        elif scan.timestamp >= scans[previous].timestamp:
+            outcomes[previous] = ScanOutcome.SUPERSEDED
+            latest[scan.tracking_number] = position
+        else:
+            outcomes[position] = ScanOutcome.SUPERSEDED
+    return outcomes, latest
+
+
+@router.post(
+    "/scans",
+    response_model=ScanBatchResponse,
+    summary="Apply a batch of depot scans",
+    description="Apply status changes reported by scanners in one transaction. "
+    "Repeated scans are deduplicated, only the latest scan of each parcel is "
+    "applied, and scans older than the parcel's last change are ignored. Every "
+    "scan gets an outcome, in request order. Timestamps with an offset are "
+    "converted to server local time; station ids are validated, not stored.",
+)
+async def apply_scans(
+    batch: ScanBatch,
+    session: Annotated[AsyncSession, Depends(get_session)],
+) -> ScanBatchResponse:
+    scans = batch.scans
+
+    station_ids = {scan.station_id for scan in scans if scan.station_id is not None}
+    known_stations: set[int] = set()
+    if station_ids:
+        result = await session.exec(
+            select(Station.id).where(Station.id.in_(station_ids))
+        )
+        known_stations = set(result.all())
+
+    outcomes, latest = triage_scans(scans, known_stations)
+
+    # Lock the rows (on Postgres) so single-parcel updates can't interleave.
+    result = await session.exec(
+        select(
+            Parcel.id,
+            Parcel.tracking_number,
+            Parcel.status,
+            Parcel.updated_at,
+            Parcel.origin_station_id,
+            Parcel.destination_station_id,
+        )
+        .where(Parcel.tracking_number.in_(latest))
+        .with_for_update()
+    )
+    parcels = {row.tracking_number: row for row in result.all()}
+
+    changes = []
+    deltas = Counter()
+    for tracking_number, position in latest.items():
+        scan = scans[position]
+        parcel = parcels.get(tracking_number)
+        if parcel is None:
+            outcomes[position] = ScanOutcome.NOT_FOUND
+        elif parcel.updated_at > scan.timestamp:
+            outcomes[position] = ScanOutcome.STALE
+        elif parcel.status == scan.status:
+            outcomes[position] = ScanOutcome.UNCHANGED
+        else:
+            outcomes[position] = ScanOutcome.UPDATED
+            changes.append(
+                {"id": parcel.id, "status": scan.status, "updated_at": scan.timestamp}
+            )
+            before = ParcelPlacement(
+                parcel.origin_station_id, parcel.destination_station_id, parcel.status
+            )
+            count_deltas(before, before._replace(status=scan.status), deltas)
+
+    if changes:
+        # ORM bulk UPDATE by primary key: one executemany, one commit.
+        await session.exec(update(Parcel), params=changes)
+        await apply_count_deltas(session, deltas)
+    await session.commit()
+    invalidate_tracking(
+        *(
+            scans[position].tracking_number
+            for position, outcome in outcomes.items()
+            if outcome is ScanOutcome.UPDATED
+        )
+    )
+
+    results = [
+        ScanResult(tracking_number=scan.tracking_number, outcome=outcomes[position])
+        for position, scan in enumerate(scans)
+    ]
+    return FastJSONResponse(
+        ScanBatchResponse(
+            results=results, summary=Counter(result.outcome for result in results)
+        )
+    )
+
+
+async def bulk_assign(session: AsyncSession, ids: list[int], column, value):
+    """Set ``column`` to ``value`` on the parcels in ``ids`` that have none yet.
+
+    One set-based UPDATE per ``ASSIGN_CHUNK_SIZE`` ids; the caller commits.
+    """
+    for start in range(0, len(ids), ASSIGN_CHUNK_SIZE):
+        await session.exec(
+            update(Parcel)
+            .where(
+                Parcel.id.in_(ids[start : start + ASSIGN_CHUNK_SIZE]),
+                column.is_(None),
+            )
+            .values({column: value})
+            .execution_options(synchronize_session=False)
+        )
+
+
+async def load_vehicles(
+    session: AsyncSession, vehicle_ids: list[int] | None
+) -> tuple[list[Vehicle], np.ndarray, np.ndarray]:
+    """Active vehicles with the weight and volume they can still take."""
+    statement = select(Vehicle).where(Vehicle.is_active).order_by(Vehicle.id)
+    if vehicle_ids is not None:
+        statement = statement.where(Vehicle.id.in_(vehicle_ids))
+    vehicles = list((await session.exec(statement)).all())
+
+    result = await session.exec(
+        select(
+            Parcel.vehicle_id,
+            func.sum(Parcel.weight),
+            func.sum(Parcel.length * Parcel.width * Parcel.height),
+        )
+        .where(
+            Parcel.vehicle_id.in_([vehicle.id for vehicle in vehicles]),
+            Parcel.status.in_(ON_BOARD_STATUSES),
+        )
+        .group_by(Parcel.vehicle_id)
+    )
+    on_board = {vehicle_id: (weight, volume) for vehicle_id, weight, volume in result}
+
+    weight_left = np.empty(len(vehicles))
+    volume_left = np.empty(len(vehicles))
+    for i, vehicle in enumerate(vehicles):
+        weight, volume = on_board.get(vehicle.id, (0.0, 0.0))
+        weight_left[i] = vehicle.capacity - weight
+        volume_left[i] = (
+            np.inf
+            if vehicle.volume_capacity is None
+            else vehicle.volume_capacity - volume / CM3_PER_M3
+        )
+    return vehicles, np.maximum(weight_left, 0), np.maximum(volume_left, 0)
+
+
+@router.post(
+    "/load-plan",
+    response_model=LoadPlanResponse,
+    summary="Load pending parcels onto vehicles",
+    description="Pack the parcels waiting at a station into active vehicles by "
+    "weight and volume (dimensions in cm, vehicle volume in m^3), heaviest "
+    "first, and record the vehicle on each parcel. Set dryRun to only see the "
+    "plan.",
+)
+async def plan_vehicle_loads(
+    plan: LoadPlanRequest,
+    session: Annotated[AsyncSession, Depends(get_session)],
+) -> LoadPlanResponse:
+    vehicles, weight_left, volume_left = await load_vehicles(session, plan.vehicle_ids)
+
+    result = await session.exec(
+        select(Parcel.id, Parcel.weight, Parcel.length, Parcel.width, Parcel.height)
+        .where(
+            Parcel.origin_station_id == plan.station_id,
+            Parcel.vehicle_id.is_(None),
+            Parcel.status.in_(LOADABLE_STATUSES),
+        )
+        .with_for_update()
+    )
+    parcels = np.array(result.all(), dtype=np.float64).reshape(-1, 5)
+    parcel_ids = parcels[:, 0].astype(np.int64)
+    weights = parcels[:, 1]
+    volumes = parcel_volumes(parcels[:, 2], parcels[:, 3], parcels[:, 4])
+
+    assignment = plan_loads(weights, volumes, weight_left, volume_left)
+
+    loads = []
+    for index, vehicle in enumerate(vehicles):
+        mask = assignment == index
+        if not plan.dry_run and mask.any():
+            await bulk_assign(
+                session, parcel_ids[mask].tolist(), Parcel.vehicle_id, vehicle.id
+            )
+        loads.append(
+            VehicleLoad(
+                vehicle_id=vehicle.id,
+                parcels=int(mask.sum()),
+                weight=float(weights[mask].sum()),
+                volume=float(volumes[mask].sum()),
+                weight_capacity=vehicle.capacity,
+                volume_capacity=vehicle.volume_capacity,
+            )
+        )
+    await session.commit()
+
+    unassigned = int((assignment == UNASSIGNED).sum())
+    return FastJSONResponse(
+        LoadPlanResponse(
+            assigned=len(assignment) - unassigned,
+            unassigned=unassigned,
+            vehicles=loads,
+            dry_run=plan.dry_run,
+        )
+    )
+
+
+@router.post(
+    "/delivery-batches",
+    response_model=DeliveryBatchResponse,
+    summary="Assign out-for-delivery parcels to couriers",
+    description="Give every out-for-delivery parcel without a courier to an "
+    "active delivery staff member, grouped by postal area and balanced by "
+    "parcel count and weight. Earlier assignments are kept, so this can run "
+    "whenever new parcels go out for delivery.",
+)
+async def batch_delivery_routes(
+    batch: DeliveryBatchRequest,
+    session: Annotated[AsyncSession, Depends(get_session)],
+) -> DeliveryBatchResponse:
+    postal_code = func.coalesce(Parcel.delivery_postal_code, Station.postal_code)
+    out_for_delivery = (
+        select()
+        .select_from(Parcel)
+        .outerjoin(Station, Parcel.destination_station_id == Station.id)
+        .where(Parcel.status == ParcelStatus.OUT_FOR_DELIVERY)
+    )
+    if batch.destination_station_id is not None:
+        out_for_delivery = out_for_delivery.where(
+            Parcel.destination_station_id == batch.destination_station_id
+        )
+
+    staff_ids = (
+        await session.exec(select(DeliveryStaff.id).where(DeliveryStaff.is_active))
+    ).all()
+    staff = {staff_id: StaffLoad() for staff_id in staff_ids}
+
+    result = await session.exec(
+        out_for_delivery.add_columns(
+            Parcel.delivery_staff_id,
+            postal_code,
+            func.count(),
+            func.coalesce(func.sum(Parcel.weight), 0),
+        )
+        .where(Parcel.delivery_staff_id.in_(staff_ids))
+        .group_by(Parcel.delivery_staff_id, postal_code)
+    )
+    for staff_id, code, parcels, weight in result:
+        load = staff[staff_id]
+        load.parcels += parcels
+        load.weight += weight
+        load.areas.add(postal_area(code, settings.DELIVERY_POSTAL_AREA_LENGTH))
+
+    result = await session.exec(
+        out_for_delivery.add_columns(Parcel.id, postal_code, Parcel.weight)
+        .where(Parcel.delivery_staff_id.is_(None))
+        .with_for_update(of=Parcel)
+    )
+    pending = [PendingParcel(*row) for row in result]
+
+    assignments = batch_deliveries(pending, staff, settings.DELIVERY_POSTAL_AREA_LENGTH)
+    for staff_id, parcel_ids in assignments.items():
+        await bulk_assign(session, parcel_ids, Parcel.delivery_staff_id, staff_id)
+    await session.commit()
+
+    assigned = sum(len(parcel_ids) for parcel_ids in assignments.values())
+    return FastJSONResponse(
+        DeliveryBatchResponse(
+            assigned=assigned,
+            unassigned=len(pending) - assigned,
+            staff=[
+                StaffBatch(
+                    delivery_staff_id=staff_id,
+                    assigned=len(assignments.get(staff_id, ())),
+                    parcels=load.parcels,
+                    weight=load.weight,
+                )
+                for staff_id, load in staff.items()
+            ],
+        )
+    )
+
+
+@router.post(
+    "/quotes",
+    response_model=QuoteBatchResponse,
+    summary="Quote parcel prices",
+    description="Price up to 10,000 parcels in one call from their route, "
+    "weight and dimensions (cm). Billable weight is the larger of actual and "
+    "volumetric weight, rounded up to the next 0.5 kg.",
+)
+async def quote_parcels(
+    batch: QuoteBatch,
+    session: Annotated[AsyncSession, Depends(get_session)],
+) -> QuoteBatchResponse:
+    items = batch.items
+    quotes = quote(
+        await rate_table_cache.get(session),
+        [item.origin_station_id or NO_STATION for item in items],
+        [item.destination_station_id or NO_STATION for item in items],
+        [item.weight for item in items],
+        [item.length for item in items],
+        [item.width for item in items],
+        [item.height for item in items],
+    )
+    return FastJSONResponse(
+        QuoteBatchResponse(
+            quotes=[
+                Quote(billable_weight=weight, price=from_cents(cents), rate_found=found)
+                for weight, cents, found in zip(
+                    quotes.billable_weight.tolist(),
+                    quotes.price_cents.tolist(),
+                    quotes.rate_found.tolist(),
+                )
+            ]
+        )
+    )
+
+
+INCLUDE_DESCRIPTION = (
+    "Comma-separated relationships to embed: sender, receiver, originStation, "
+    "destinationStation, vehicle, deliveryStaff."
+)
+FIELDS_DESCRIPTION = "Comma-separated parcel fields to return; id is always kept."
+
+
+@router.get("", response_model=ReadParcelsResponse)
+async def read_parcels(
+    session: Annotated[AsyncSession, Depends(get_session)],
+    cursor: str | None = Query(default=None),
+    limit: int = Query(default=100, le=100),
+    parcel_status: ParcelStatus | None = Query(default=None, alias="status"),
+    include: str | None = Query(default=None, description=INCLUDE_DESCRIPTION),
+    fields: str | None = Query(default=None, description=FIELDS_DESCRIPTION),
+) -> ReadParcelsResponse:
+    included, selected = parse_include(include), parse_fields(fields)
+    statement = (
+        select(Parcel)
+        .options(*parcel_load_options(selected, included))
+        .order_by(Parcel.id)
+    )
+    if cursor is not None:
+        last_id = decode_cursor(cursor).get("id")
+        if not isinstance(last_id, int):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+            )
+        statement = statement.where(Parcel.id > last_id)
+    if parcel_status is not None:
+        statement = statement.where(Parcel.status == parcel_status)
+
+    result = await session.exec(statement.limit(limit + 1))
+    parcels = result.all()
+    has_more = len(parcels) > limit
+    parcels = parcels[:limit]
+    next_cursor = encode_cursor({"id": parcels[-1].id}) if has_more else None
+
+    view = parcel_view(selected, included)
+    if view is not ParcelResponse:
+        return FastJSONResponse(
+            {
+                "parcels": [view.model_validate(parcel) for parcel in parcels],
+                "hasMore": has_more,
+                "nextCursor": next_cursor,
+            }
+        )
+    return FastJSONResponse(
+        ReadParcelsResponse(
+            parcels=[ParcelResponse.model_validate(parcel) for parcel in parcels],
+            has_more=has_more,
+            next_cursor=next_cursor,
+        )
+    )
+
+
+@router.get(
+    "/station-counts",
+    response_model=list[StationParcelCounts],
+    summary="Parcel counts per station",
+    description="Parcels by status at each station, as origin and as "
+    "destination. Served from a rollup kept current by every parcel write.",
+)
+async def read_station_counts(
+    session: Annotated[AsyncSession, Depends(get_session)],
+    station_id: int | None = Query(default=None),
+) -> list[StationParcelCounts]:
+    statement = select(StationParcelCount).where(StationParcelCount.count != 0)
+    if station_id is not None:
+        statement = statement.where(StationParcelCount.station_id == station_id)
+    result = await session.exec(statement.order_by(StationParcelCount.station_id))
+
+    stations: dict[int, StationParcelCounts] = {}
+    for row in result.all():
+        counts = stations.get(row.station_id)
+        if counts is None:
+            counts = stations[row.station_id] = StationParcelCounts(
+                station_id=row.station_id
+            )
+        getattr(counts, row.role)[row.status] = row.count
+    return FastJSONResponse(list(stations.values()))
+
+
+@router.get("/{parcel_id}", response_model=ParcelResponse)
+async def read_parcel(
+    parcel_id: int,
+    session: Annotated[AsyncSession, Depends(get_session)],
+    include: str | None = Query(default=None, description=INCLUDE_DESCRIPTION),
+    fields: str | None = Query(default=None, description=FIELDS_DESCRIPTION),
+) -> ParcelResponse:
+    included, selected = parse_include(include), parse_fields(fields)
+    if selected is None and not included:
+        parcel = await session.get(Parcel, parcel_id)
+    else:
+        result = await session.exec(
+            select(Parcel)
+            .where(Parcel.id == parcel_id)
+            .options(*parcel_load_options(selected, included, joined=True))
+        )
+        parcel = result.first()
+    if not parcel:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Parcel not found"
+        )
+    return FastJSONResponse(parcel_view(selected, included).model_validate(parcel))
+
+
+@router.put("/{parcel_id}", response_model=ParcelResponse)
+async def update_parcel(
+    parcel_id: int,
+    parcel: UpdatedParcel,
+    session: Annotated[AsyncSession, Depends(get_session)],
+) -> ParcelResponse:
+    db_parcel = await session.get(Parcel, parcel_id, with_for_update=True)
+    if not db_parcel:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Parcel not found"
+        )
+    before = ParcelPlacement.of(db_parcel)
+
+    parcel_data = parcel.model_dump(exclude_unset=True)
+    for key, value in parcel_data.items():
+        setattr(db_parcel, key, value)
+    db_parcel.updated_at = datetime.datetime.now()
+
+    session.add(db_parcel)
+    await apply_count_deltas(
+        session, count_deltas(before, ParcelPlacement.of(db_parcel))
+    )
+    await session.commit()
+    await session.refresh(db_parcel)
+    invalidate_tracking(db_parcel.tracking_number)
+    return FastJSONResponse(ParcelResponse.model_validate(db_parcel))
+
+
+@router.delete("/{parcel_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_parcel(
+    parcel_id: int, session: Annotated[AsyncSession, Depends(get_session)]
+) -> None:
+    parcel = await session.get(Parcel, parcel_id, with_for_update=True)
+    if not parcel:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Parcel not found"
+        )
+    tracking_number = parcel.tracking_number
+    await apply_count_deltas(session, count_deltas(ParcelPlacement.of(parcel), None))
+    await session.delete(parcel)
+    await session.commit()
+    invalidate_tracking(tracking_number)
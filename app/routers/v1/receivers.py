@@ -1,67 +1,38 @@
 # receiver.py
-from typing import Optional
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel, EmailStr
-from datetime import datetime
+from typing import Annotated, Optional
+from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-router = APIRouter(prefix="/receivers", tags=["receivers"])
+from app.core.database import get_session
+from app.core.receiver_store import receiver_store
+from app.core.streaming import stream_format, stream_models
+from app.schemas.receiver_schemas import Receiver, ReceiverCreate, ReceiverUpdate
 
-
-# Pydantic Models
-class ReceiverBase(BaseModel):
-    name: str
-    email: EmailStr
-    phone: Optional[str] = None
-    address: Optional[str] = None
-    is_active: bool = True
-
-
-class ReceiverCreate(ReceiverBase):
-    pass
-
-
-class ReceiverUpdate(BaseModel):
-    name: Optional[str] = None
-    email: Optional[EmailStr] = None
-    phone: Optional[str] = None
-    address: Optional[str] = None
-    is_active: Optional[bool] = None
-
-
-class Receiver(ReceiverBase):
-    id: int
-    created_at: datetime
-    updated_at: datetime
-
-    class Config:
-        from_attributes = True
-
-
-# In-memory storage for demo purposes
-receivers_db: dict[int, dict] = {}
-next_id = 1
+router = APIRouter(tags=["receivers"])
 
 
 @router.get(
     "",
     summary="Get all receivers",
-    description="Retrieve a list of all receivers with optional filtering.",
+    description="Retrieve a list of all receivers with optional filtering. "
+    "Send 'Accept: application/x-ndjson' or stream=true to stream every "
+    "matching receiver after skip.",
     response_model=list[Receiver],
 )
 async def get_receivers(
-    skip: int = 0, limit: int = 100, is_active: Optional[bool] = None
+    request: Request,
+    skip: int = 0,
+    limit: int = 100,
+    is_active: Optional[bool] = None,
+    stream: bool = False,
 ) -> list[Receiver]:
     """Get all receivers with optional pagination and filtering."""
-    receivers = list(receivers_db.values())
+    await receiver_store.wait_loaded()
+    fmt = stream_format(request, stream)
+    if fmt is not None:
+        return stream_models(receiver_store.iter(is_active, skip), fmt)
 
-    # Filter by is_active if provided
-    if is_active is not None:
-        receivers = [r for r in receivers if r["is_active"] == is_active]
-
-    # Apply pagination
-    receivers = receivers[skip : skip + limit]
-
-    return [Receiver(**receiver) for receiver in receivers]
+    return receiver_store.page(is_active, skip, limit)
 
 
 @router.get(
@@ -70,12 +41,15 @@ async def get_receivers(
     description="Retrieve a specific receiver using its unique identifier.",
     response_model=Receiver,
 )
-async def get_receiver(receiver_id: int) -> Receiver:
+async def get_receiver(
+    receiver_id: int, session: Annotated[AsyncSession, Depends(get_session)]
+) -> Receiver:
     """Get a single receiver by ID."""
-    if receiver_id not in receivers_db:
+    receiver = await receiver_store.get(session, receiver_id)
+    if receiver is None:
         raise HTTPException(status_code=404, detail="Receiver not found")
 
-    return Receiver(**receivers_db[receiver_id])
+    return receiver
 
 
 @router.post(
@@ -85,28 +59,11 @@ async def get_receiver(receiver_id: int) -> Receiver:
     response_model=Receiver,
     status_code=201,
 )
-async def create_receiver(receiver: ReceiverCreate) -> Receiver:
+async def create_receiver(
+    receiver: ReceiverCreate, session: Annotated[AsyncSession, Depends(get_session)]
+) -> Receiver:
     """Create a new receiver."""
-    global next_id
-
-    # Check if email already exists
-    for existing_receiver in receivers_db.values():
-        if existing_receiver["email"] == receiver.email:
-            raise HTTPException(status_code=400, detail="Email already registered")
-
-    now = datetime.now()
-    receiver_data = {
-        "id": next_id,
-        "created_at": now,
-        "updated_at": now,
-        **receiver.model_dump(),
-    }
-
-    receivers_db[next_id] = receiver_data
-    result = Receiver(**receiver_data)
-    next_id += 1
-
-    return result
+    return await receiver_store.create(session, receiver)
 
 
 @router.put(
@@ -116,27 +73,18 @@ async def create_receiver(receiver: ReceiverCreate) -> Receiver:
     response_model=Receiver,
 )
 async def update_receiver(
-    receiver_id: int, receiver_update: ReceiverUpdate
+    receiver_id: int,
+    receiver_update: ReceiverUpdate,
+    session: Annotated[AsyncSession, Depends(get_session)],
 ) -> Receiver:
     """Update an existing receiver."""
-    if receiver_id not in receivers_db:
+    receiver = await receiver_store.update(
+        session, receiver_id, receiver_update.model_dump(exclude_unset=True)
+    )
+    if receiver is None:
         raise HTTPException(status_code=404, detail="Receiver not found")
 
-    existing_receiver = receivers_db[receiver_id]
-
-    # Check if email is being updated and already exists
-    if receiver_update.email:
-        for rid, existing in receivers_db.items():
-            if rid != receiver_id and existing["email"] == receiver_update.email:
-                raise HTTPException(status_code=400, detail="Email already registered")
-
-    # Update only provided fields
-    update_data = receiver_update.model_dump(exclude_unset=True)
-    if update_data:
-        existing_receiver.update(update_data)
-        existing_receiver["updated_at"] = datetime.now()
-
-    return Receiver(**existing_receiver)
+    return receiver
 
 
 @router.patch(
@@ -145,23 +93,28 @@ async def update_receiver(
     description="Partially update a receiver with the provided fields.",
     response_model=Receiver,
 )
-async def patch_receiver(receiver_id: int, receiver_update: ReceiverUpdate) -> Receiver:
+async def patch_receiver(
+    receiver_id: int,
+    receiver_update: ReceiverUpdate,
+    session: Annotated[AsyncSession, Depends(get_session)],
+) -> Receiver:
     """Partially update a receiver (same as PUT in this implementation)."""
-    return await update_receiver(receiver_id, receiver_update)
+    return await update_receiver(receiver_id, receiver_update, session)
 
 
 @router.delete(
     "/{receiver_id}",
     summary="Delete a receiver",
-    description="Delete a receiver by ID.",
+    description="Delete a receiver by ID. Fails with 409 while a parcel refers to it.",
     status_code=204,
 )
-async def delete_receiver(receiver_id: int):
+async def delete_receiver(
+    receiver_id: int, session: Annotated[AsyncSession, Depends(get_session)]
+):
     """Delete a receiver."""
-    if receiver_id not in receivers_db:
+    if not await receiver_store.delete(session, receiver_id):
         raise HTTPException(status_code=404, detail="Receiver not found")
 
-    del receivers_db[receiver_id]
     return None
 
 
@@ -171,15 +124,15 @@ async def delete_receiver(receiver_id: int):
     description="Activate a receiver by setting is_active to True.",
     response_model=Receiver,
 )
-async def activate_receiver(receiver_id: int) -> Receiver:
+async def activate_receiver(
+    receiver_id: int, session: Annotated[AsyncSession, Depends(get_session)]
+) -> Receiver:
     """Activate a receiver."""
-    if receiver_id not in receivers_db:
+    receiver = await receiver_store.update(session, receiver_id, {"is_active": True})
+    if receiver is None:
         raise HTTPException(status_code=404, detail="Receiver not found")
 
-    receivers_db[receiver_id]["is_active"] = True
-    receivers_db[receiver_id]["updated_at"] = datetime.now()
-
-    return Receiver(**receivers_db[receiver_id])
+    return receiver
 
 
 @router.post(
@@ -188,12 +141,12 @@ async def activate_receiver(receiver_id: int) -> Receiver:
     description="Deactivate a receiver by setting is_active to False.",
     response_model=Receiver,
 )
-async def deactivate_receiver(receiver_id: int) -> Receiver:
+async def deactivate_receiver(
+    receiver_id: int, session: Annotated[AsyncSession, Depends(get_session)]
+) -> Receiver:
     """Deactivate a receiver."""
-    if receiver_id not in receivers_db:
+    receiver = await receiver_store.update(session, receiver_id, {"is_active": False})
+    if receiver is None:
         raise HTTPException(status_code=404, detail="Receiver not found")
 
-    receivers_db[receiver_id]["is_active"] = False
-    receivers_db[receiver_id]["updated_at"] = datetime.now()
-
-    return Receiver(**receivers_db[receiver_id])
+    return receiver
@@ -0,0 +1,63 @@
+from typing import Annotated, TypeVar
+
+from pydantic import BaseModel
+
+from fastapi import APIRouter, Depends, Query
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.database import get_session
+from app.core.responses import FastJSONResponse
+from app.core.search import customer_search, station_search
+from app.schemas.search_schemas import (
+    CustomerHit,
+    CustomerSearchResponse,
+    StationHit,
+    StationSearchResponse,
+)
+
+router = APIRouter(tags=["search"])
+
+Hit = TypeVar("Hit", bound=BaseModel)
+
+SEARCH_DESCRIPTION = (
+    "Matches prefixes of any word and misspellings (trigram similarity). "
+    "Prefix matches come first, then the closest fuzzy matches."
+)
+
+
+def to_hits(model: type[Hit], hits) -> list[Hit]:
+    fields = [name for name in model.model_fields if name != "score"]
+    return [
+        model(score=score, **{name: getattr(row, name) for name in fields})
+        for row, score in hits
+    ]
+
+
+@router.get(
+    "/customers",
+    response_model=CustomerSearchResponse,
+    summary="Search customers by name or email",
+    description=SEARCH_DESCRIPTION,
+)
+async def search_customers(
+    session: Annotated[AsyncSession, Depends(get_session)],
+    q: str = Query(min_length=1, max_length=100),
+    limit: int = Query(default=20, ge=1, le=100),
+) -> CustomerSearchResponse:
+    hits = await customer_search.search(session, q, limit)
+    return FastJSONResponse(CustomerSearchResponse(results=to_hits(CustomerHit, hits)))
+
+
+@router.get(
+    "/stations",
+    response_model=StationSearchResponse,
+    summary="Search stations by name or city",
+    description=SEARCH_DESCRIPTION,
+)
+async def search_stations(
+    session: Annotated[AsyncSession, Depends(get_session)],
+    q: str = Query(min_length=1, max_length=100),
+    limit: int = Query(default=20, ge=1, le=100),
+) -> StationSearchResponse:
+    hits = await station_search.search(session, q, limit)
+    return FastJSONResponse(StationSearchResponse(results=to_hits(StationHit, hits)))
@@ -0,0 +1,246 @@
+import asyncio
+import csv
+import datetime
+import io
+import itertools
+import json
+import tempfile
+import uuid
+from typing import Annotated, AsyncIterator, Iterator
+
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import insert, or_, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.database import get_session
+from app.core.password_pool import password_pool
+from app.models.user_model import DBUser as User
+from app.schemas.user_schemas import CreateUser
+
+router = APIRouter(tags=["users"])
+
+IMPORT_BATCH_SIZE = 500
+SPOOL_MAX_MEMORY = 1024 * 1024  # bytes kept in memory before spilling to disk
+
+NDJSON_CONTENT_TYPES = {
+    "application/x-ndjson",
+    "application/ndjson",
+    "application/jsonl",
+    "application/json-lines",
+}
+CSV_CONTENT_TYPES = {"text/csv", "application/csv"}
+
+
+def iter_rows(text: io.TextIOBase, fmt: str) -> Iterator[tuple[int, dict | str]]:
+    """Yield ``(row_number, data)`` pairs, or an error message for bad rows."""
+    if fmt == "csv":
+        reader = csv.DictReader(text)
+        for row_number, row in enumerate(reader, start=1):
+            yield row_number, {k: v for k, v in row.items() if k is not None}
+        return
+
+    for row_number, line in enumerate(text, start=1):
+        if not line.strip():
+            continue
+        try:
+            data = json.loads(line)
+        except ValueError as e:
+            yield row_number, f"Invalid JSON: {e}"
+            continue
+        if not isinstance(data, dict):
+            yield row_number, "Row must be a JSON object"
+            continue
+        yield row_number, data
+
+
+async def hash_passwords(passwords: list[str]) -> list[str]:
+    """Hash in parallel without taking more than our share of the pool.
+
+    Only ``password_pool.workers`` jobs are submitted at a time so an import
+    never fills the queue that logins rely on.
+    """
+    semaphore = asyncio.Semaphore(password_pool.workers)
+
+    async def hash_one(password: str) -> str:
+        async with semaphore:
+            return await password_pool.hash_password(password)
+
+    return await asyncio.gather(*(hash_one(password) for password in passwords))
+
+
+async def import_batch(
+    session: AsyncSession, batch: list[tuple[int, dict | str]]
+) -> list[dict]:
+    results: dict[int, dict] = {}
+    candidates: list[tuple[int, CreateUser]] = []
+
+    for row_number, data in batch:
+        if isinstance(data, str):
+            results[row_number] = {
+                "row": row_number,
+                "status": "invalid",
+                "detail": data,
+            }
+            continue
+        try:
+            candidates.append((row_number, CreateUser.model_validate(data)))
+        except ValidationError as e:
+            results[row_number] = {
+                "row": row_number,
+                "status": "invalid",
+                "detail": e.errors(include_url=False, include_context=False),
+            }
+
+    # One round trip for every username/email already taken in this batch.
+    taken_usernames: set[str] = set()
+    taken_emails: set[str] = set()
+    if candidates:
+        result = await session.exec(
+            select(User.username, User.email).where(
+                or_(
+                    User.username.in_([user.username for _, user in candidates]),
+                    User.email.in_([user.email for _, user in candidates]),
+                )
+            )
+        )
+        for username, email in result.all():
+            taken_usernames.add(username)
+            taken_emails.add(email)
+
+    accepted: list[tuple[int, CreateUser]] = []
+    for row_number, user in candidates:
+        if user.username in taken_usernames:
+            detail = "User with this username already exists"
+        elif user.email in taken_emails:
+            detail = "User with this email already exists"
+        else:
+            taken_usernames.add(user.username)
+            taken_emails.add(user.email)
+            accepted.append((row_number, user))
+            continue
+        results[row_number] = {
+            "row": row_number,
+            "status": "conflict",
+            "detail": detail,
+        }
+
+    if accepted:
+        hashed = await hash_passwords([user.password for _, user in accepted])
+        now = datetime.datetime.now()
+        rows = [
+            {
+                "id": uuid.uuid4(),
+                "email": user.email,
+                "username": user.username,
+                "first_name": user.first_name,
+                "last_name": user.last_name,
+                "status": "active",
+                "password": password,
+                "register_date": now,
+                "updated_date": now,
+                "last_login_date": None,
+            }
+            for (_, user), password in zip(accepted, hashed)
+        ]
+
+        for (row_number, _), row in zip(accepted, await insert_rows(session, rows)):
+            results[row_number] = {"row": row_number, **row}
+
+    return [results[row_number] for row_number, _ in batch]
+
+
+async def insert_rows(session: AsyncSession, rows: list[dict]) -> list[dict]:
+    """Insert ``rows`` in one multi-row statement, falling back to one by one.
+
+    The fallback only runs when a concurrent writer took one of the names
+    between our SELECT and the INSERT.
+    """
+    try:
+        await session.exec(insert(User).values(rows))
+        await session.commit()
+        return [
+            {"status": "created", "id": str(row["id"]), "username": row["username"]}
+            for row in rows
+        ]
+    except IntegrityError:
+        await session.rollback()
+
+    outcomes = []
+    for row in rows:
+        try:
+            await session.exec(insert(User).values(row))
+            await session.commit()
+            outcomes.append(
+                {"status": "created", "id": str(row["id"]), "username": row["username"]}
+            )
+        except IntegrityError:
+            await session.rollback()
+            outcomes.append({"status": "conflict", "detail": "User already exists"})
+    return outcomes
+
+
+async def stream_import(
+    session: AsyncSession, spool: tempfile.SpooledTemporaryFile, fmt: str
+) -> AsyncIterator[str]:
+    created = failed = 0
+    try:
+        text = io.TextIOWrapper(spool, encoding="utf-8", newline="")
+        rows = iter_rows(text, fmt)
+        while True:
+            try:
+                batch = list(itertools.islice(rows, IMPORT_BATCH_SIZE))
+            except (UnicodeDecodeError, csv.Error) as e:
+                failed += 1
+                yield json.dumps({"status": "aborted", "detail": str(e)}) + "\n"
+                break
+            if not batch:
+                break
+
+            for outcome in await import_batch(session, batch):
+                if outcome["status"] == "created":
+                    created += 1
+                else:
+                    failed += 1
+                yield json.dumps(outcome) + "\n"
+    finally:
+        spool.close()
+
+    yield json.dumps({"summary": {"created": created, "failed": failed}}) + "\n"
+
+
+@router.post(
+    "/import",
+    summary="Bulk import users",
+    description="Create users from an NDJSON (application/x-ndjson) or CSV "
+    "(text/csv, with a header row) body. Streams back one NDJSON result per "
+    "row followed by a summary line.",
+    response_class=StreamingResponse,
+)
+async def import_users(
+    request: Request,
+    session: Annotated[AsyncSession, Depends(get_session)],
+) -> StreamingResponse:
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+    if content_type in CSV_CONTENT_TYPES:
+        fmt = "csv"
+    elif content_type in NDJSON_CONTENT_TYPES:
+        fmt = "ndjson"
+    else:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="Send the rows as application/x-ndjson or text/csv",
+        )
+
+    # Spool the upload (to disk past SPOOL_MAX_MEMORY) so memory stays flat and
+    # the response can stream while rows are processed batch by batch.
+    spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_MEMORY, mode="w+b")
+    async for chunk in request.stream():
+        spool.write(chunk)
+    spool.seek(0)
+
+    return StreamingResponse(
+        stream_import(session, spool, fmt), media_type="application/x-ndjson"
+    )
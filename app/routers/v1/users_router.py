@@ -1,12 +1,18 @@
-from typing import Annotated
+from typing import Annotated, AsyncIterator, Literal
 from uuid import UUID
-from fastapi import APIRouter, HTTPException, Query, status, Depends
+from fastapi import APIRouter, HTTPException, Query, Request, status, Depends
+from sqlalchemy.exc import IntegrityError
 from sqlmodel.ext.asyncio.session import AsyncSession
-from sqlmodel import select, func
+from sqlmodel import select, func, text
 import uuid
 
-from app.models.user_model import DBUser as User
+from app.models.user_model import DBUser as User, User as CurrentUser
 from app.core.database import get_session
+from app.core.deps import get_current_active_user
+from app.core.pagination import decode_cursor, encode_cursor
+from app.core.principal_cache import principal_cache
+from app.core.responses import FastJSONResponse
+from app.core.streaming import NDJSON_MEDIA_TYPE, stream_format, stream_models
 from app.schemas.user_schemas import (
     CreateUser,
     ReadUsersResponse,
@@ -17,29 +23,36 @@ from app.schemas.user_schemas import (
 router = APIRouter(tags=["users"])
 
 
+async def user_conflict(
+    session: AsyncSession,
+    username: str | None,
+    email: str | None,
+    exclude_id: UUID | None = None,
+) -> HTTPException:
+    """Build the 409 for a unique-index violation on username or email.
+
+    Only runs after the INSERT/UPDATE has already failed, so the happy path
+    never pays for the lookup.
+    """
+    statement = select(User.username).where(
+        (User.username == username) | (User.email == email)
+    )
+    if exclude_id is not None:
+        statement = statement.where(User.id != exclude_id)
+    taken_usernames = (await session.exec(statement)).all()
+
+    field = "username" if username in taken_usernames else "email"
+    return HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail=f"User with this {field} already exists",
+    )
+
+
 @router.post("/", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
 async def create_user(
     user: CreateUser,
     session: Annotated[AsyncSession, Depends(get_session)],
 ) -> UserResponse:
-    # Check if username already exists
-    result = await session.exec(select(User).where(User.username == user.username))
-    existing_user_by_username = result.first()
-    if existing_user_by_username:
-        raise HTTPException(
-            status_code=status.HTTP_409_CONFLICT,
-            detail="User with this username already exists",
-        )
-
-    # Check if email already exists
-    result = await session.exec(select(User).where(User.email == user.email))
-    existing_user_by_email = result.first()
-    if existing_user_by_email:
-        raise HTTPException(
-            status_code=status.HTTP_409_CONFLICT,
-            detail="User with this email already exists",
-        )
-
     # Hash the password before storing
     hashed_password = await User(
         email=user.email,
@@ -58,52 +71,140 @@ async def create_user(
         id=uuid.uuid4(),  # Generate UUID
     )
 
-    # Save user to the database
+    # Save user to the database; the unique indexes reject duplicates
     session.add(db_user)
-    await session.commit()
+    try:
+        await session.commit()
+    except IntegrityError:
+        await session.rollback()
+        raise await user_conflict(session, user.username, user.email)
     await session.refresh(db_user)
 
     # Return the created user
-    return UserResponse(
-        id=str(db_user.id),
-        username=db_user.username,
-        email=db_user.email,
-        first_name=db_user.first_name,
-        last_name=db_user.last_name,
+    return FastJSONResponse(
+        UserResponse.model_validate(db_user), status_code=status.HTTP_201_CREATED
+    )
+
+
+async def count_users(session: AsyncSession, mode: Literal["exact", "estimate"]) -> int:
+    """Count users, using the planner's row estimate on Postgres if asked."""
+    if mode == "estimate" and session.bind.dialect.name == "postgresql":
+        result = await session.exec(
+            text(
+                "SELECT reltuples::bigint FROM pg_class "
+                "WHERE oid = to_regclass(:table)"
+            ).bindparams(table=User.__tablename__)
+        )
+        estimate = result.scalar_one_or_none()
+        if estimate is not None and estimate >= 0:
+            return estimate
+
+    total_count_result = await session.exec(select(func.count()).select_from(User))
+    return total_count_result.one()
+
+
+STREAM_BATCH_SIZE = 1000
+
+
+async def stream_users(session: AsyncSession, statement) -> AsyncIterator[UserResponse]:
+    """Yield users off a server-side cursor, one batch in memory at a time."""
+    result = await session.stream(
+        statement.with_only_columns(
+            User.id, User.username, User.email, User.first_name, User.last_name
+        ).execution_options(yield_per=STREAM_BATCH_SIZE)
     )
+    async for user in result:
+        yield UserResponse.model_validate(user)
 
 
-@router.get("/", response_model=ReadUsersResponse)
+@router.get(
+    "/",
+    response_model=ReadUsersResponse,
+    responses={
+        200: {
+            "content": {NDJSON_MEDIA_TYPE: {}},
+            "description": "A page of users, or every user when streaming.",
+        }
+    },
+)
 async def read_users(
+    request: Request,
     session: Annotated[AsyncSession, Depends(get_session)],
     offset: int = Query(default=0),
     limit: int = Query(default=100, le=100),
+    cursor: str | None = Query(
+        default=None,
+        description="Opaque cursor from a previous page's next_cursor.",
+    ),
+    paginate: Literal["offset", "cursor"] = Query(
+        default="offset",
+        description="Use 'cursor' to start keyset pagination without a cursor.",
+    ),
+    total: Literal["exact", "estimate", "none"] | None = Query(
+        default=None,
+        description="How to compute total_count. Defaults to 'exact' in offset "
+        "mode and 'none' in cursor mode.",
+    ),
+    stream: bool = Query(
+        default=False,
+        description="Stream every user after offset/cursor as a JSON array. "
+        "Send 'Accept: application/x-ndjson' to stream NDJSON instead. "
+        "limit and total are ignored when streaming.",
+    ),
 ) -> ReadUsersResponse:
-    total_count_result = await session.exec(select(func.count()).select_from(User))
-    total_count = total_count_result.one()
+    use_cursor = cursor is not None or paginate == "cursor"
+    if total is None:
+        total = "none" if use_cursor else "exact"
+
+    statement = select(User).order_by(User.id)
+    if cursor is not None:
+        last_id = decode_cursor(cursor).get("id")
+        try:
+            statement = statement.where(User.id > UUID(str(last_id)))
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+            )
+    elif not use_cursor:
+        statement = statement.offset(offset)
+
+    fmt = stream_format(request, stream)
+    if fmt is not None:
+        return stream_models(stream_users(session, statement), fmt)
 
-    result = await session.exec(select(User).offset(offset).limit(limit))
+    # Fetch one extra row to learn whether another page exists.
+    result = await session.exec(statement.limit(limit + 1))
     users = result.all()
-    user_responses = [
-        UserResponse(
-            id=str(user.id),
-            username=user.username,
-            email=user.email,
-            first_name=user.first_name,  # Use snake_case for initialization
-            last_name=user.last_name,  # Use snake_case for initialization
-        )
-        for user in users
-    ]
+    has_more = len(users) > limit
+    users = users[:limit]
+
+    user_responses = [UserResponse.model_validate(user) for user in users]
+
+    next_cursor = None
+    if use_cursor and has_more:
+        next_cursor = encode_cursor({"id": str(users[-1].id)})
 
-    has_more = offset + limit < total_count
+    total_count = None
+    if total != "none":
+        total_count = await count_users(session, total)
 
-    return ReadUsersResponse(
-        users=user_responses,
-        total_count=total_count,
-        has_more=has_more,
+    return FastJSONResponse(
+        ReadUsersResponse(
+            users=user_responses,
+            total_count=total_count,
+            has_more=has_more,
+            next_cursor=next_cursor,
+        )
     )
 
 
+@router.get("/me", response_model=UserResponse)
+async def read_current_user(
+    current_user: Annotated[CurrentUser, Depends(get_current_active_user)],
+) -> UserResponse:
+    return FastJSONResponse(UserResponse.model_validate(current_user))
+
+
 @router.get("/{user_id}", response_model=UserResponse)
 async def read_user(
     user_id: UUID, session: Annotated[AsyncSession, Depends(get_session)]
@@ -113,13 +214,7 @@ async def read_user(
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
         )
-    return UserResponse(
-        id=str(user.id),
-        username=user.username,
-        email=user.email,
-        first_name=user.first_name,
-        last_name=user.last_name,
-    )
+    return FastJSONResponse(UserResponse.model_validate(user))
 
 
 @router.put("/{user_id}", response_model=UserResponse)
@@ -139,15 +234,16 @@ async def update_user(
         setattr(db_user, key, value)
 
     session.add(db_user)
-    await session.commit()
+    try:
+        await session.commit()
+    except IntegrityError:
+        await session.rollback()
+        raise await user_conflict(
+            session, user_data.get("username"), user_data.get("email"), user_id
+        )
     await session.refresh(db_user)
-    return UserResponse(
-        id=(str(db_user.id)),
-        username=db_user.username,
-        email=db_user.email,
-        first_name=db_user.first_name,
-        last_name=db_user.last_name,
-    )
+    principal_cache.invalidate_user(db_user.id)
+    return FastJSONResponse(UserResponse.model_validate(db_user))
 
 
 @router.delete("/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -161,3 +257,4 @@ async def delete_user(
         )
     await session.delete(user)
     await session.commit()
+    principal_cache.invalidate_user(user_id)
@@ -0,0 +1,364 @@
+import datetime
+from decimal import Decimal
+from enum import Enum
+from functools import lru_cache
+from typing import List
+
+from pydantic import BaseModel, ConfigDict, Field, create_model, field_validator
+
+from app.models.parcel_model import ParcelStatus
+from app.schemas.user_schemas import to_camel_case
+
+
+class CreateParcel(BaseModel):
+    tracking_number: str
+    weight: float
+    length: float
+    width: float
+    height: float
+    service_price: Decimal | None = None  # quoted from the rate table if omitted
+    description: str | None = None
+    special_instructions: str | None = None
+    delivery_postal_code: str | None = None
+    sender_id: int
+    receiver_id: int
+    origin_station_id: int | None = None
+    destination_station_id: int | None = None
+
+    model_config = ConfigDict(
+        validate_by_name=True, alias_generator=to_camel_case, populate_by_name=True
+    )
+
+
+class UpdatedParcel(BaseModel):
+    weight: float | None = None
+    length: float | None = None
+    width: float | None = None
+    height: float | None = None
+    service_price: Decimal | None = None
+    status: ParcelStatus | None = None
+    description: str | None = None
+    special_instructions: str | None = None
+    delivery_postal_code: str | None = None
+    origin_station_id: int | None = None
+    destination_station_id: int | None = None
+    vehicle_id: int | None = None
+    delivery_staff_id: int | None = None
+
+    model_config = ConfigDict(
+        validate_by_name=True, alias_generator=to_camel_case, populate_by_name=True
+    )
+
+
+class ParcelResponse(BaseModel):
+    id: int
+    tracking_number: str
+    weight: float
+    length: float
+    width: float
+    height: float
+    service_price: Decimal
+    status: ParcelStatus
+    description: str | None = None
+    special_instructions: str | None = None
+    delivery_postal_code: str | None = None
+    sender_id: int
+    receiver_id: int
+    origin_station_id: int | None = None
+    destination_station_id: int | None = None
+    vehicle_id: int | None = None
+    delivery_staff_id: int | None = None
+    created_at: datetime.datetime
+    updated_at: datetime.datetime
+
+    model_config = ConfigDict(
+        from_attributes=True,
+        validate_by_alias=False,
+        validate_by_name=True,
+        serialize_by_alias=True,
+        alias_generator=to_camel_case,
+    )
+
+
+class ReadParcelsResponse(BaseModel):
+    parcels: List[ParcelResponse]
+    has_more: bool
+    next_cursor: str | None = None
+
+
+class StationSummary(BaseModel):
+    id: int
+    code: str
+    name: str
+    city: str
+
+    model_config = ConfigDict(
+        from_attributes=True,
+        validate_by_alias=False,
+        validate_by_name=True,
+        serialize_by_alias=True,
+        alias_generator=to_camel_case,
+    )
+
+
+class CustomerSummary(BaseModel):
+    id: int
+    name: str
+    email: str
+    phone: str | None = None
+
+    model_config = ConfigDict(
+        from_attributes=True,
+        validate_by_alias=False,
+        validate_by_name=True,
+        serialize_by_alias=True,
+        alias_generator=to_camel_case,
+    )
+
+
+class VehicleSummary(BaseModel):
+    id: int
+    license_plate: str
+    type: str
+
+    model_config = ConfigDict(
+        from_attributes=True,
+        validate_by_alias=False,
+        validate_by_name=True,
+        serialize_by_alias=True,
+        alias_generator=to_camel_case,
+    )
+
+
+class DeliveryStaffSummary(BaseModel):
+    id: int
+    name: str
+    phone: str
+    employee_id: str
+
+    model_config = ConfigDict(
+        from_attributes=True,
+        validate_by_alias=False,
+        validate_by_name=True,
+        serialize_by_alias=True,
+        alias_generator=to_camel_case,
+    )
+
+
+# Relationships a parcel read can embed with ?include=, and how each is shown.
+PARCEL_INCLUDES: dict[str, type[BaseModel]] = {
+    "sender": CustomerSummary,
+    "receiver": CustomerSummary,
+    "origin_station": StationSummary,
+    "destination_station": StationSummary,
+    "vehicle": VehicleSummary,
+    "delivery_staff": DeliveryStaffSummary,
+}
+
+
+@lru_cache(maxsize=256)
+def parcel_view(
+    fields: frozenset[str] | None, include: frozenset[str]
+) -> type[BaseModel]:
+    """Response model holding only ``fields`` (all if None) plus ``include``.
+
+    ``id`` is always kept. Models are built once per combination.
+    """
+    if fields is None and not include:
+        return ParcelResponse
+    kept = {
+        name: (info.annotation, info)
+        for name, info in ParcelResponse.model_fields.items()
+        if fields is None or name == "id" or name in fields
+    }
+    related = {name: (PARCEL_INCLUDES[name] | None, None) for name in sorted(include)}
+    return create_model(
+        "ParcelView", __config__=ParcelResponse.model_config, **kept, **related
+    )
+
+
+class TrackingResponse(BaseModel):
+    tracking_number: str
+    status: ParcelStatus
+    updated_at: datetime.datetime
+    origin_station: StationSummary | None = None
+    destination_station: StationSummary | None = None
+
+    model_config = ConfigDict(
+        validate_by_alias=False,
+        validate_by_name=True,
+        serialize_by_alias=True,
+        alias_generator=to_camel_case,
+    )
+
+
+MAX_SCAN_BATCH_SIZE = 5000
+
+
+class ParcelScan(BaseModel):
+    tracking_number: str
+    status: ParcelStatus
+    # Checked against the stations table; Parcel has no location to store it in.
+    station_id: int | None = None
+    timestamp: datetime.datetime
+
+    model_config = ConfigDict(
+        validate_by_name=True, alias_generator=to_camel_case, populate_by_name=True
+    )
+
+    @field_validator("timestamp")
+    @classmethod
+    def to_local_time(cls, value: datetime.datetime) -> datetime.datetime:
+        """Parcels store naive local times; convert scans with an offset to match."""
+        if value.tzinfo is None:
+            return value
+        return value.astimezone().replace(tzinfo=None)
+
+
+class ScanBatch(BaseModel):
+    scans: List[ParcelScan] = Field(min_length=1, max_length=MAX_SCAN_BATCH_SIZE)
+
+
+class ScanOutcome(str, Enum):
+    UPDATED = "updated"
+    UNCHANGED = "unchanged"  # parcel already had this status
+    DUPLICATE = "duplicate"  # same scan appeared earlier in the batch
+    SUPERSEDED = "superseded"  # a later scan of the parcel is in the batch
+    STALE = "stale"  # parcel changed after this scan was taken
+    NOT_FOUND = "not_found"
+    UNKNOWN_STATION = "unknown_station"
+
+
+class ScanResult(BaseModel):
+    tracking_number: str
+    outcome: ScanOutcome
+
+    model_config = ConfigDict(
+        validate_by_alias=False,
+        validate_by_name=True,
+        serialize_by_alias=True,
+        alias_generator=to_camel_case,
+    )
+
+
+class ScanBatchResponse(BaseModel):
+    results: List[ScanResult]
+    summary: dict[ScanOutcome, int]
+
+
+class StationParcelCounts(BaseModel):
+    station_id: int
+    origin: dict[ParcelStatus, int] = Field(default_factory=dict)
+    destination: dict[ParcelStatus, int] = Field(default_factory=dict)
+
+    model_config = ConfigDict(
+        validate_by_alias=False,
+        validate_by_name=True,
+        serialize_by_alias=True,
+        alias_generator=to_camel_case,
+    )
+
+
+class LoadPlanRequest(BaseModel):
+    station_id: int
+    vehicle_ids: List[int] | None = None  # default: every active vehicle
+    dry_run: bool = False
+
+    model_config = ConfigDict(
+        validate_by_name=True, alias_generator=to_camel_case, populate_by_name=True
+    )
+
+
+class VehicleLoad(BaseModel):
+    vehicle_id: int
+    parcels: int
+    weight: float
+    volume: float
+    weight_capacity: float
+    volume_capacity: float | None = None
+
+    model_config = ConfigDict(
+        validate_by_alias=False,
+        validate_by_name=True,
+        serialize_by_alias=True,
+        alias_generator=to_camel_case,
+    )
+
+
+class LoadPlanResponse(BaseModel):
+    assigned: int
+    unassigned: int
+    vehicles: List[VehicleLoad]
+    dry_run: bool
+
+    model_config = ConfigDict(
+        validate_by_alias=False,
+        validate_by_name=True,
+        serialize_by_alias=True,
+        alias_generator=to_camel_case,
+    )
+
+
+class DeliveryBatchRequest(BaseModel):
+    destination_station_id: int | None = None  # default: every station
+
+    model_config = ConfigDict(
+        validate_by_name=True, alias_generator=to_camel_case, populate_by_name=True
+    )
+
+
+class StaffBatch(BaseModel):
+    delivery_staff_id: int
+    assigned: int
+    parcels: int  # out for delivery with this courier, including earlier runs
+    weight: float
+
+    model_config = ConfigDict(
+        validate_by_alias=False,
+        validate_by_name=True,
+        serialize_by_alias=True,
+        alias_generator=to_camel_case,
+    )
+
+
+class DeliveryBatchResponse(BaseModel):
+    assigned: int
+    unassigned: int
+    staff: List[StaffBatch]
+
+
+MAX_QUOTE_BATCH_SIZE = 10_000
+
+
+class QuoteItem(BaseModel):
+    origin_station_id: int | None = None
+    destination_station_id: int | None = None
+    weight: float = Field(ge=0)
+    length: float = Field(ge=0)
+    width: float = Field(ge=0)
+    height: float = Field(ge=0)
+
+    model_config = ConfigDict(
+        validate_by_name=True, alias_generator=to_camel_case, populate_by_name=True
+    )
+
+
+class QuoteBatch(BaseModel):
+    items: List[QuoteItem] = Field(min_length=1, max_length=MAX_QUOTE_BATCH_SIZE)
+
+
+class Quote(BaseModel):
+    billable_weight: float
+    price: Decimal
+    rate_found: bool  # False: priced with the default rate
+
+    model_config = ConfigDict(
+        validate_by_alias=False,
+        validate_by_name=True,
+        serialize_by_alias=True,
+        alias_generator=to_camel_case,
+    )
+
+
+class QuoteBatchResponse(BaseModel):
+    quotes: List[Quote]
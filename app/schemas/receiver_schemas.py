@@ -0,0 +1,41 @@
+from typing import Optional
+from pydantic import BaseModel, EmailStr, field_validator
+from datetime import datetime
+
+
+# Pydantic Models
+class ReceiverBase(BaseModel):
+    name: str
+    email: EmailStr
+    phone: Optional[str] = None
+    address: Optional[str] = None
+    is_active: bool = True
+
+
+class ReceiverCreate(ReceiverBase):
+    pass
+
+
+class ReceiverUpdate(BaseModel):
+    name: Optional[str] = None
+    email: Optional[EmailStr] = None
+    phone: Optional[str] = None
+    address: Optional[str] = None
+    is_active: Optional[bool] = None
+
+    @field_validator("name", "email", "is_active")
+    @classmethod
+    def not_null(cls, value):
+        """Omit a field to leave it unchanged; these columns cannot be null."""
+        if value is None:
+            raise ValueError("may not be null")
+        return value
+
+
+class Receiver(ReceiverBase):
+    id: int
+    created_at: datetime
+    updated_at: datetime
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,21 @@
+from typing import List
+
+from pydantic import BaseModel
+
+from app.schemas.parcel_schemas import CustomerSummary, StationSummary
+
+
+class CustomerHit(CustomerSummary):
+    score: float  # trigram similarity to the query, 0 to 1
+
+
+class StationHit(StationSummary):
+    score: float
+
+
+class CustomerSearchResponse(BaseModel):
+    results: List[CustomerHit]
+
+
+class StationSearchResponse(BaseModel):
+    results: List[StationHit]
@@ -1,4 +1,5 @@
 from typing import List
+from uuid import UUID
 from pydantic import BaseModel, ConfigDict
 
 
@@ -31,14 +32,20 @@ class UpdatedUser(BaseModel):
 
 
 class UserResponse(BaseModel):
-    id: str
+    id: UUID
     username: str
     email: str
     first_name: str
     last_name: str
 
+    # Response-only: validate by field name so from_attributes never probes
+    # the camelCase aliases on DB rows; aliases are still used for output.
     model_config = ConfigDict(
-        validate_by_name=True, populate_by_name=True, alias_generator=to_camel_case
+        from_attributes=True,
+        validate_by_alias=False,
+        validate_by_name=True,
+        serialize_by_alias=True,
+        alias_generator=to_camel_case,
     )
 
 
@@ -48,5 +55,6 @@ class UserListResponse(BaseModel):
 
 class ReadUsersResponse(BaseModel):
     users: List[UserResponse]
-    total_count: int
+    total_count: int | None = None
     has_more: bool
+    next_cursor: str | None = None
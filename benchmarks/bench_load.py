@@ -0,0 +1,381 @@
+"""End-to-end load benchmark over the ASGI app.
+
+Seeds a SQLite database, then drives workloads through httpx.ASGITransport
+at each concurrency level and reports requests per second plus p50/p95/p99
+latency, overall and per operation. Results are written as stable, sorted
+JSON so two runs can be diffed, or compared with --compare.
+
+    python -m benchmarks.bench_load --users 10000 --concurrency 1,8,32 \\
+        --workload mixed --output bench.json
+    python -m benchmarks.bench_load --compare bench.json
+"""
+
+import argparse
+import asyncio
+import datetime
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import uuid
+from collections import defaultdict
+from dataclasses import dataclass, field
+
+import bcrypt
+import httpx
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlmodel import insert
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core import database, login_throttle
+from app.core.migrations import run_migrations
+from app.core.pagination import encode_cursor
+from app.main import app
+from app.models.user_model import DBUser
+
+SEED_PASSWORD = "bench-password"
+SEED_BATCH_SIZE = 500
+UNTHROTTLED_BURST = 10**9
+
+
+@dataclass
+class Context:
+    users: int
+    tokens: list[str] = field(default_factory=list)
+    cursors: list[str] = field(default_factory=list)
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self.errors: dict[str, int] = defaultdict(int)
+
+    async def request(self, client: httpx.AsyncClient, name: str, method, url, **kw):
+        started = time.perf_counter()
+        response = await client.request(method, url, **kw)
+        self.latencies[name].append(time.perf_counter() - started)
+        if response.status_code >= 400:
+            self.errors[name] += 1
+        return response
+
+
+def seed_username(i: int) -> str:
+    return f"seed{i}"
+
+
+async def op_login(client, recorder: Recorder, ctx: Context, rng: random.Random):
+    await recorder.request(
+        client,
+        "login",
+        "POST",
+        "/api/v1/auth/token",
+        data={
+            "username": seed_username(rng.randrange(ctx.users)),
+            "password": SEED_PASSWORD,
+        },
+    )
+
+
+async def op_read_me(client, recorder: Recorder, ctx: Context, rng: random.Random):
+    token = rng.choice(ctx.tokens)
+    await recorder.request(
+        client,
+        "read_me",
+        "GET",
+        "/api/v1/users/me",
+        headers={"Authorization": f"Bearer {token}"},
+    )
+
+
+async def op_list_offset(client, recorder: Recorder, ctx: Context, rng: random.Random):
+    offset = rng.randrange(max(ctx.users - 100, 1))
+    await recorder.request(
+        client, "list_offset", "GET", f"/api/v1/users/?offset={offset}&limit=100"
+    )
+
+
+async def op_list_cursor(client, recorder: Recorder, ctx: Context, rng: random.Random):
+    cursor = rng.choice(ctx.cursors)
+    await recorder.request(
+        client, "list_cursor", "GET", f"/api/v1/users/?cursor={cursor}&limit=100"
+    )
+
+
+async def op_crud(client, recorder: Recorder, ctx: Context, rng: random.Random):
+    name = f"bench-{uuid.uuid4().hex[:12]}"
+    response = await recorder.request(
+        client,
+        "create_user",
+        "POST",
+        "/api/v1/users/",
+        json={
+            "username": name,
+            "email": f"{name}@example.com",
+            "firstName": "Bench",
+            "lastName": "User",
+            "password": SEED_PASSWORD,
+        },
+    )
+    if response.status_code != 201:
+        return
+    user_id = response.json()["id"]
+    await recorder.request(client, "read_user", "GET", f"/api/v1/users/{user_id}")
+    await recorder.request(
+        client, "update_user", "PUT", f"/api/v1/users/{user_id}", json={"lastName": "X"}
+    )
+    await recorder.request(client, "delete_user", "DELETE", f"/api/v1/users/{user_id}")
+
+
+WORKLOADS = {
+    "login": [(op_login, 1)],
+    "read": [(op_read_me, 1)],
+    "list": [(op_list_offset, 1), (op_list_cursor, 1)],
+    "crud": [(op_crud, 1)],
+    "mixed": [
+        (op_login, 1),
+        (op_read_me, 12),
+        (op_list_offset, 2),
+        (op_list_cursor, 3),
+        (op_crud, 1),
+    ],
+}
+
+
+async def seed(users: int):
+    """Insert ``users`` rows sharing one precomputed hash."""
+    password = bcrypt.hashpw(SEED_PASSWORD.encode("utf-8"), bcrypt.gensalt()).decode(
+        "utf-8"
+    )
+    now = datetime.datetime.now()
+    async with database.async_session_factory() as session:
+        for start in range(0, users, SEED_BATCH_SIZE):
+            rows = [
+                {
+                    "id": uuid.uuid4(),
+                    "email": f"{seed_username(i)}@example.com",
+                    "username": seed_username(i),
+                    "first_name": "Seed",
+                    "last_name": str(i),
+                    "status": "active",
+                    "password": password,
+                    "register_date": now,
+                    "updated_date": now,
+                    "last_login_date": None,
+                }
+                for i in range(start, min(start + SEED_BATCH_SIZE, users))
+            ]
+            await session.exec(insert(DBUser).values(rows))
+            await session.commit()
+
+
+async def prepare(client: httpx.AsyncClient, ctx: Context, rng: random.Random):
+    """Log in a pool of users and collect cursors before measuring."""
+    for _ in range(min(50, ctx.users)):
+        response = await client.post(
+            "/api/v1/auth/token",
+            data={
+                "username": seed_username(rng.randrange(ctx.users)),
+                "password": SEED_PASSWORD,
+            },
+        )
+        if response.status_code != 200:
+            raise RuntimeError(
+                f"Login failed while preparing: {response.status_code} {response.text}"
+            )
+        ctx.tokens.append(response.json()["access_token"])
+
+    response = await client.get("/api/v1/users/?paginate=cursor&limit=100")
+    while response.json()["next_cursor"] and len(ctx.cursors) < 100:
+        ctx.cursors.append(response.json()["next_cursor"])
+        response = await client.get(
+            f"/api/v1/users/?cursor={ctx.cursors[-1]}&limit=100"
+        )
+    if not ctx.cursors:
+        # Fewer than one page of users: start every cursor read at the top.
+        ctx.cursors.append(encode_cursor({"id": str(uuid.UUID(int=0))}))
+
+
+def percentiles(samples: list[float]) -> dict:
+    if not samples:
+        return {"p50": None, "p95": None, "p99": None}
+    ordered = sorted(samples)
+
+    def pick(q: float) -> float:
+        index = min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))
+        return round(ordered[index] * 1000, 3)
+
+    return {"p50": pick(0.50), "p95": pick(0.95), "p99": pick(0.99)}
+
+
+async def run_level(
+    client: httpx.AsyncClient,
+    ctx: Context,
+    workload: str,
+    concurrency: int,
+    total_ops: int,
+    seed_value: int,
+) -> dict:
+    recorder = Recorder()
+    ops, weights = zip(*WORKLOADS[workload])
+    remaining = total_ops
+
+    async def worker(worker_id: int):
+        nonlocal remaining
+        rng = random.Random(seed_value * 1000 + worker_id)
+        while remaining > 0:
+            remaining -= 1
+            op = rng.choices(ops, weights)[0]
+            await op(client, recorder, ctx, rng)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    all_samples = [s for samples in recorder.latencies.values() for s in samples]
+    return {
+        "workload": workload,
+        "concurrency": concurrency,
+        "requests": len(all_samples),
+        "errors": sum(recorder.errors.values()),
+        "seconds": round(elapsed, 3),
+        "rps": round(len(all_samples) / elapsed, 1) if elapsed else None,
+        "latency_ms": percentiles(all_samples),
+        "operations": {
+            name: {
+                "requests": len(samples),
+                "errors": recorder.errors.get(name, 0),
+                "latency_ms": percentiles(samples),
+            }
+            for name, samples in sorted(recorder.latencies.items())
+        },
+    }
+
+
+async def run(args) -> dict:
+    db_path = args.database or os.path.join(tempfile.mkdtemp(), "bench.db")
+    if os.path.exists(db_path):
+        os.remove(db_path)
+    url = f"sqlite+aiosqlite:///{db_path}"
+
+    if not args.throttle_logins:
+        # Every request comes from one client IP, which the login throttle would
+        # answer with 429 after a few dozen logins. Lift it so the login path is
+        # what gets measured.
+        login_throttle.settings.LOGIN_THROTTLE_IP_BURST = UNTHROTTLED_BURST
+        login_throttle.settings.LOGIN_THROTTLE_USER_BURST = UNTHROTTLED_BURST
+    login_throttle.login_throttle.clear()
+
+    database.engine = create_async_engine(url, **database._engine_kwargs(url))
+    database.async_session_factory = async_sessionmaker(
+        database.engine, expire_on_commit=False, class_=AsyncSession
+    )
+    try:
+        await run_migrations(database.engine)
+        print(f"Seeding {args.users} users into {db_path}", file=sys.stderr)
+        await seed(args.users)
+
+        ctx = Context(users=args.users)
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://bench", timeout=None
+        ) as client:
+            await prepare(client, ctx, random.Random(args.seed))
+
+            results = []
+            workloads = list(WORKLOADS) if args.workload == "all" else [args.workload]
+            for workload in workloads:
+                for concurrency in args.concurrency:
+                    print(
+                        f"Running {workload} at concurrency {concurrency}",
+                        file=sys.stderr,
+                    )
+                    results.append(
+                        await run_level(
+                            client,
+                            ctx,
+                            workload,
+                            concurrency,
+                            args.requests,
+                            args.seed,
+                        )
+                    )
+    finally:
+        await database.close_db()
+
+    return {
+        "config": {
+            "users": args.users,
+            "requests_per_level": args.requests,
+            "concurrency": args.concurrency,
+            "workload": args.workload,
+            "seed": args.seed,
+            "throttle_logins": args.throttle_logins,
+        },
+        "results": results,
+    }
+
+
+def compare(baseline: dict, current: dict) -> list[str]:
+    """Summarize rps and p95 changes between two result files."""
+    previous = {(r["workload"], r["concurrency"]): r for r in baseline["results"]}
+    lines = []
+    for result in current["results"]:
+        key = (result["workload"], result["concurrency"])
+        before = previous.get(key)
+        if before is None:
+            continue
+
+        def delta(new, old):
+            if not old or new is None:
+                return "n/a"
+            return f"{(new - old) / old * 100:+.1f}%"
+
+        lines.append(
+            f"{key[0]:>6} c={key[1]:<4} "
+            f"rps {before['rps']} -> {result['rps']} ({delta(result['rps'], before['rps'])}), "
+            f"p95 {before['latency_ms']['p95']} -> {result['latency_ms']['p95']} ms "
+            f"({delta(result['latency_ms']['p95'], before['latency_ms']['p95'])})"
+        )
+    return lines
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument(
+        "--concurrency",
+        type=lambda value: [int(v) for v in value.split(",")],
+        default=[1, 8, 32],
+    )
+    parser.add_argument(
+        "--requests", type=int, default=2000, help="operations per level"
+    )
+    parser.add_argument("--workload", choices=[*WORKLOADS, "all"], default="mixed")
+    parser.add_argument("--database", help="SQLite file to (re)create")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument(
+        "--throttle-logins",
+        action="store_true",
+        help="keep the configured login throttle (logins mostly measure 429s)",
+    )
+    parser.add_argument("--output", help="write JSON results here")
+    parser.add_argument("--compare", help="baseline JSON to compare against")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    report = asyncio.run(run(args))
+    output = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+    if args.compare:
+        with open(args.compare) as f:
+            for line in compare(json.load(f), report):
+                print(line, file=sys.stderr)
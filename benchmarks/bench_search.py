@@ -0,0 +1,113 @@
+"""Build time, memory and query latency of the in-process search index.
+
+Indexes synthetic customers (name, email) the way customer search does on
+SQLite, then times a spread of queries: short and long prefixes, misspelt
+full names, and words every row shares. Latencies are per query, median and
+worst over the repeats.
+
+    python -m benchmarks.bench_search --rows 1000000 --repeat 50
+"""
+
+import argparse
+import gc
+import json
+import random
+import resource
+import statistics
+import time
+
+from app.core import config
+from app.core.search import TrigramIndex, customer_search
+
+ONSETS = ["", "b", "ch", "d", "f", "g", "h", "j", "k", "kh", "l", "m", "n", "ng",
+          "p", "ph", "r", "s", "sr", "t", "th", "v", "w", "y", "z"]  # fmt: skip
+VOWELS = ["a", "ai", "ao", "e", "ee", "i", "o", "oo", "u", "ua"]
+CODAS = ["", "", "k", "m", "n", "ng", "p", "t", "s", "r", "l"]
+DOMAINS = ["example.com", "mail.example.com", "corp.example.co.th"]
+
+
+def make_name(rng: random.Random, syllables: int) -> str:
+    return "".join(
+        rng.choice(ONSETS) + rng.choice(VOWELS) + rng.choice(CODAS)
+        for _ in range(syllables)
+    )
+
+
+def make_rows(count: int, rng: random.Random) -> list[tuple]:
+    """Customers with made-up names; the few domains are shared by all."""
+    firsts = [make_name(rng, rng.randint(1, 3)) for _ in range(max(100, count // 50))]
+    rows = []
+    for doc_id in range(1, count + 1):
+        first = rng.choice(firsts)
+        last = make_name(rng, rng.randint(2, 4))
+        email = f"{first}.{last}{doc_id % 100}@{rng.choice(DOMAINS)}"
+        name = f"{first.title()} {last.title()}"
+        rows.append((doc_id, *customer_search.index_texts((name, email))))
+    return rows
+
+
+def max_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def timed(func, repeat: int) -> dict:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - started) * 1e3)
+    return {
+        "median_ms": round(statistics.median(samples), 3),
+        "max_ms": round(max(samples), 3),
+    }
+
+
+def main(rows_count: int, repeat: int, seed: int) -> dict:
+    rng = random.Random(seed)
+    rows = make_rows(rows_count, rng)
+    sample_name = rows[rows_count // 2][1]
+    typo = sample_name[:3] + sample_name[4:]  # one letter dropped
+
+    gc.collect()
+    rss_before = max_rss_mb()
+    index = TrigramIndex(2)
+    started = time.perf_counter()
+    index.build(rows)
+    build_seconds = time.perf_counter() - started
+    rss_after = max_rss_mb()
+
+    threshold = config.get_settings().SEARCH_MIN_SIMILARITY
+    queries = {
+        "one letter prefix": "s",
+        "word prefix": sample_name[:4],
+        "two word prefix": sample_name.split()[0] + " " + sample_name.split()[1][:3],
+        "exact full name": sample_name,
+        "misspelt full name": typo,
+        "common word": "example",
+    }
+    latencies = {
+        label: timed(lambda q=query: index.search(q, 20, threshold), repeat)
+        for label, query in queries.items()
+    }
+
+    puts = iter(range(rows_count + 1, rows_count + 1 + repeat))
+    latencies["put"] = timed(
+        lambda: index.put(next(puts), ("New Customer", "new.customer")), repeat
+    )
+    return {
+        "rows": rows_count,
+        "repeat": repeat,
+        "build_seconds": round(build_seconds, 2),
+        "index_rss_mb": round(rss_after - rss_before),
+        "queries": queries,
+        "latency": latencies,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    print(json.dumps(main(args.rows, args.repeat, args.seed), indent=2))
@@ -0,0 +1,134 @@
+"""Per-row cost of building and encoding a page of users.
+
+"before" is the old handler path: the previous UserResponse schema built
+field by field, then re-validated against response_model and encoded by
+FastAPI's JSONResponse.
+"after" validates each DB row once with from_attributes and renders it with
+FastJSONResponse.
+
+    python -m benchmarks.bench_serialization --rows 100 --repeat 200
+"""
+
+import argparse
+import asyncio
+import datetime
+import json
+import time
+import uuid
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+from pydantic import BaseModel, ConfigDict
+
+from app.core.responses import FastJSONResponse
+from app.models.user_model import DBUser
+from app.schemas.user_schemas import ReadUsersResponse, UserResponse, to_camel_case
+
+
+class LegacyUserResponse(BaseModel):
+    """UserResponse as it was before the fast path."""
+
+    id: str
+    username: str
+    email: str
+    first_name: str
+    last_name: str
+
+    model_config = ConfigDict(
+        validate_by_name=True, populate_by_name=True, alias_generator=to_camel_case
+    )
+
+
+class LegacyReadUsersResponse(BaseModel):
+    users: list[LegacyUserResponse]
+    total_count: int
+    has_more: bool
+
+
+def make_rows(count: int) -> list[DBUser]:
+    now = datetime.datetime.now()
+    return [
+        DBUser(
+            id=uuid.uuid4(),
+            email=f"user{i}@example.com",
+            username=f"user{i}",
+            first_name="First",
+            last_name="Last",
+            password="x",
+            register_date=now,
+            updated_date=now,
+        )
+        for i in range(count)
+    ]
+
+
+response_field = create_model_field(
+    name="Response_read_users", type_=LegacyReadUsersResponse, mode="serialization"
+)
+
+
+async def before(rows: list[DBUser]) -> bytes:
+    page = LegacyReadUsersResponse(
+        users=[
+            LegacyUserResponse(
+                id=str(user.id),
+                username=user.username,
+                email=user.email,
+                first_name=user.first_name,
+                last_name=user.last_name,
+            )
+            for user in rows
+        ],
+        total_count=len(rows),
+        has_more=False,
+    )
+    content = await serialize_response(field=response_field, response_content=page)
+    return JSONResponse(content).body
+
+
+async def after(rows: list[DBUser]) -> bytes:
+    page = ReadUsersResponse(
+        users=[UserResponse.model_validate(user) for user in rows],
+        total_count=len(rows),
+        has_more=False,
+    )
+    return FastJSONResponse(page).body
+
+
+async def measure(func, rows: list[DBUser], repeat: int, rounds: int = 5) -> float:
+    """Best per-row time over several rounds, to filter out scheduler noise."""
+    await func(rows)  # warm up
+    best = float("inf")
+    for _ in range(rounds):
+        started = time.perf_counter()
+        for _ in range(repeat):
+            await func(rows)
+        best = min(best, (time.perf_counter() - started) / (repeat * len(rows)))
+    return best
+
+
+async def main(rows_count: int, repeat: int) -> dict:
+    rows = make_rows(rows_count)
+    expected = json.loads(await before(rows))
+    actual = json.loads(await after(rows))
+    actual.pop("next_cursor")
+    assert actual == expected
+
+    before_us = await measure(before, rows, repeat) * 1e6
+    after_us = await measure(after, rows, repeat) * 1e6
+    return {
+        "rows": rows_count,
+        "repeat": repeat,
+        "before_us_per_row": round(before_us, 3),
+        "after_us_per_row": round(after_us, 3),
+        "speedup": round(before_us / after_us, 2),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(main(args.rows, args.repeat)), indent=2))
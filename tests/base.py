@@ -16,6 +16,9 @@ import pytest_asyncio
 # Update this import path to match where your FastAPI app instance is defined]
 from app.main import app
 from app.core.database import get_session
+from app.core.login_throttle import login_throttle
+from app.models.customer_model import Customer
+from app.models.station_model import Station
 
 
 @pytest_asyncio.fixture
@@ -56,6 +59,7 @@ async def client(session):
         yield session
 
     app.dependency_overrides[get_session] = get_session_override
+    login_throttle.clear()  # every test starts with full login buckets
 
     transport = httpx.ASGITransport(app=app)
     async with AsyncClient(
@@ -64,3 +68,34 @@ async def client(session):
         yield client
 
     app.dependency_overrides.clear()
+
+
+@pytest_asyncio.fixture
+async def parcel_refs(session):
+    """Create the customers and stations a parcel refers to."""
+    sender = Customer(name="Sender", email="sender@example.com")
+    receiver = Customer(name="Receiver", email="receiver@example.com")
+    origin = Station(
+        name="Hat Yai Hub",
+        code="HDY",
+        address="1 Main Rd",
+        city="Hat Yai",
+        state="Songkhla",
+        postal_code="90110",
+    )
+    destination = Station(
+        name="Phuket Depot",
+        code="HKT",
+        address="2 Beach Rd",
+        city="Phuket",
+        state="Phuket",
+        postal_code="83000",
+    )
+    session.add_all([sender, receiver, origin, destination])
+    await session.commit()
+    return {
+        "senderId": sender.id,
+        "receiverId": receiver.id,
+        "originStationId": origin.id,
+        "destinationStationId": destination.id,
+    }
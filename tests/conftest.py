@@ -2,4 +2,4 @@
 Test configuration and shared fixtures.
 """
 
-from .base import client, engine, session  # noqa: F401
+from .base import client, engine, parcel_refs, session  # noqa: F401
@@ -0,0 +1,126 @@
+import bcrypt
+import pytest
+
+from app.core.refresh_tokens import refresh_token_store
+
+
+@pytest.fixture
+def user_data():
+    return {
+        "username": "loginuser",
+        "email": "login@example.com",
+        "firstName": "Login",
+        "lastName": "User",
+        "password": "securepassword123",
+    }
+
+
+@pytest.mark.asyncio
+async def test_login_by_username_or_email(client, user_data):
+    await client.post("/api/v1/users/", json=user_data)
+
+    for login in (user_data["username"], user_data["email"]):
+        response = await client.post(
+            "/api/v1/auth/token",
+            data={"username": login, "password": user_data["password"]},
+        )
+        assert response.status_code == 200
+        assert response.json()["token_type"] == "Bearer"
+
+
+@pytest.mark.asyncio
+async def test_login_rejects_bad_credentials(client, user_data):
+    await client.post("/api/v1/users/", json=user_data)
+
+    response = await client.post(
+        "/api/v1/auth/token",
+        data={"username": user_data["username"], "password": "wrong"},
+    )
+    assert response.status_code == 401
+
+    response = await client.post(
+        "/api/v1/auth/token",
+        data={"username": "nobody", "password": user_data["password"]},
+    )
+    assert response.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_failed_login_checks_password_once(client, user_data, monkeypatch):
+    await client.post("/api/v1/users/", json=user_data)
+
+    checks = []
+    checkpw = bcrypt.checkpw
+    monkeypatch.setattr(
+        bcrypt, "checkpw", lambda *args: checks.append(args) or checkpw(*args)
+    )
+
+    response = await client.post(
+        "/api/v1/auth/token",
+        data={"username": user_data["username"], "password": "wrong"},
+    )
+    assert response.status_code == 401
+    assert len(checks) == 1
+
+
+async def refresh(client, refresh_token):
+    return await client.post(
+        "/api/v1/auth/refresh", json={"refresh_token": refresh_token}
+    )
+
+
+@pytest.mark.asyncio
+async def test_refresh_rotates_without_checking_the_password(
+    client, user_data, monkeypatch
+):
+    refresh_token_store.clear()
+    await client.post("/api/v1/users/", json=user_data)
+    tokens = (
+        await client.post(
+            "/api/v1/auth/token",
+            data={"username": user_data["username"], "password": user_data["password"]},
+        )
+    ).json()
+
+    monkeypatch.setattr(bcrypt, "checkpw", lambda *args: pytest.fail("bcrypt used"))
+    response = await refresh(client, tokens["refresh_token"])
+    assert response.status_code == 200
+    rotated = response.json()
+    assert rotated["refresh_token"] != tokens["refresh_token"]
+
+    headers = {"Authorization": f"Bearer {rotated['access_token']}"}
+    assert (await client.get("/api/v1/users/me", headers=headers)).status_code == 200
+    # A refresh token is not an access token.
+    headers = {"Authorization": f"Bearer {rotated['refresh_token']}"}
+    assert (await client.get("/api/v1/users/me", headers=headers)).status_code == 401
+
+    response = await refresh(client, rotated["access_token"])
+    assert response.status_code == 401
+    response = await refresh(client, "not-a-token")
+    assert response.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_refresh_token_reuse_revokes_the_family(client, user_data):
+    refresh_token_store.clear()
+    await client.post("/api/v1/users/", json=user_data)
+    login = (
+        await client.post(
+            "/api/v1/auth/token",
+            data={"username": user_data["username"], "password": user_data["password"]},
+        )
+    ).json()
+    rotated = (await refresh(client, login["refresh_token"])).json()
+
+    # Forget the in-process set so the database has to catch the reuse.
+    refresh_token_store.clear()
+    response = await refresh(client, login["refresh_token"])
+    assert response.status_code == 401
+    assert response.json()["detail"] == "Refresh token reuse detected"
+
+    # The legitimate, newer token of the same family is now revoked too.
+    response = await refresh(client, rotated["refresh_token"])
+    assert response.status_code == 401
+    refresh_token_store.clear()
+    response = await refresh(client, rotated["refresh_token"])
+    assert response.status_code == 401
@@ -0,0 +1,26 @@
+from app.core import database
+
+
+def test_engine_kwargs_sets_pool_options_for_file_databases():
+    kwargs = database._engine_kwargs("sqlite+aiosqlite:///database.db")
+
+    assert kwargs["poolclass"] is database.TimedQueuePool
+    assert kwargs["pool_size"] == database.settings.DB_POOL_SIZE
+    assert kwargs["pool_pre_ping"] == database.settings.DB_POOL_PRE_PING
+    assert "ssl" not in kwargs["connect_args"]
+
+
+def test_engine_kwargs_skips_pool_options_for_memory_databases():
+    kwargs = database._engine_kwargs("sqlite+aiosqlite:///:memory:")
+
+    assert "poolclass" not in kwargs
+    assert "pool_size" not in kwargs
+
+
+def test_pool_stats_tracks_max_wait():
+    stats = database.PoolStats()
+    stats.record(0.01)
+    stats.record(0.05)
+
+    assert stats.checkouts == 2
+    assert stats.wait_seconds_max == 0.05
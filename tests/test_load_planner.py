@@ -0,0 +1,80 @@
+import numpy as np
+import pytest
+
+from app.core.load_planner import UNASSIGNED, plan_loads
+from app.models.parcel_model import Parcel
+from app.models.vehicle_model import Vehicle
+
+
+def test_plan_respects_weight_and_volume():
+    rng = np.random.default_rng(0)
+    weights = rng.uniform(0.1, 30, 20_000)
+    volumes = rng.uniform(0.001, 0.2, 20_000)
+    weight_capacity = np.array([5_000.0, 2_000.0, 800.0])
+    volume_capacity = np.array([40.0, np.inf, 10.0])
+
+    assignment = plan_loads(weights, volumes, weight_capacity, volume_capacity)
+
+    for vehicle in range(3):
+        mask = assignment == vehicle
+        assert weights[mask].sum() <= weight_capacity[vehicle]
+        assert volumes[mask].sum() <= volume_capacity[vehicle]
+    # No leftover parcel fits the weight and volume any vehicle has left.
+    left = assignment == UNASSIGNED
+    assert left.any()
+    for vehicle in range(3):
+        mask = assignment == vehicle
+        weight_room = weight_capacity[vehicle] - weights[mask].sum()
+        volume_room = volume_capacity[vehicle] - volumes[mask].sum()
+        fits = (weights[left] <= weight_room) & (volumes[left] <= volume_room)
+        assert not fits.any(), vehicle
+
+
+def test_oversized_parcel_is_skipped_not_blocking():
+    assignment = plan_loads(
+        np.array([500.0, 10.0, 10.0]),
+        np.zeros(3),
+        np.array([100.0]),
+        np.array([np.inf]),
+    )
+    assert assignment.tolist() == [UNASSIGNED, 0, 0]
+
+
+@pytest.mark.asyncio
+async def test_load_plan_endpoint_assigns_vehicles(client, session, parcel_refs):
+    truck = Vehicle(license_plate="TRUCK-1", type="truck", capacity=25)
+    van = Vehicle(license_plate="VAN-1", type="van", capacity=5, volume_capacity=0.2)
+    session.add_all([truck, van])
+    await session.commit()
+    for i, weight in enumerate((20, 4, 4, 3)):
+        session.add(
+            Parcel(
+                tracking_number=f"LP{i}",
+                weight=weight,
+                length=50,
+                width=50,
+                height=50,
+                service_price=10,
+                sender_id=parcel_refs["senderId"],
+                receiver_id=parcel_refs["receiverId"],
+                origin_station_id=parcel_refs["originStationId"],
+            )
+        )
+    await session.commit()
+
+    request = {"stationId": parcel_refs["originStationId"]}
+    response = await client.post(
+        "/api/v1/parcels/load-plan", json={**request, "dryRun": True}
+    )
+    body = response.json()
+    assert (body["assigned"], body["unassigned"]) == (3, 1)
+
+    response = await client.post("/api/v1/parcels/load-plan", json=request)
+    loads = {load["vehicleId"]: load for load in response.json()["vehicles"]}
+    assert loads[truck.id]["weight"] == 24
+    # Each parcel is 0.125 m^3, so the van's volume runs out after one.
+    assert (loads[van.id]["parcels"], loads[van.id]["weight"]) == (1, 4)
+
+    session.expire_all()
+    parcels = (await session.exec(Parcel.__table__.select())).all()
+    assert sum(parcel.vehicle_id is not None for parcel in parcels) == 3
@@ -0,0 +1,49 @@
+import json
+import logging
+import queue
+
+from app.core import log
+
+
+def make_record(level=logging.INFO, **extra):
+    record = logging.makeLogRecord(
+        {"name": "app.test", "levelno": level, "levelname": logging.getLevelName(level)}
+    )
+    record.msg = "hello %s"
+    record.args = ("world",)
+    record.__dict__.update(extra)
+    return record
+
+
+def test_json_formatter_includes_extra_fields():
+    entry = json.loads(log.JSONFormatter().format(make_record(user_id=7)))
+    assert entry["msg"] == "hello world"
+    assert entry["level"] == "INFO"
+    assert entry["logger"] == "app.test"
+    assert entry["user_id"] == 7
+
+
+def test_sampling_never_drops_warnings():
+    sampler = log.SamplingFilter({logging.INFO: 0.0})
+    assert not sampler.filter(make_record(logging.INFO))
+    assert sampler.filter(make_record(logging.INFO, sample_rate=1.0))
+    assert sampler.filter(make_record(logging.WARNING))
+
+
+def test_full_queue_drops_instead_of_blocking():
+    handler = log.DroppingQueueHandler(queue.Queue(maxsize=1))
+    handler.handle(make_record())
+    handler.handle(make_record())
+    assert handler.dropped == 1
+
+
+def test_records_are_written_by_the_listener(capsys):
+    log.start_logging()
+    try:
+        logging.getLogger("app.test").warning("queued", extra={"answer": 42})
+    finally:
+        log.stop_logging()
+
+    entry = json.loads(capsys.readouterr().out.strip().splitlines()[-1])
+    assert entry["msg"] == "queued"
+    assert entry["answer"] == 42
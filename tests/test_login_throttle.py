@@ -0,0 +1,74 @@
+import bcrypt
+import pytest
+
+from app.core.login_throttle import BucketLimit, DatabaseBuckets, MemoryBuckets
+
+
+@pytest.mark.asyncio
+async def test_memory_buckets_allow_a_burst_then_refill():
+    buckets = MemoryBuckets(max_size=100)
+    limit = BucketLimit(burst=3, per_second=50.0)
+
+    assert [await buckets.take(None, "user:a", limit) for _ in range(3)] == [None] * 3
+    wait = await buckets.take(None, "user:a", limit)
+    assert 0 < wait <= 1 / 50
+    assert await buckets.take(None, "user:b", limit) is None
+
+
+@pytest.mark.asyncio
+async def test_memory_buckets_stay_bounded():
+    buckets = MemoryBuckets(max_size=10)
+    limit = BucketLimit(burst=5, per_second=0.01)
+    for i in range(100):
+        await buckets.take(None, f"ip:10.0.0.{i}", limit)
+    assert len(buckets) == 10
+
+
+@pytest.mark.asyncio
+async def test_database_buckets_are_shared(session):
+    limit = BucketLimit(burst=2, per_second=0.01)
+    first, second = DatabaseBuckets(), DatabaseBuckets()  # two workers
+
+    assert await first.take(session, "user:a", limit) is None
+    assert await second.take(session, "user:a", limit) is None
+    wait = await first.take(session, "user:a", limit)
+    assert wait == pytest.approx(100, abs=1)
+
+
+@pytest.mark.asyncio
+async def test_login_is_throttled_before_the_password_check(client, monkeypatch):
+    await client.post(
+        "/api/v1/users/",
+        json={
+            "username": "victim",
+            "email": "victim@example.com",
+            "firstName": "Vic",
+            "lastName": "Tim",
+            "password": "securepassword123",
+        },
+    )
+    checks = []
+    checkpw = bcrypt.checkpw
+    monkeypatch.setattr(
+        bcrypt, "checkpw", lambda *args: checks.append(args) or checkpw(*args)
+    )
+
+    for _ in range(5):
+        response = await client.post(
+            "/api/v1/auth/token", data={"username": "victim", "password": "guess"}
+        )
+        assert response.status_code == 401
+    assert len(checks) == 5
+
+    response = await client.post(
+        "/api/v1/auth/token", data={"username": "Victim ", "password": "guess"}
+    )
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) >= 1
+    assert len(checks) == 5
+
+    # Another login from the same address still gets through.
+    response = await client.post(
+        "/api/v1/auth/token", data={"username": "someone", "password": "guess"}
+    )
+    assert response.status_code == 401
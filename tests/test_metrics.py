@@ -0,0 +1,48 @@
+import pytest
+
+from app.core import metrics
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint_reports_route_templates(client, engine):
+    metrics.instrument_engine(engine)
+    route = "/api/v1/users/{user_id}"
+    statements = metrics.db_statements_per_request
+    before = statements.count(route, "GET"), statements.sum(route, "GET")
+    unmatched = statements.sum(metrics.UNMATCHED_ROUTE, "GET")
+
+    response = await client.get("/api/v1/users/00000000-0000-0000-0000-000000000000")
+    assert response.status_code == 404
+    await client.get("/does-not-exist")
+
+    # The lookup is one SELECT; the unmatched path runs none.
+    assert statements.count(route, "GET") == before[0] + 1
+    assert statements.sum(route, "GET") == before[1] + 1
+    assert statements.sum(metrics.UNMATCHED_ROUTE, "GET") == unmatched
+
+    response = await client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    body = response.text
+
+    assert f'http_requests_total{{route="{route}",method="GET",status="404"}}' in body
+    assert f'route="{metrics.UNMATCHED_ROUTE}"' in body
+    assert "/does-not-exist" not in body
+    assert f'http_request_duration_seconds_count{{route="{route}",method="GET"}}' in (
+        body
+    )
+    assert "db_pool{" in body
+    assert "password_pool{" in body
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = metrics.Histogram("test_seconds", "Test.", buckets=(0.1, 1.0))
+    histogram.observe(0.05)
+    histogram.observe(0.5)
+    histogram.observe(5)
+
+    lines = histogram.render()
+    assert 'test_seconds_bucket{le="0.1"} 1' in lines
+    assert 'test_seconds_bucket{le="1.0"} 2' in lines
+    assert 'test_seconds_bucket{le="+Inf"} 3' in lines
+    assert "test_seconds_count 3" in lines
@@ -0,0 +1,80 @@
+import pytest
+import pytest_asyncio
+from sqlalchemy import inspect, text
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlmodel import SQLModel
+
+from app.core import migrations
+
+
+@pytest_asyncio.fixture
+async def empty_engine(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'migrate.db'}")
+    yield engine
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_fresh_database_is_built_and_stamped(empty_engine):
+    applied = await migrations.run_migrations(empty_engine)
+
+    assert [m.version for m in applied] == [m.version for m in migrations.MIGRATIONS]
+    assert await migrations.get_current_version(empty_engine) == (
+        migrations.LATEST_VERSION
+    )
+
+    # Second run takes the no-op path
+    assert await migrations.run_migrations(empty_engine) == []
+
+
+@pytest.mark.asyncio
+async def test_legacy_database_gets_pending_steps(empty_engine):
+    async with empty_engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+        await conn.execute(text("DROP INDEX ix_dbuser_username"))
+
+    applied = await migrations.run_migrations(empty_engine)
+    assert [m.version for m in applied] == [m.version for m in migrations.MIGRATIONS]
+
+    async with empty_engine.connect() as conn:
+        indexes = await conn.run_sync(
+            lambda sync_conn: inspect(sync_conn).get_indexes("dbuser")
+        )
+    assert "ix_dbuser_username" in {index["name"] for index in indexes}
+
+
+@pytest.mark.asyncio
+async def test_station_count_rollup_is_backfilled(empty_engine):
+    async with empty_engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+        await conn.run_sync(migrations.version_metadata.create_all)
+        for migration in migrations.MIGRATIONS[:2]:
+            await conn.run_sync(migrations._record, migration)
+        await conn.execute(
+            text(
+                "INSERT INTO station (id, name, code, address, city, state, "
+                "postal_code, is_active, created_at, updated_at) VALUES "
+                "(1, 'Hub', 'HUB', 'a', 'c', 's', 'p', 1, '2024-01-01', '2024-01-01')"
+            )
+        )
+        for number, status in (("A", "CREATED"), ("B", "CREATED"), ("C", "DELIVERED")):
+            await conn.execute(
+                text(
+                    "INSERT INTO parcel (tracking_number, weight, length, width, "
+                    "height, service_price, status, created_at, updated_at, "
+                    "sender_id, receiver_id, origin_station_id) VALUES "
+                    f"('{number}', 1, 1, 1, 1, 1, '{status}', '2024-01-01', "
+                    "'2024-01-01', 1, 1, 1)"
+                )
+            )
+
+    applied = await migrations.run_migrations(empty_engine)
+    assert [m.version for m in applied] == [
+        m.version for m in migrations.MIGRATIONS[2:]
+    ]
+
+    async with empty_engine.connect() as conn:
+        rows = await conn.execute(
+            text("SELECT role, status, count FROM station_parcel_count ORDER BY status")
+        )
+        assert rows.all() == [("origin", "CREATED", 2), ("origin", "DELIVERED", 1)]
@@ -0,0 +1,267 @@
+import contextlib
+
+import pytest
+from sqlalchemy import event
+
+from app.routers.v1.parcels_router import tracking_cache
+
+
+@pytest.fixture
+def parcel_data(parcel_refs):
+    return {
+        "trackingNumber": "TH0001",
+        "weight": 2.5,
+        "length": 30,
+        "width": 20,
+        "height": 10,
+        "servicePrice": "55.00",
+        **parcel_refs,
+    }
+
+
+@pytest.mark.asyncio
+async def test_create_and_read_parcel(client, parcel_data):
+    response = await client.post("/api/v1/parcels", json=parcel_data)
+    assert response.status_code == 201
+    parcel_id = response.json()["id"]
+
+    response = await client.get(f"/api/v1/parcels/{parcel_id}")
+    assert response.status_code == 200
+    assert response.json()["trackingNumber"] == "TH0001"
+    assert response.json()["status"] == "created"
+
+    response = await client.post("/api/v1/parcels", json=parcel_data)
+    assert response.status_code == 409
+
+
+@pytest.mark.asyncio
+async def test_tracking_is_cached_and_invalidated_on_write(client, parcel_data):
+    tracking_cache.clear()
+    parcel_id = (await client.post("/api/v1/parcels", json=parcel_data)).json()["id"]
+
+    response = await client.get("/api/v1/parcels/track/TH0001")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["status"] == "created"
+    assert data["originStation"]["code"] == "HDY"
+    assert data["destinationStation"]["city"] == "Phuket"
+
+    hits = tracking_cache.hits
+    await client.get("/api/v1/parcels/track/TH0001")
+    assert tracking_cache.hits == hits + 1
+
+    await client.put(f"/api/v1/parcels/{parcel_id}", json={"status": "in_transit"})
+    response = await client.get("/api/v1/parcels/track/TH0001")
+    assert response.json()["status"] == "in_transit"
+
+
+@pytest.mark.asyncio
+async def test_tracking_unknown_parcel(client):
+    tracking_cache.clear()
+    response = await client.get("/api/v1/parcels/track/NOPE")
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_scan_batch_reports_an_outcome_per_scan(client, parcel_data):
+    tracking_cache.clear()
+    for number in ("TH0001", "TH0002", "TH0003"):
+        await client.post(
+            "/api/v1/parcels", json={**parcel_data, "trackingNumber": number}
+        )
+    await client.get("/api/v1/parcels/track/TH0001")
+
+    station = parcel_data["originStationId"]
+    scans = [
+        {
+            "trackingNumber": "TH0001",
+            "status": "picked_up",
+            "timestamp": "2099-01-01T08:00:00",
+        },
+        {
+            "trackingNumber": "TH0001",
+            "status": "in_transit",
+            "stationId": station,
+            "timestamp": "2099-01-01T09:00:00",
+        },
+        {
+            "trackingNumber": "TH0001",
+            "status": "in_transit",
+            "stationId": station,
+            "timestamp": "2099-01-01T09:00:00",
+        },
+        {
+            "trackingNumber": "TH0002",
+            "status": "created",
+            "timestamp": "2099-01-01T08:00:00",
+        },
+        {
+            "trackingNumber": "TH0003",
+            "status": "delivered",
+            "timestamp": "2000-01-01T08:00:00",
+        },
+        {
+            "trackingNumber": "TH0003",
+            "status": "delivered",
+            "stationId": 999,
+            "timestamp": "2099-01-01T08:00:00",
+        },
+        {
+            "trackingNumber": "NOPE",
+            "status": "delivered",
+            "timestamp": "2099-01-01T08:00:00",
+        },
+    ]
+    response = await client.post("/api/v1/parcels/scans", json={"scans": scans})
+    assert response.status_code == 200
+    body = response.json()
+    assert [r["outcome"] for r in body["results"]] == [
+        "superseded",
+        "updated",
+        "duplicate",
+        "unchanged",
+        "stale",
+        "unknown_station",
+        "not_found",
+    ]
+    assert body["summary"]["updated"] == 1
+
+    response = await client.get("/api/v1/parcels/track/TH0001")
+    assert response.json()["status"] == "in_transit"
+    response = await client.get("/api/v1/parcels/track/TH0003")
+    assert response.json()["status"] == "created"
+
+
+@pytest.mark.asyncio
+async def test_scan_timestamps_with_an_offset(client, parcel_data):
+    await client.post("/api/v1/parcels", json=parcel_data)
+
+    scans = [
+        {
+            "trackingNumber": "TH0001",
+            "status": "picked_up",
+            "timestamp": "2099-01-01T09:00:00+07:00",
+        },
+        {
+            "trackingNumber": "TH0001",
+            "status": "in_transit",
+            "timestamp": "2099-01-01T03:00:00Z",
+        },
+    ]
+    response = await client.post("/api/v1/parcels/scans", json={"scans": scans})
+    assert response.status_code == 200
+    assert [r["outcome"] for r in response.json()["results"]] == [
+        "superseded",
+        "updated",
+    ]
+
+    response = await client.get("/api/v1/parcels/track/TH0001")
+    assert response.json()["status"] == "in_transit"
+
+
+@pytest.mark.asyncio
+async def test_station_counts_follow_parcel_writes(client, parcel_data):
+    origin = parcel_data["originStationId"]
+    destination = parcel_data["destinationStationId"]
+    ids = []
+    for number in ("TH0001", "TH0002", "TH0003"):
+        response = await client.post(
+            "/api/v1/parcels", json={**parcel_data, "trackingNumber": number}
+        )
+        ids.append(response.json()["id"])
+    await client.put(f"/api/v1/parcels/{ids[0]}", json={"status": "in_transit"})
+    await client.post(
+        "/api/v1/parcels/scans",
+        json={
+            "scans": [
+                {
+                    "trackingNumber": "TH0002",
+                    "status": "delivered",
+                    "timestamp": "2099-01-01T08:00:00",
+                }
+            ]
+        },
+    )
+    await client.delete(f"/api/v1/parcels/{ids[2]}")
+
+    response = await client.get("/api/v1/parcels/station-counts")
+    assert response.status_code == 200
+    counts = {c["stationId"]: c for c in response.json()}
+    expected = {"in_transit": 1, "delivered": 1}
+    assert counts[origin]["origin"] == expected
+    assert counts[origin]["destination"] == {}
+    assert counts[destination]["destination"] == expected
+
+    response = await client.get(f"/api/v1/parcels/station-counts?station_id={origin}")
+    assert [c["stationId"] for c in response.json()] == [origin]
+
+
+@contextlib.contextmanager
+def count_queries(engine):
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+
+
+@pytest.mark.asyncio
+async def test_include_embeds_relationships_in_fixed_queries(
+    client, session, engine, parcel_data
+):
+    for number in ("TH0001", "TH0002", "TH0003"):
+        await client.post(
+            "/api/v1/parcels", json={**parcel_data, "trackingNumber": number}
+        )
+    session.expunge_all()
+
+    with count_queries(engine) as statements:
+        response = await client.get(
+            "/api/v1/parcels?include=sender,originStation,vehicle"
+        )
+    assert response.status_code == 200
+    parcels = response.json()["parcels"]
+    assert len(parcels) == 3
+    assert parcels[0]["sender"]["email"] == "sender@example.com"
+    assert parcels[0]["originStation"]["code"] == "HDY"
+    assert parcels[0]["vehicle"] is None
+    assert "receiver" not in parcels[0]
+    # The page itself, then one IN query each for customers and stations.
+    assert len(statements) == 3
+
+    session.expunge_all()
+    parcel_id = parcels[0]["id"]
+    with count_queries(engine) as statements:
+        response = await client.get(
+            f"/api/v1/parcels/{parcel_id}?include=sender,receiver,destination_station"
+        )
+    assert response.json()["receiver"]["name"] == "Receiver"
+    assert response.json()["destinationStation"]["city"] == "Phuket"
+    assert len(statements) == 1
+
+
+@pytest.mark.asyncio
+async def test_fields_select_only_requested_columns(
+    client, session, engine, parcel_data
+):
+    await client.post("/api/v1/parcels", json=parcel_data)
+    session.expunge_all()
+
+    with count_queries(engine) as statements:
+        response = await client.get(
+            "/api/v1/parcels?fields=trackingNumber,status&include=receiver"
+        )
+    (parcel,) = response.json()["parcels"]
+    assert set(parcel) == {"id", "trackingNumber", "status", "receiver"}
+    assert "service_price" not in statements[0]
+    assert "weight" not in statements[0]
+
+    response = await client.get("/api/v1/parcels?fields=nope")
+    assert response.status_code == 400
+    response = await client.get(f"/api/v1/parcels/{parcel['id']}?include=owner")
+    assert response.status_code == 400
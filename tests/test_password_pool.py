@@ -0,0 +1,39 @@
+import asyncio
+
+import pytest
+
+from app.core.password_pool import PasswordPool, PasswordPoolBusyError
+
+
+@pytest.mark.asyncio
+async def test_hash_and_verify_round_trip():
+    pool = PasswordPool(workers=2, max_queue=2)
+    try:
+        hashed = await pool.hash_password("securepassword123")
+        assert await pool.verify_password("securepassword123", hashed)
+        assert not await pool.verify_password("wrong", hashed)
+    finally:
+        pool.shutdown()
+
+    stats = pool.stats()
+    assert stats["submitted"] == 3
+    assert stats["completed"] == 3
+    assert stats["in_flight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_rejects_when_queue_is_full():
+    pool = PasswordPool(workers=1, max_queue=0)
+    try:
+        results = await asyncio.gather(
+            pool.hash_password("first"),
+            pool.hash_password("second"),
+            return_exceptions=True,
+        )
+    finally:
+        pool.shutdown()
+
+    busy = [r for r in results if isinstance(r, PasswordPoolBusyError)]
+    assert len(busy) == 1
+    assert busy[0].status_code == 503
+    assert pool.stats()["rejected"] == 1
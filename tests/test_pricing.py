@@ -0,0 +1,56 @@
+from decimal import Decimal
+
+import pytest
+
+from app.core.pricing import NO_STATION, RateTable, quote, rate_table_cache
+from app.models.shipping_rate_model import ShippingRate
+
+
+def test_quote_uses_billable_weight_and_route_rates():
+    table = RateTable.from_rates([(1, 2, Decimal("50.00"), Decimal("12.50"))])
+
+    quotes = quote(
+        table,
+        origin_station_ids=[1, 1, NO_STATION],
+        destination_station_ids=[2, 2, 2],
+        weights=[1.2, 5.0, 3.0],
+        lengths=[10, 60, 10],
+        widths=[10, 50, 10],
+        heights=[10, 40, 10],
+    )
+
+    # 1.2 kg rounds up to 1.5; 60x50x40 cm is 24 kg volumetric.
+    assert quotes.billable_weight.tolist() == [1.5, 24.0, 3.0]
+    # Unknown routes fall back to the default 30.00 + 10.00/kg.
+    assert quotes.price_cents.tolist() == [6875, 35000, 6000]
+    assert quotes.rate_found.tolist() == [True, True, False]
+
+
+@pytest.mark.asyncio
+async def test_quote_endpoint_and_quoted_parcel_price(client, session, parcel_refs):
+    rate_table_cache.clear()
+    session.add(
+        ShippingRate(
+            origin_station_id=parcel_refs["originStationId"],
+            destination_station_id=parcel_refs["destinationStationId"],
+            base_price=Decimal("40.00"),
+            price_per_kg=Decimal("15.00"),
+        )
+    )
+    await session.commit()
+
+    item = {"weight": 2.3, "length": 30, "width": 20, "height": 10, **parcel_refs}
+    response = await client.post(
+        "/api/v1/parcels/quotes",
+        json={"items": [item, {**item, "originStationId": None}]},
+    )
+    assert response.status_code == 200
+    first, second = response.json()["quotes"]
+    assert first == {"billableWeight": 2.5, "price": "77.50", "rateFound": True}
+    assert second == {"billableWeight": 2.5, "price": "55.00", "rateFound": False}
+
+    parcel = {**item, "trackingNumber": "TH0100", "senderId": parcel_refs["senderId"]}
+    response = await client.post("/api/v1/parcels", json=parcel)
+    assert response.status_code == 201
+    assert Decimal(response.json()["servicePrice"]) == Decimal("77.50")
+    rate_table_cache.clear()
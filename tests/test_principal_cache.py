@@ -0,0 +1,85 @@
+import uuid
+
+import pytest
+
+from app.core.principal_cache import PrincipalCache, principal_cache
+from app.models.user_model import User
+
+
+@pytest.fixture
+def user_data():
+    return {
+        "username": "cachedjohn",
+        "email": "cachedjohn@example.com",
+        "firstName": "John",
+        "lastName": "Doe",
+        "password": "securepassword123",
+    }
+
+
+async def login(client, user_data):
+    response = await client.post(
+        "/api/v1/auth/token",
+        data={"username": user_data["username"], "password": user_data["password"]},
+    )
+    assert response.status_code == 200
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+@pytest.mark.asyncio
+async def test_current_user_is_cached_and_invalidated_on_update(client, user_data):
+    principal_cache.clear()
+    create_resp = await client.post("/api/v1/users/", json=user_data)
+    user_id = create_resp.json()["id"]
+    headers = await login(client, user_data)
+
+    response = await client.get("/api/v1/users/me", headers=headers)
+    assert response.status_code == 200
+    assert response.json()["username"] == user_data["username"]
+    assert len(principal_cache) == 1
+
+    response = await client.put(
+        f"/api/v1/users/{user_id}", json={"firstName": "Johnny"}
+    )
+    assert response.status_code == 200
+    assert len(principal_cache) == 0
+
+    response = await client.get("/api/v1/users/me", headers=headers)
+    assert response.json()["firstName"] == "Johnny"
+
+
+@pytest.mark.asyncio
+async def test_deleted_user_is_evicted(client, user_data):
+    principal_cache.clear()
+    create_resp = await client.post("/api/v1/users/", json=user_data)
+    user_id = create_resp.json()["id"]
+    headers = await login(client, user_data)
+
+    assert (await client.get("/api/v1/users/me", headers=headers)).status_code == 200
+    await client.delete(f"/api/v1/users/{user_id}")
+
+    response = await client.get("/api/v1/users/me", headers=headers)
+    assert response.status_code == 401
+
+
+def test_cache_evicts_least_recently_used():
+    cache = PrincipalCache(max_size=2, ttl=60)
+    users = [
+        User(
+            id=uuid.uuid4(),
+            email=f"user{i}@example.com",
+            username=f"user{i}",
+            first_name="First",
+            last_name="Last",
+            status="active",
+        )
+        for i in range(3)
+    ]
+    cache.set("a", users[0])
+    cache.set("b", users[1])
+    cache.get("a")
+    cache.set("c", users[2])
+
+    assert cache.get("a") is users[0]
+    assert cache.get("b") is None
+    assert cache.get("c") is users[2]
@@ -0,0 +1,48 @@
+import logging
+
+import pytest
+from sqlmodel import select
+
+from app.core import metrics, query_log
+from app.models.user_model import DBUser
+
+
+@pytest.mark.asyncio
+async def test_slow_query_is_logged_with_parameters(
+    engine, session, caplog, monkeypatch
+):
+    monkeypatch.setattr(query_log.settings, "DB_SLOW_QUERY_MS", 0)
+    monkeypatch.setattr(query_log.settings, "DB_SLOW_QUERY_PARAMS_SAMPLE_RATE", 1.0)
+    query_log.install_slow_query_log(engine)
+
+    with caplog.at_level(logging.WARNING, logger="app.db"):
+        await session.exec(select(DBUser).where(DBUser.username == "slowpoke"))
+
+    record = next(r for r in caplog.records if r.getMessage().startswith("Slow query"))
+    assert "FROM dbuser" in record.statement
+    assert "slowpoke" in record.parameters
+
+
+@pytest.mark.asyncio
+async def test_repeated_statement_shapes_are_flagged(
+    engine, session, caplog, monkeypatch
+):
+    monkeypatch.setattr(query_log.settings, "DB_N_PLUS_ONE_THRESHOLD", 3)
+    metrics.instrument_engine(engine)
+
+    stats = metrics.RequestStats()
+    token = metrics.current_request_stats.set(stats)
+    try:
+        for i in range(4):
+            # Different IN-list lengths still count as one statement shape.
+            names = [f"user{n}" for n in range(i + 1)]
+            await session.exec(select(DBUser).where(DBUser.username.in_(names)))
+    finally:
+        metrics.current_request_stats.reset(token)
+
+    with caplog.at_level(logging.WARNING, logger="app.db"):
+        repeated = query_log.detect_n_plus_one("/things", "GET", stats.shapes)
+
+    assert [count for _, count in repeated] == [4]
+    assert "Possible N+1: GET /things" in caplog.text
+    assert query_log.detect_n_plus_one("/things", "GET", {"SELECT 1": 3}) == []
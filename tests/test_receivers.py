@@ -0,0 +1,241 @@
+import asyncio
+import datetime
+
+import pytest
+from sqlalchemy import delete, text
+
+from app.core.receiver_store import ReceiverStore, receiver_store, settings
+from app.models.customer_model import Customer
+
+
+@pytest.fixture(autouse=True)
+def empty_store():
+    receiver_store.clear()
+    yield
+    receiver_store.clear()
+
+
+def receiver_data(n: int, **overrides):
+    return {"name": f"Receiver {n}", "email": f"receiver{n}@example.com", **overrides}
+
+
+@pytest.mark.asyncio
+async def test_email_must_be_unique(client):
+    first = (await client.post("/api/v1/receivers", json=receiver_data(1))).json()
+    second = (await client.post("/api/v1/receivers", json=receiver_data(2))).json()
+
+    response = await client.post(
+        "/api/v1/receivers", json=receiver_data(3, email=first["email"])
+    )
+    assert response.status_code == 400
+
+    response = await client.put(
+        f"/api/v1/receivers/{second['id']}", json={"email": first["email"]}
+    )
+    assert response.status_code == 400
+
+    # Keeping your own email, or taking one freed by an update, is fine.
+    response = await client.put(
+        f"/api/v1/receivers/{first['id']}", json={"email": first["email"], "name": "A"}
+    )
+    assert response.status_code == 200
+    await client.put(
+        f"/api/v1/receivers/{first['id']}", json={"email": "moved@example.com"}
+    )
+    response = await client.post(
+        "/api/v1/receivers", json=receiver_data(4, email=first["email"])
+    )
+    assert response.status_code == 201
+
+    await client.delete(f"/api/v1/receivers/{second['id']}")
+    response = await client.post(
+        "/api/v1/receivers", json=receiver_data(5, email=second["email"])
+    )
+    assert response.status_code == 201
+
+
+@pytest.mark.asyncio
+async def test_listing_filters_by_active_in_id_order(client):
+    ids = []
+    for n in range(6):
+        response = await client.post("/api/v1/receivers", json=receiver_data(n))
+        ids.append(response.json()["id"])
+    for receiver_id in ids[::2]:
+        await client.post(f"/api/v1/receivers/{receiver_id}/deactivate")
+    await client.post(f"/api/v1/receivers/{ids[2]}/activate")
+
+    response = await client.get("/api/v1/receivers?is_active=true")
+    assert [r["id"] for r in response.json()] == [ids[1], ids[2], ids[3], ids[5]]
+
+    response = await client.get("/api/v1/receivers?is_active=false")
+    assert [r["id"] for r in response.json()] == [ids[0], ids[4]]
+
+    response = await client.get("/api/v1/receivers?skip=2&limit=3")
+    assert [r["id"] for r in response.json()] == ids[2:5]
+
+
+@pytest.mark.asyncio
+async def test_changes_are_written_behind_in_one_flush(client, session):
+    created = (await client.post("/api/v1/receivers", json=receiver_data(1))).json()
+    doomed = (await client.post("/api/v1/receivers", json=receiver_data(2))).json()
+    idle = (await client.post("/api/v1/receivers", json=receiver_data(3))).json()
+
+    await client.put(f"/api/v1/receivers/{created['id']}", json={"name": "Renamed"})
+    await client.post(f"/api/v1/receivers/{created['id']}/deactivate")
+    await client.post(f"/api/v1/receivers/{idle['id']}/deactivate")
+    await client.put(f"/api/v1/receivers/{doomed['id']}", json={"name": "Doomed"})
+    await client.delete(f"/api/v1/receivers/{doomed['id']}")
+    assert receiver_store.pending == 2
+
+    customer = await session.get(Customer, created["id"])
+    assert customer.name == "Receiver 1"
+    assert await session.get(Customer, doomed["id"]) is None
+
+    assert await receiver_store.flush(session) == 2
+    session.expire_all()
+
+    customer = await session.get(Customer, created["id"])
+    assert (customer.name, customer.is_active) == ("Renamed", False)
+    customer = await session.get(Customer, idle["id"])
+    assert (customer.name, customer.is_active) == ("Receiver 3", False)
+
+
+@pytest.mark.asyncio
+async def test_null_for_a_required_field_is_rejected(client):
+    created = (await client.post("/api/v1/receivers", json=receiver_data(1))).json()
+
+    for field in ("name", "email", "is_active"):
+        response = await client.patch(
+            f"/api/v1/receivers/{created['id']}", json={field: None}
+        )
+        assert response.status_code == 422, field
+    assert receiver_store.pending == 0
+
+    response = await client.patch(
+        f"/api/v1/receivers/{created['id']}", json={"phone": None}
+    )
+    assert response.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_receiver_on_a_parcel_cannot_be_deleted(client, session, parcel_refs):
+    response = await client.post(
+        "/api/v1/parcels",
+        json={
+            "trackingNumber": "TH0001",
+            "weight": 2.5,
+            "length": 30,
+            "width": 20,
+            "height": 10,
+            **parcel_refs,
+        },
+    )
+    assert response.status_code == 201
+
+    response = await client.delete(f"/api/v1/receivers/{parcel_refs['receiverId']}")
+    assert response.status_code == 409
+    assert await session.get(Customer, parcel_refs["receiverId"]) is not None
+
+    response = await client.get(f"/api/v1/receivers/{parcel_refs['receiverId']}")
+    assert response.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_flush_skips_a_row_the_database_rejects(client, session, engine):
+    if engine.dialect.name != "sqlite":
+        pytest.skip("the rejecting trigger is SQLite syntax")
+    first = (await client.post("/api/v1/receivers", json=receiver_data(1))).json()
+    second = (await client.post("/api/v1/receivers", json=receiver_data(2))).json()
+    await client.put(f"/api/v1/receivers/{first['id']}", json={"name": "First"})
+    await client.put(f"/api/v1/receivers/{second['id']}", json={"name": "Second"})
+
+    await session.exec(
+        text(
+            "CREATE TRIGGER reject_first BEFORE UPDATE ON customer "
+            f"WHEN NEW.id = {first['id']} BEGIN SELECT RAISE(ABORT, 'no'); END"
+        )
+    )
+    await session.commit()
+
+    assert await receiver_store.flush(session) == 1
+    assert receiver_store.pending == 0
+    session.expire_all()
+
+    assert (await session.get(Customer, second["id"])).name == "Second"
+    # The rejected change is dropped; the next read reloads the row.
+    response = await client.get(f"/api/v1/receivers/{first['id']}")
+    assert response.json()["name"] == "Receiver 1"
+
+
+@pytest.mark.asyncio
+async def test_workers_changing_different_fields_keep_both(client, session):
+    created = (await client.post("/api/v1/receivers", json=receiver_data(1))).json()
+    other_worker = ReceiverStore()
+    await receiver_store.refresh(session)
+
+    await client.put(f"/api/v1/receivers/{created['id']}", json={"name": "Renamed"})
+    await other_worker.update(session, created["id"], {"is_active": False})
+    assert await other_worker.flush(session) == 1
+
+    # Our rename is still unwritten; refresh takes the other worker's column.
+    await receiver_store.refresh(session)
+    response = await client.get(f"/api/v1/receivers/{created['id']}")
+    assert (response.json()["name"], response.json()["is_active"]) == (
+        "Renamed",
+        False,
+    )
+
+    assert await receiver_store.flush(session) == 1
+    session.expire_all()
+    customer = await session.get(Customer, created["id"])
+    assert (customer.name, customer.is_active) == ("Renamed", False)
+
+
+@pytest.mark.asyncio
+async def test_refresh_drops_receivers_deleted_elsewhere(client, session):
+    kept = (await client.post("/api/v1/receivers", json=receiver_data(1))).json()
+    gone = (await client.post("/api/v1/receivers", json=receiver_data(2))).json()
+    await receiver_store.refresh(session)
+
+    assert await ReceiverStore().delete(session, gone["id"])
+    await receiver_store.refresh(session)
+
+    response = await client.get("/api/v1/receivers")
+    assert [r["id"] for r in response.json()] == [kept["id"]]
+    response = await client.get(f"/api/v1/receivers/{gone['id']}")
+    assert response.status_code == 404
+
+    # A sync too old for the tombstones falls back to checking every id.
+    await session.exec(delete(Customer).where(Customer.id == kept["id"]))
+    await session.commit()
+    receiver_store._synced_at -= datetime.timedelta(
+        seconds=settings.RECEIVER_TOMBSTONE_RETENTION_SECONDS + 1
+    )
+    await receiver_store.refresh(session)
+    assert (await client.get("/api/v1/receivers")).json() == []
+
+
+@pytest.mark.asyncio
+async def test_load_reads_receivers_from_the_database(client, session):
+    created = (await client.post("/api/v1/receivers", json=receiver_data(1))).json()
+    renamed = (await client.post("/api/v1/receivers", json=receiver_data(2))).json()
+
+    # A fresh worker: listings wait for the load; changes made meanwhile stay.
+    worker = ReceiverStore()
+    listing = asyncio.create_task(worker.wait_loaded())
+    await worker.update(session, renamed["id"], {"name": "Renamed"})
+    await asyncio.sleep(0)
+    assert not listing.done()
+
+    await worker.load(session)
+    await listing
+    assert [r.id for r in worker.page(None, 0, 10)] == [created["id"], renamed["id"]]
+    assert worker.page(None, 1, 1)[0].name == "Renamed"
+    assert worker.pending == 1
+
+    receiver_store.clear()
+    await receiver_store.load(session)
+    response = await client.post(
+        "/api/v1/receivers", json=receiver_data(3, email=created["email"])
+    )
+    assert response.status_code == 400
@@ -0,0 +1,91 @@
+import pytest
+
+from app.core.route_batching import PendingParcel, StaffLoad, batch_deliveries
+from app.models.delivery_staff_model import DeliveryStaff
+from app.models.parcel_model import Parcel, ParcelStatus
+
+
+def test_areas_stay_together_and_loads_balance():
+    parcels = [
+        PendingParcel(i, code, 1.0)
+        for i, code in enumerate(["90110"] * 4 + ["90230"] * 4 + ["83000"] * 4)
+    ]
+    staff = {1: StaffLoad(), 2: StaffLoad(), 3: StaffLoad()}
+
+    assignments = batch_deliveries(parcels, staff, area_length=3)
+
+    assert sorted(len(ids) for ids in assignments.values()) == [4, 4, 4]
+    areas = {
+        staff_id: {parcels[i].postal_code[:3] for i in ids}
+        for staff_id, ids in assignments.items()
+    }
+    assert sorted(map(sorted, areas.values())) == [["830"], ["901"], ["902"]]
+
+
+def test_new_parcels_follow_the_courier_already_in_the_area():
+    staff = {
+        1: StaffLoad(parcels=3, weight=3.0, areas={"901"}),
+        2: StaffLoad(parcels=3, weight=3.0, areas={"830"}),
+    }
+    parcels = [PendingParcel(10, "90110", 1.0), PendingParcel(11, "83000", 1.0)]
+
+    assert batch_deliveries(parcels, staff, area_length=3) == {1: [10], 2: [11]}
+
+
+def test_busy_area_is_split_when_it_would_overload_one_courier():
+    staff = {1: StaffLoad(areas={"901"}), 2: StaffLoad()}
+    parcels = [PendingParcel(i, "90110", 1.0) for i in range(10)]
+
+    assignments = batch_deliveries(parcels, staff, area_length=3)
+    assert sorted(len(ids) for ids in assignments.values()) == [5, 5]
+
+
+@pytest.mark.asyncio
+async def test_delivery_batches_are_incremental(client, session, parcel_refs):
+    couriers = [
+        DeliveryStaff(
+            name=f"Courier {i}",
+            email=f"courier{i}@example.com",
+            phone="0",
+            employee_id=f"E{i}",
+        )
+        for i in range(2)
+    ]
+    session.add_all(couriers)
+    await session.commit()
+
+    def add_parcels(numbers, postal_code):
+        for number in numbers:
+            session.add(
+                Parcel(
+                    tracking_number=number,
+                    weight=1,
+                    length=1,
+                    width=1,
+                    height=1,
+                    service_price=1,
+                    status=ParcelStatus.OUT_FOR_DELIVERY,
+                    delivery_postal_code=postal_code,
+                    sender_id=parcel_refs["senderId"],
+                    receiver_id=parcel_refs["receiverId"],
+                )
+            )
+
+    add_parcels(["A1", "A2"], "90110")
+    add_parcels(["B1", "B2"], "83000")
+    await session.commit()
+
+    response = await client.post("/api/v1/parcels/delivery-batches", json={})
+    assert response.json()["assigned"] == 4
+
+    add_parcels(["A3"], "90112")
+    await session.commit()
+    response = await client.post("/api/v1/parcels/delivery-batches", json={})
+    body = response.json()
+    assert (body["assigned"], body["unassigned"]) == (1, 0)
+
+    session.expire_all()
+    rows = (await session.exec(Parcel.__table__.select())).all()
+    staff_by_number = {row.tracking_number: row.delivery_staff_id for row in rows}
+    assert staff_by_number["A1"] == staff_by_number["A2"] == staff_by_number["A3"]
+    assert staff_by_number["B1"] == staff_by_number["B2"] != staff_by_number["A1"]
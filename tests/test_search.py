@@ -0,0 +1,107 @@
+import pytest
+
+from app.core import search
+from app.core.search import TrigramIndex, customer_search, station_search
+from app.models.customer_model import Customer
+
+
+@pytest.fixture(autouse=True)
+def fresh_indexes():
+    customer_search.clear()
+    station_search.clear()
+    yield
+    customer_search.clear()
+    station_search.clear()
+
+
+def test_prefix_matches_rank_above_fuzzy_ones():
+    index = TrigramIndex(2)
+    index.build(
+        [
+            (1, "Somchai Jaidee", "somchai@example.com"),
+            (2, "Somsak Rakthai", "somsak@example.com"),
+            (3, "John Smith", "john.smith@example.com"),
+            (4, "Jon Smyth", "jon@example.com"),
+        ]
+    )
+
+    assert [doc for doc, _ in index.search("som", 10, 0.3)] == [2, 1]
+    assert [doc for doc, _ in index.search("jaid", 10, 0.3)] == [1]
+    # Typo: no prefix match, ranked by similarity.
+    assert [doc for doc, _ in index.search("jhon smith", 10, 0.3)] == [3, 4]
+
+    index.put(4, ("Jane Doe", "jane@example.com"))
+    assert index.search("smyth", 10, 0.3) == []
+    assert [doc for doc, _ in index.search("jane", 10, 0.3)] == [4]
+    index.remove(4)
+    assert index.search("jane", 10, 0.3) == []
+
+
+def test_email_local_part_words_and_compact():
+    rows = [
+        (1, *customer_search.index_texts(("Somchai Jaidee", "somchai@example.com"))),
+        (2, *customer_search.index_texts(("Anna Lee", "john.smith@example.com"))),
+    ]
+    index = TrigramIndex(2)
+    index.build(rows)
+
+    # Words start after punctuation; the shared domain is never indexed.
+    assert [doc for doc, _ in index.search("smi", 10, 0.3)] == [2]
+    assert index.search("example", 10, 0.3) == []
+
+    # compact() folds in both put() and extend() postings, in entry order.
+    index.put(4, ("Smith Jones", "sj"))
+    index.extend([(3, "Smita Patel", "smita")])
+    assert [doc for doc, _ in index.search("smi", 10, 0.3)] == [2, 4]
+    index.compact()
+    assert sorted(doc for doc, _ in index.search("smi", 10, 0.3)) == [2, 3, 4]
+    assert sorted(doc for doc, _ in index.search("smit", 10, 0.3)) == [2, 3, 4]
+
+
+def test_compacted_copy_drops_replaced_entries(monkeypatch):
+    monkeypatch.setattr(search, "COMPACT_MIN_ENTRIES", 0)
+    index = TrigramIndex(2)
+    index.build([(1, "Somchai Jaidee", "somchai"), (2, "John Smith", "john.smith")])
+    assert not index.needs_compact()
+
+    index.put(1, ("Somsak Rakthai", "somsak"))
+    index.put(3, ("Jon Smyth", "jon"))
+    index.remove(2)
+    assert index.needs_compact()
+
+    compacted = index.compacted()
+    assert not compacted.needs_compact()
+    assert len(compacted._strings) == 4  # documents 1 and 3, two fields each
+    assert [doc for doc, _ in compacted.search("som", 10, 0.3)] == [1]
+    assert [doc for doc, _ in compacted.search("smyth", 10, 0.3)] == [3]
+    for query in ("som", "somchai", "smyth", "jon smith", "j"):
+        assert compacted.search(query, 10, 0.3) == index.search(query, 10, 0.3)
+
+    # The compacted index takes further changes like a freshly built one.
+    compacted.put(2, ("Anna Lee", "anna"))
+    assert [doc for doc, _ in compacted.search("ann", 10, 0.3)] == [2]
+    assert index.search("ann", 10, 0.3) == []
+
+
+@pytest.mark.asyncio
+async def test_search_endpoints(client, session, parcel_refs, monkeypatch):
+    monkeypatch.setattr(search.settings, "SEARCH_INDEX_REFRESH_SECONDS", 0)
+
+    response = await client.get("/api/v1/search/customers?q=recei")
+    assert response.status_code == 200
+    (hit,) = response.json()["results"]
+    assert hit["email"] == "receiver@example.com"
+    assert hit["id"] == parcel_refs["receiverId"]
+
+    session.add(Customer(name="Kittisak Wongsa", email="kit@example.com"))
+    await session.commit()
+    response = await client.get("/api/v1/search/customers?q=kitisak")
+    assert [hit["name"] for hit in response.json()["results"]] == ["Kittisak Wongsa"]
+
+    response = await client.get("/api/v1/search/stations?q=phuket")
+    (hit,) = response.json()["results"]
+    assert hit["code"] == "HKT"
+    assert hit["score"] == 1.0
+
+    response = await client.get("/api/v1/search/stations?q=")
+    assert response.status_code == 422
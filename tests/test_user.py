@@ -1,3 +1,5 @@
+import json
+
 import pytest
 
 
@@ -93,3 +95,100 @@ async def test_delete_user(client, user_data):
     # Attempt to delete a non-existent user
     response = await client.delete(f"/api/v1/users/{user_id}")
     assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_get_users_with_cursor(client, user_data):
+    for i in range(5):
+        data = user_data.copy()
+        data["username"] = f"user{i}"
+        data["email"] = f"user{i}@example.com"
+        await client.post("/api/v1/users/", json=data)
+
+    seen = []
+    response = await client.get("/api/v1/users/?paginate=cursor&limit=2")
+    while True:
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total_count"] is None
+        seen.extend(user["id"] for user in data["users"])
+        if not data["has_more"]:
+            assert data["next_cursor"] is None
+            break
+        response = await client.get(
+            f"/api/v1/users/?cursor={data['next_cursor']}&limit=2"
+        )
+
+    assert len(seen) == 5
+    assert len(set(seen)) == 5
+
+    response = await client.get("/api/v1/users/?cursor=not-a-cursor")
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_get_users_offset_mode_keeps_total(client, user_data):
+    await client.post("/api/v1/users/", json=user_data)
+
+    response = await client.get("/api/v1/users/?limit=1")
+    data = response.json()
+    assert data["total_count"] == 1
+    assert data["has_more"] is False
+
+    response = await client.get("/api/v1/users/?total=none")
+    assert response.json()["total_count"] is None
+
+
+@pytest.mark.asyncio
+async def test_create_user_conflicts(client, user_data):
+    response = await client.post("/api/v1/users/", json=user_data)
+    assert response.status_code == 201
+
+    response = await client.post("/api/v1/users/", json=user_data)
+    assert response.status_code == 409
+    assert response.json()["detail"] == "User with this username already exists"
+
+    same_email = user_data.copy()
+    same_email["username"] = "someone-else"
+    response = await client.post("/api/v1/users/", json=same_email)
+    assert response.status_code == 409
+    assert response.json()["detail"] == "User with this email already exists"
+
+    # Updating into an existing username is rejected the same way
+    other = user_data.copy()
+    other["username"] = "janedoe"
+    other["email"] = "jane@example.com"
+    other_id = (await client.post("/api/v1/users/", json=other)).json()["id"]
+    response = await client.put(
+        f"/api/v1/users/{other_id}", json={"username": user_data["username"]}
+    )
+    assert response.status_code == 409
+
+
+@pytest.mark.asyncio
+async def test_stream_users(client, user_data):
+    for i in range(3):
+        data = user_data.copy()
+        data["username"] = f"stream{i}"
+        data["email"] = f"stream{i}@example.com"
+        await client.post("/api/v1/users/", json=data)
+
+    response = await client.get(
+        "/api/v1/users/", headers={"Accept": "application/x-ndjson"}
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = response.text.splitlines()
+    assert len(lines) == 3
+    assert {json.loads(line)["username"] for line in lines} == {
+        "stream0",
+        "stream1",
+        "stream2",
+    }
+
+    response = await client.get("/api/v1/users/?stream=true&offset=1")
+    assert response.status_code == 200
+    users = response.json()
+    assert isinstance(users, list)
+    assert len(users) == 2
+    assert "firstName" in users[0]
@@ -0,0 +1,76 @@
+import json
+
+import pytest
+
+
+def parse_lines(response):
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+@pytest.mark.asyncio
+async def test_import_users_ndjson(client):
+    rows = [
+        {
+            "username": "alice",
+            "email": "alice@example.com",
+            "firstName": "Alice",
+            "lastName": "Doe",
+            "password": "pw-alice",
+        },
+        {
+            "username": "alice",
+            "email": "other@example.com",
+            "firstName": "Alice",
+            "lastName": "Again",
+            "password": "pw-alice",
+        },
+        {"username": "missing-fields"},
+    ]
+    body = "\n".join(json.dumps(row) for row in rows) + "\nnot json\n"
+
+    response = await client.post(
+        "/api/v1/users/import",
+        content=body,
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+    assert response.status_code == 200
+
+    results = parse_lines(response)
+    assert [r.get("status") for r in results[:-1]] == [
+        "created",
+        "conflict",
+        "invalid",
+        "invalid",
+    ]
+    assert results[-1] == {"summary": {"created": 1, "failed": 3}}
+
+    users = (await client.get("/api/v1/users/")).json()
+    assert users["total_count"] == 1
+
+
+@pytest.mark.asyncio
+async def test_import_users_csv(client):
+    body = (
+        "username,email,first_name,last_name,password\n"
+        "bob,bob@example.com,Bob,Smith,pw-bob\n"
+        "carol,carol@example.com,Carol,Smith,pw-carol\n"
+    )
+
+    response = await client.post(
+        "/api/v1/users/import", content=body, headers={"Content-Type": "text/csv"}
+    )
+    assert response.status_code == 200
+    assert parse_lines(response)[-1] == {"summary": {"created": 2, "failed": 0}}
+
+    response = await client.post(
+        "/api/v1/auth/token", data={"username": "carol", "password": "pw-carol"}
+    )
+    assert response.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_import_users_rejects_unknown_content_type(client):
+    response = await client.post(
+        "/api/v1/users/import", json=[], headers={"Content-Type": "application/json"}
+    )
+    assert response.status_code == 415